@@ -0,0 +1,192 @@
+"""
+Streaming reader for the Twitter/X data export (data/tweets.js)
+"""
+
+import array
+import collections
+import datetime
+import io
+import json
+import logging
+import os
+import re
+import zipfile
+
+logger = logging.getLogger("TwitterCleaner")
+
+# tweets.js, tweets-part1.js, ... (older exports use tweet.js / tweet-part1.js)
+TWEET_FILE_PATTERN = re.compile(r'(^|/)tweets?(-part\d+)?\.js$')
+CHUNK_SIZE = 64 * 1024  # Characters read from an archive file at a time
+
+# Post types stored in the index
+TWEET = "tweet"
+REPLY = "reply"
+RETWEET = "retweet"
+ENTRY_TYPES = (TWEET, REPLY, RETWEET)
+
+ArchiveEntry = collections.namedtuple("ArchiveEntry", ["id", "created_at", "type"])
+
+class ArchiveIndex:
+    """Compact in-memory index of archived posts
+
+    Stores only the status ID, creation time (Unix seconds) and post type,
+    packed into arrays, so even accounts with hundreds of thousands of posts
+    take a few megabytes.
+    """
+
+    def __init__(self):
+        self._ids = array.array("Q")
+        self._dates = array.array("q")
+        self._types = bytearray()
+
+    def add(self, tweet_id, created_at, entry_type):
+        """Add one post to the index"""
+        self._ids.append(int(tweet_id))
+        self._dates.append(int(created_at))
+        self._types.append(ENTRY_TYPES.index(entry_type))
+
+    def __len__(self):
+        return len(self._ids)
+
+    def __iter__(self):
+        for i in range(len(self._ids)):
+            yield ArchiveEntry(self._ids[i], self._dates[i], ENTRY_TYPES[self._types[i]])
+
+    def counts(self):
+        """Number of indexed posts per type"""
+        counter = collections.Counter()
+        for code in self._types:
+            counter[ENTRY_TYPES[code]] += 1
+        return counter
+
+    def sort(self, newest_first=True):
+        """Sort the index by creation time"""
+        order = sorted(range(len(self._ids)), key=self._dates.__getitem__, reverse=newest_first)
+        self._ids = array.array("Q", (self._ids[i] for i in order))
+        self._dates = array.array("q", (self._dates[i] for i in order))
+        self._types = bytearray(self._types[i] for i in order)
+
+def iter_json_array(stream, chunk_size=CHUNK_SIZE):
+    """Yield the elements of the first JSON array in a text stream one at a time
+
+    Anything before the opening bracket (the ``window.YTD.tweets.part0 =``
+    assignment in export files) is skipped. Only a chunk and the element
+    being decoded are held in memory.
+    """
+    decoder = json.JSONDecoder()
+
+    # Skip the JavaScript assignment prefix
+    while True:
+        chunk = stream.read(chunk_size)
+        if not chunk:
+            return
+        start = chunk.find("[")
+        if start != -1:
+            buffer = chunk[start + 1:]
+            break
+
+    position = 0
+    eof = False
+    while True:
+        # Skip separators between elements
+        while position < len(buffer) and buffer[position] in " \t\r\n,":
+            position += 1
+        if position < len(buffer) and buffer[position] == "]":
+            return
+
+        if position < len(buffer):
+            try:
+                element, position = decoder.raw_decode(buffer, position)
+                yield element
+                continue
+            except json.JSONDecodeError:
+                # Most likely the element continues in the next chunk
+                if eof:
+                    raise ValueError("Archive file is truncated or malformed")
+
+        if eof:
+            raise ValueError("Archive file ended before the closing bracket")
+        chunk = stream.read(chunk_size)
+        if not chunk:
+            eof = True
+        buffer = buffer[position:] + chunk
+        position = 0
+
+def parse_created_at(value):
+    """Convert an export timestamp ("Wed Oct 10 20:19:24 +0000 2018") to Unix seconds"""
+    return int(datetime.datetime.strptime(value, "%a %b %d %H:%M:%S %z %Y").timestamp())
+
+def classify_tweet(tweet):
+    """Return the post type of an archived tweet object"""
+    if tweet.get("full_text", tweet.get("text", "")).startswith("RT @"):
+        return RETWEET
+    if tweet.get("in_reply_to_status_id_str") or tweet.get("in_reply_to_status_id"):
+        return REPLY
+    return TWEET
+
+def find_tweet_files(path):
+    """List the tweet files of an export as (name, opener) pairs
+
+    ``path`` can be the export ZIP, the extracted export directory, its
+    ``data`` directory, or a single tweets.js file. Each opener returns a
+    binary stream.
+    """
+    if os.path.isfile(path) and zipfile.is_zipfile(path):
+        archive = zipfile.ZipFile(path)
+        names = sorted(name for name in archive.namelist() if TWEET_FILE_PATTERN.search(name))
+        return [(name, lambda name=name: archive.open(name)) for name in names]
+
+    if os.path.isfile(path):
+        return [(path, lambda: open(path, "rb"))]
+
+    for directory in (os.path.join(path, "data"), path):
+        if not os.path.isdir(directory):
+            continue
+        names = sorted(name for name in os.listdir(directory) if TWEET_FILE_PATTERN.search(name))
+        if names:
+            return [(os.path.join(directory, name), lambda full=os.path.join(directory, name): open(full, "rb"))
+                    for name in names]
+
+    raise FileNotFoundError(f"No tweets.js files found in {path}")
+
+def iter_archive_tweets(path):
+    """Yield every tweet object in an export, streaming file by file"""
+    for name, opener in find_tweet_files(path):
+        logger.info(f"Reading archive file {name}")
+        with opener() as raw:
+            stream = io.TextIOWrapper(raw, encoding="utf-8")
+            for element in iter_json_array(stream):
+                # Newer exports wrap each post as {"tweet": {...}}
+                yield element.get("tweet", element)
+
+def load_archive_index(path, types=None, predicate=None):
+    """Build an ArchiveIndex from an export, newest posts first
+
+    ``types`` optionally limits the index to some of ENTRY_TYPES.
+    ``predicate`` (e.g. a filters.PostFilter) is called with
+    {id, type, created_at, likes, text} for each post; posts it rejects
+    are left out of the index, so their text is never kept in memory.
+    """
+    index = ArchiveIndex()
+    rejected = 0
+    for tweet in iter_archive_tweets(path):
+        entry_type = classify_tweet(tweet)
+        if types and entry_type not in types:
+            continue
+        tweet_id = tweet.get("id_str") or tweet["id"]
+        created_at = parse_created_at(tweet["created_at"])
+        if predicate is not None and not predicate({
+                "id": tweet_id,
+                "type": entry_type,
+                "created_at": created_at,
+                "likes": int(tweet.get("favorite_count") or 0),
+                "text": tweet.get("full_text", tweet.get("text", "")),
+        }):
+            rejected += 1
+            continue
+        index.add(tweet_id, created_at, entry_type)
+    index.sort()
+    logger.info(f"Loaded {len(index)} posts from archive: {dict(index.counts())}")
+    if rejected:
+        logger.info(f"Keeping {rejected} archived posts that do not match the filter")
+    return index
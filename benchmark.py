@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+"""
+End-to-end benchmark of the cleaner against the offline mock server
+
+Starts a MockXServer, runs delete_tweets() against it in headless Chrome and
+reports throughput, per-deletion latency percentiles and the number of
+WebDriver commands sent, so changes to the deletion loop can be compared
+without touching the live site.
+"""
+
+import argparse
+import collections
+import json
+import logging
+import sys
+import time
+
+import delete_tweets
+from mock_server import MockXServer
+
+logger = logging.getLogger("TwitterCleaner")
+
+class CommandCounter:
+    """Count the WebDriver commands a driver sends, by command name"""
+
+    def __init__(self, driver):
+        self.counts = collections.Counter()
+        self._execute = driver.execute
+        driver.execute = self._counting_execute
+
+    def _counting_execute(self, driver_command, params=None):
+        self.counts[driver_command] += 1
+        return self._execute(driver_command, params)
+
+    @property
+    def total(self):
+        return sum(self.counts.values())
+
+def percentile(values, fraction):
+    """Nearest-rank percentile of a list of numbers (None if empty)"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(0, min(len(ordered) - 1, int(round(fraction * len(ordered) + 0.5)) - 1))
+    return ordered[rank]
+
+def run_benchmark(args):
+    """Run one benchmark and return its report as a dict"""
+    server = MockXServer(posts=args.posts, latency=args.latency, ui_delay=args.ui_delay,
+                         overlay_rate=args.overlay_rate, legacy_ui=args.legacy_ui, seed=args.seed,
+                         rate_limit=args.rate_limit)
+    server.start()
+    driver = None
+    events = []
+    try:
+        driver = delete_tweets.create_driver(args.driver, headless=not args.headful, lean_browsing=not args.no_lean,
+                                             capture_network=args.replay)
+        counter = CommandCounter(driver)
+
+        start = time.monotonic()
+        start_wall = time.time()
+        deleted = delete_tweets.delete_tweets(
+            server.timeline.username, server.password, args.driver,
+            headless=not args.headful,
+            sleep_time=args.sleep,
+            max_delete=args.max,
+            wait_timeout=args.timeout,
+            workers=args.workers,
+            worker_mode=args.worker_mode,
+            base_url=server.url,
+            driver=driver,
+            progress_callback=events.append,
+            lean_browsing=not args.no_lean,
+            network_replay=args.replay,
+            adaptive_rate=args.adaptive,
+            cdp_transport=args.cdp,
+        )
+        elapsed = time.monotonic() - start
+    finally:
+        if driver is not None:
+            driver.quit()
+        server.stop()
+
+    durations = [event["duration"] for event in events if event["status"] in delete_tweets.SUCCESS_STATUSES]
+    first_deletion = next((event["time"] for event in events if event["status"] in delete_tweets.SUCCESS_STATUSES), None)
+    return {
+        "settings": {
+            "posts": args.posts, "max": args.max, "latency": args.latency, "ui_delay": args.ui_delay,
+            "overlay_rate": args.overlay_rate, "legacy_ui": args.legacy_ui, "workers": args.workers,
+            "worker_mode": args.worker_mode, "sleep": args.sleep, "lean": not args.no_lean,
+            "replay": args.replay, "rate_limit": args.rate_limit,
+            "adaptive": args.adaptive, "cdp": args.cdp,
+        },
+        "deleted": deleted,
+        "elapsed_seconds": elapsed,
+        "throughput_per_minute": deleted / elapsed * 60 if elapsed else 0.0,
+        "time_to_first_deletion": first_deletion - start_wall if first_deletion else None,
+        "latency_p50": percentile(durations, 0.50),
+        "latency_p95": percentile(durations, 0.95),
+        "results": dict(collections.Counter(event["status"] for event in events)),
+        # Commands sent by the main browser; separate worker browsers are not counted
+        "webdriver_commands": counter.total,
+        "commands_per_deletion": counter.total / deleted if deleted else None,
+        "top_commands": counter.counts.most_common(8),
+        "server_api_requests": dict(server.timeline.requests),
+        "server_rate_limited": server.rate_limited_requests,
+        "posts_remaining": server.timeline.remaining,
+        # Span histograms and counters collected during the run
+        "metrics": delete_tweets.metrics.summary(),
+    }
+
+def format_seconds(value):
+    return "n/a" if value is None else f"{value:.3f}s"
+
+def print_report(report, baseline=None):
+    """Print a report, with the change against a baseline report if given"""
+    def delta(key, lower_is_better=True):
+        if not baseline or report.get(key) is None or baseline.get(key) in (None, 0):
+            return ""
+        change = (report[key] - baseline[key]) / baseline[key] * 100
+        if not change:
+            return "  (unchanged)"
+        better = change < 0 if lower_is_better else change > 0
+        return f"  ({change:+.1f}% {'better' if better else 'worse'})"
+
+    print("Benchmark results")
+    print(f"  Deleted:               {report['deleted']} ({report['results']})")
+    print(f"  Elapsed:               {format_seconds(report['elapsed_seconds'])}")
+    print(f"  Throughput:            {report['throughput_per_minute']:.1f} posts/min"
+          f"{delta('throughput_per_minute', lower_is_better=False)}")
+    print(f"  Time to first delete:  {format_seconds(report['time_to_first_deletion'])}")
+    print(f"  Latency p50:           {format_seconds(report['latency_p50'])}{delta('latency_p50')}")
+    print(f"  Latency p95:           {format_seconds(report['latency_p95'])}{delta('latency_p95')}")
+    print(f"  WebDriver commands:    {report['webdriver_commands']}{delta('webdriver_commands')}")
+    if report["commands_per_deletion"] is not None:
+        print(f"  Commands per deletion: {report['commands_per_deletion']:.1f}{delta('commands_per_deletion')}")
+    print(f"  Top commands:          {', '.join(f'{name}={count}' for name, count in report['top_commands'])}")
+    print(f"  Server API requests:   {report['server_api_requests']} "
+          f"({report.get('server_rate_limited', 0)} rate limited)")
+    metrics = report.get("metrics")
+    if metrics:
+        print(f"  Counters:              {metrics['counters']}")
+        print("  Spans (p50 / p90 / max):")
+        for name, span in metrics["spans"].items():
+            print(f"    {name:<30} {format_seconds(span['p50'])} / {format_seconds(span['p90'])} / "
+                  f"{format_seconds(span['max'])}  (n={span['count']})")
+
+def parse_arguments():
+    """Parse command line arguments"""
+    parser = argparse.ArgumentParser(description='Benchmark the cleaner against the offline mock server')
+    parser.add_argument('-d', '--driver', default=delete_tweets.CHROME_DRIVER_PATH or None,
+                        help='Path to ChromeDriver executable (default: Selenium Manager)')
+    parser.add_argument('--posts', type=int, default=200, help='Number of synthetic posts on the mock timeline')
+    parser.add_argument('-m', '--max', type=int, default=50, help='Maximum number of posts to delete')
+    parser.add_argument('--latency', type=float, default=0.05, help='Mean mock server response time (seconds)')
+    parser.add_argument('--ui-delay', type=float, default=0.02, help='Delay before menus and dialogs appear (seconds)')
+    parser.add_argument('--overlay-rate', type=float, default=0.0, help='Chance of a popup overlay per interaction')
+    parser.add_argument('--legacy-ui', action='store_true', help='Use the older Undo Retweet / Remove reply menus')
+    parser.add_argument('-s', '--sleep', type=float, default=0.0, help='Politeness floor between deletions (seconds)')
+    parser.add_argument('--timeout', type=float, default=delete_tweets.WAIT_TIMEOUT, help='Element wait timeout (seconds)')
+    parser.add_argument('-w', '--workers', type=int, default=1, help='Number of parallel deletion workers')
+    parser.add_argument('--worker-mode', choices=['tabs', 'browsers'], default='tabs', help='Worker mode')
+    parser.add_argument('--seed', type=int, default=0, help='Random seed for the synthetic posts')
+    parser.add_argument('--replay', action='store_true', help='Delete by replaying captured network requests')
+    parser.add_argument('--rate-limit', type=int, default=0, help='Mock delete requests accepted per second')
+    parser.add_argument('--adaptive', action='store_true', help='Use adaptive pacing instead of a fixed sleep')
+    parser.add_argument('--cdp', action='store_true', help='Run page scripts over a direct DevTools connection')
+    parser.add_argument('--no-lean', action='store_true', help='Load images, video and fonts')
+    parser.add_argument('--headful', action='store_true', help='Show the browser window')
+    parser.add_argument('--json', metavar='PATH', help='Write the report as JSON')
+    parser.add_argument('--baseline', metavar='PATH', help='Compare against a report saved with --json')
+    return parser.parse_args()
+
+if __name__ == "__main__":
+    args = parse_arguments()
+    delete_tweets.configure_logging()
+    report = run_benchmark(args)
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as baseline_file:
+            baseline = json.load(baseline_file)
+    print_report(report, baseline)
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as report_file:
+            json.dump(report, report_file, indent=2)
+        logger.info(f"Report written to {args.json}")
+
+    sys.exit(0 if report["deleted"] else 1)
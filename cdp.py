@@ -0,0 +1,194 @@
+"""
+Direct Chrome DevTools Protocol transport for the scripts run in the deletion loop
+"""
+
+import itertools
+import json
+import logging
+import threading
+import urllib.request
+
+from selenium.common.exceptions import JavascriptException, TimeoutException, WebDriverException
+
+# websocket-client (installed along with Selenium 4), imported when the first
+# connection opens so that importing this module stays cheap
+websocket = None
+
+logger = logging.getLogger("TwitterCleaner")
+
+# Selenium runs async scripts with a callback as the last argument; over CDP
+# the same script body runs inside a Promise that the callback resolves.
+SYNC_WRAPPER = "(function () {\n%s\n}).apply(null, %s)"
+ASYNC_WRAPPER = """new Promise(function (resolve) {
+    (function () {
+%s
+    }).apply(null, %s.concat([resolve]));
+})"""
+
+class CDPError(WebDriverException):
+    """A DevTools command failed or the connection was lost"""
+
+def debugger_address(driver):
+    """host:port of the DevTools endpoint of a Chrome started by chromedriver"""
+    return (driver.capabilities.get("goog:chromeOptions") or {}).get("debuggerAddress")
+
+def page_websocket_url(address, target_id):
+    """WebSocket URL of the DevTools page target with the given ID"""
+    with urllib.request.urlopen(f"http://{address}/json/list", timeout=5) as response:
+        targets = json.loads(response.read().decode("utf-8"))
+    for target in targets:
+        if target.get("type") == "page" and target.get("id") == target_id:
+            return target.get("webSocketDebuggerUrl")
+    return None
+
+class CDPConnection:
+    """One persistent DevTools websocket to a page
+
+    send() writes a command and reads until its response arrives. No CDP
+    domains are enabled, so apart from stale responses to commands that
+    timed out nothing else arrives on the socket. Safe to share between
+    threads (commands are serialized).
+    """
+
+    def __init__(self, url, timeout=10):
+        global websocket
+        if websocket is None:
+            try:
+                import websocket as websocket_client
+            except ImportError:
+                raise CDPError("The websocket-client package is not installed") from None
+            websocket = websocket_client
+        # Chrome rejects DevTools websockets that send an Origin header it does not allow
+        self._socket = websocket.create_connection(url, timeout=timeout, suppress_origin=True)
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def send(self, method, params=None, timeout=None):
+        """Run a DevTools command and return its result. Raises TimeoutException or CDPError."""
+        with self._lock:
+            command_id = next(self._ids)
+            try:
+                self._socket.settimeout(timeout)
+                self._socket.send(json.dumps({"id": command_id, "method": method, "params": params or {}}))
+                while True:
+                    message = json.loads(self._socket.recv())
+                    if message.get("id") == command_id:
+                        break
+            except websocket.WebSocketTimeoutException:
+                raise TimeoutException(f"{method} timed out after {timeout} seconds") from None
+            except (websocket.WebSocketException, OSError) as e:
+                raise CDPError(f"DevTools connection failed: {e}") from None
+        if "error" in message:
+            raise CDPError(f"{method} failed: {message['error'].get('message')}")
+        return message.get("result", {})
+
+    def close(self):
+        try:
+            self._socket.close()
+        except Exception:
+            pass
+
+def _has_elements(value):
+    from selenium.webdriver.remote.webelement import WebElement
+
+    def contains(value):
+        if isinstance(value, WebElement):
+            return True
+        if isinstance(value, (list, tuple)):
+            return any(contains(item) for item in value)
+        if isinstance(value, dict):
+            return any(contains(item) for item in value.values())
+        return False
+    return contains(value)
+
+class CDPDriver:
+    """Selenium driver that runs JavaScript over a direct DevTools websocket
+
+    execute_script() and execute_async_script() become a single
+    Runtime.evaluate on a persistent websocket to the current tab, instead
+    of an HTTP request to chromedriver, and set_script_timeout() is kept
+    locally instead of being another request. execute_cdp_cmd() goes to
+    the same websocket (so it applies to this tab). Scripts that take element
+    handles are passed on to Selenium, as is everything else (navigation,
+    find_element, window switching, ...), so this can stand in for the
+    driver wherever the loop stays in one tab.
+
+    Results come back as JSON values: scripts must not return DOM elements
+    (check ``element_handles``).
+    """
+
+    element_handles = False
+
+    def __init__(self, driver, connection):
+        self._driver = driver
+        self._connection = connection
+        self._script_timeout = 30
+        self._selenium_timeout = None
+
+    @classmethod
+    def attach(cls, driver):
+        """Connect to the driver's current tab. Returns None if the DevTools endpoint cannot be reached."""
+        try:
+            address = debugger_address(driver)
+            if not address:
+                raise CDPError("Chrome did not report a DevTools address")
+            # chromedriver's window handles are DevTools target IDs
+            target_id = driver.current_window_handle.replace("CDwindow-", "")
+            url = page_websocket_url(address, target_id)
+            if not url:
+                raise CDPError(f"No DevTools target for window {target_id}")
+            connection = CDPConnection(url)
+        except Exception as e:
+            logger.warning(f"Direct DevTools transport unavailable ({e}). Using WebDriver commands.")
+            return None
+        logger.info("Running page scripts over a direct DevTools connection")
+        return cls(driver, connection)
+
+    def __getattr__(self, name):
+        return getattr(self._driver, name)
+
+    @property
+    def selenium_driver(self):
+        return self._driver
+
+    def set_script_timeout(self, seconds):
+        self._script_timeout = seconds
+
+    def _selenium(self):
+        if self._selenium_timeout != self._script_timeout:
+            self._driver.set_script_timeout(self._script_timeout)
+            self._selenium_timeout = self._script_timeout
+        return self._driver
+
+    def _evaluate(self, expression, timeout):
+        response = self._connection.send("Runtime.evaluate", {
+            "expression": expression,
+            "awaitPromise": True,
+            "returnByValue": True,
+        }, timeout=timeout)
+        if "exceptionDetails" in response:
+            details = response["exceptionDetails"]
+            description = (details.get("exception") or {}).get("description") or details.get("text")
+            raise JavascriptException(f"javascript error: {description}")
+        return response.get("result", {}).get("value")
+
+    def execute_script(self, script, *args):
+        if _has_elements(args):
+            return self._selenium().execute_script(script, *args)
+        return self._evaluate(SYNC_WRAPPER % (script, json.dumps(list(args))), self._script_timeout)
+
+    def execute_async_script(self, script, *args):
+        if _has_elements(args):
+            return self._selenium().execute_async_script(script, *args)
+        return self._evaluate(ASYNC_WRAPPER % (script, json.dumps(list(args))), self._script_timeout)
+
+    def execute_cdp_cmd(self, cmd, cmd_args):
+        return self._connection.send(cmd, cmd_args, timeout=self._script_timeout)
+
+    def detach(self):
+        """Close the websocket and return the plain Selenium driver"""
+        self._connection.close()
+        return self._driver
+
+    def quit(self):
+        self.detach().quit()
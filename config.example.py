@@ -5,18 +5,92 @@
 TWITTER_USERNAME = "your_username"
 TWITTER_PASSWORD = "your_password"
 
-# Path to ChromeDriver executable
+# Path to ChromeDriver executable (empty to have Selenium Manager find one; the result is cached)
 # Example for Windows: "C:/path/to/chromedriver.exe"
 # Example for Mac/Linux: "/path/to/chromedriver"
-CHROME_DRIVER_PATH = "/path/to/chromedriver"
+CHROME_DRIVER_PATH = ""
 
 # Script settings
 HEADLESS = False               # Set to True to run without visible browser
-SLEEP_BETWEEN_ACTIONS = 1      # Seconds to wait between actions
+SLEEP_BETWEEN_ACTIONS = 1      # Seconds between deletions: the starting delay with ADAPTIVE_RATE, a fixed floor with --fixed-rate
 MAX_TWEETS_TO_DELETE = 100     # Maximum number of tweets to delete (use float('inf') for unlimited)
 
 # Advanced settings (optional)
 DEBUG_MODE = False             # Enable additional debug output
 SCROLL_AMOUNT = 500            # Pixels to scroll to load more tweets
 WAIT_TIMEOUT = 5               # Maximum seconds to wait for elements
+POLL_FREQUENCY = 0.05          # Seconds between checks while waiting for elements
 AUTO_CLOSE_BROWSER = True      # Close browser when done
+
+# Parallel deletion (optional)
+WORKERS = 1                    # Number of parallel deletion workers
+WORKER_MODE = "tabs"           # "tabs" (tabs of one browser) or "browsers" (one Chrome per worker)
+
+# Archive mode (optional)
+ARCHIVE_PATH = ""              # Data export ZIP, folder or tweets.js to delete from (empty to scroll the timeline)
+
+# Checkpoint journal (optional)
+JOURNAL_PATH = "twitter_cleaner_journal.db"  # SQLite file recording every handled post (empty to disable)
+
+# Session reuse (optional) - skip the login flow when a saved session is still valid
+CHROME_PROFILE_DIR = ""        # Chrome profile directory to keep the session in, e.g. "chrome-profile"
+COOKIES_PATH = ""              # File to save session cookies to, e.g. "session_cookies.json"
+
+# Selector learning (optional)
+SELECTOR_STATS_PATH = "selector_stats.json"  # Where selector hit/miss statistics are kept (empty to disable)
+
+# Target site (optional) - point at mock_server.py for offline testing
+BASE_URL = "https://x.com"
+
+# Timing metrics (optional) - per-step latency histograms and counters
+METRICS_JSON_PATH = ""         # Write them as JSON, e.g. "metrics.json" (empty to disable)
+METRICS_PROMETHEUS_PATH = ""   # Write them as a Prometheus textfile, e.g. "twitter_cleaner.prom"
+METRICS_EXPORT_EVERY = 0       # Also export every N deletions while running (0 = only at the end)
+
+# Lean browsing (optional) - skip images, video and fonts the cleaner never looks at
+LEAN_BROWSING = True           # Set to False to load pages in full (e.g. to watch the browser)
+ALLOWED_URL_PATTERNS = []      # Patterns to stop blocking, e.g. ["*.png*"] (see BLOCKED_URL_PATTERNS in delete_tweets.py)
+
+# Fast mode (optional) - after one deletion through the UI, replay the page's delete request
+NETWORK_REPLAY = False         # Set to True to delete by replaying captured network requests
+REPLAY_CONCURRENCY = 4         # Replayed requests in flight at once
+
+# Adaptive pacing (optional) - SLEEP_BETWEEN_ACTIONS becomes the starting delay
+ADAPTIVE_RATE = True           # Speed up while deletions succeed, back off on errors and rate limits
+MIN_SLEEP = 0.0                # Shortest delay between deletions (seconds) - the floor while adapting
+MAX_SLEEP = 30.0               # Longest delay between deletions (seconds)
+
+# Selective cleanup (optional) - only delete posts matching all of these; kept posts are never clicked
+DELETE_FILTER = {
+    # "before": "2020-01-01",        # Only posts created before this date
+    # "after": "2015-01-01",         # Only posts created on or after this date
+    # "types": ["retweet", "reply"], # Only these types (own, reply, retweet, quote)
+    # "keep_min_likes": 100,         # Keep posts with at least this many likes
+    # "keep_keywords": ["launch"],   # Keep posts containing any of these words
+    # "only_keywords": ["crypto"],   # Only delete posts containing one of these words
+}
+
+# Direct DevTools connection (optional) - send the deletion loop's page scripts over one websocket
+CDP_TRANSPORT = False          # Set to True to bypass chromedriver for scripts in the single-tab loop
+
+# Daemon mode (optional) - send runs to a running daemon.py instead of starting Chrome each time
+DAEMON_URL = ""                # e.g. "http://127.0.0.1:8765"
+DAEMON_TOKEN_PATH = "daemon.token"  # API token file the daemon creates (or set TWITTER_CLEANER_DAEMON_TOKEN)
+
+# Long runs (optional) - keep the page's memory flat over thousands of deletions
+DOM_PRUNING = True             # Empty handled posts once they have scrolled well out of view
+HEAP_LIMIT_MB = 768            # Reload the page when its JavaScript heap grows past this (0 to disable)
+RECYCLE_EVERY = 0              # Also reload the page every N deletions (0 to disable)
+LOOKAHEAD = 2                  # Start loading more posts when this few are left to delete (at most 3, 0 to disable)
+
+# Logging (optional)
+LOG_PATH = "twitter_cleaner.log"  # Log file (empty for console only)
+ASYNC_LOGGING = True           # Write logs from a background thread instead of the deletion loop
+LOG_MAX_MB = 50                # Rotate log files at this size (0 to never rotate)
+LOG_BACKUPS = 5                # Number of gzipped old log files to keep
+STEP_LOG_PATH = ""             # e.g. "steps.jsonl" - per-step timings and chatter as JSON lines
+STEP_LOG_SAMPLE = 1.0          # Fraction of step events to keep (e.g. 0.1)
+
+# Startup (optional)
+ATTACH_ADDRESS = ""            # e.g. "127.0.0.1:9222" - use a Chrome started with --remote-debugging-port
+DRIVER_CACHE_PATH = "driver_cache.json"  # Where the ChromeDriver found by Selenium Manager is remembered
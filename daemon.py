@@ -0,0 +1,609 @@
+#!/usr/bin/env python3
+"""
+Warm-browser daemon: keeps logged-in Chrome instances and runs cleanup jobs from a local HTTP API
+
+Jobs are posted as JSON to ``POST /jobs`` and run one at a time on a browser
+that is already started (and, after the first job of an account, already
+logged in), so a job starts without Python imports, a Chrome launch or the
+login flow. Progress is streamed as NDJSON from ``GET /jobs/<id>/events``
+(``?since=N`` resumes after the events already seen; each job keeps its
+last EVENT_HISTORY events).
+``delete_tweets.py --daemon URL`` submits its configuration as a job and
+prints the stream.
+
+Every request must carry the daemon's token (``Authorization: Bearer ...``),
+read from TOKEN_ENV or a token file only its owner can read, and must come
+from a local client: requests with a Host other than localhost, a browser
+Origin, or (for POST) a body that is not application/json are refused.
+"""
+
+import argparse
+import collections
+import hmac
+import itertools
+import json
+import logging
+import os
+import queue
+import re
+import secrets
+import stat
+import threading
+import urllib.parse
+import time
+import urllib.error
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# delete_tweets is imported where it is needed, so that its thin client can
+# import this module without loading Selenium and the config a second time.
+
+logger = logging.getLogger("TwitterCleaner")
+
+DEFAULT_PORT = 8765
+DEFAULT_TOKEN_PATH = "daemon.token"
+# Environment variable that holds the token instead of the token file
+TOKEN_ENV = "TWITTER_CLEANER_DAEMON_TOKEN"
+# Host names a request may be addressed to
+LOCAL_HOSTS = ("127.0.0.1", "localhost", "::1")
+# Progress events kept per job (older ones are dropped, so a long job does not grow without bound)
+EVENT_HISTORY = 1000
+
+# Job fields accepted by the API and the delete_tweets() argument each one sets
+JOB_FIELDS = {
+    "max": "max_delete",
+    "sleep": "sleep_time",
+    "workers": "workers",
+    "worker_mode": "worker_mode",
+    "archive": "archive_path",
+    "resume": "resume",
+    "filter": "delete_filter",
+    "plan": "plan_path",
+    "dry_run": "dry_run",
+    "manifest": "manifest_path",
+    "replay": "network_replay",
+    "adaptive_rate": "adaptive_rate",
+    "cdp": "cdp_transport",
+}
+# Job fields naming files the daemon reads or writes; only accepted inside --files-dir
+PATH_FIELDS = ("archive", "plan", "manifest")
+
+# Job states
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+def load_token(path=DEFAULT_TOKEN_PATH, create=False):
+    """The API token: TOKEN_ENV if set, else the contents of ``path``
+
+    With ``create`` a missing token file is generated (mode 0600). A token
+    file that other users can read is refused. Returns None if there is no
+    token; raises ValueError if the file is unsafe.
+    """
+    token = os.environ.get(TOKEN_ENV, "").strip()
+    if token:
+        return token
+    if create and not os.path.exists(path):
+        try:
+            descriptor = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+        except FileExistsError:
+            pass  # Created by someone else in the meantime
+        else:
+            with os.fdopen(descriptor, "w", encoding="utf-8") as f:
+                f.write(secrets.token_urlsafe(32) + "\n")
+            logger.info(f"Generated a new daemon token in {path}")
+    try:
+        mode = os.stat(path).st_mode
+    except FileNotFoundError:
+        return None
+    if os.name != "nt" and mode & (stat.S_IRWXG | stat.S_IRWXO):
+        raise ValueError(f"The daemon token file {path} is readable by other users (chmod 600 {path})")
+    with open(path, encoding="utf-8") as f:
+        return f.read().strip() or None
+
+def confine_path(files_dir, value):
+    """Resolve a job's file name inside ``files_dir``. Raises ValueError for paths outside it."""
+    if not files_dir:
+        raise ValueError("File fields need the daemon to be started with --files-dir")
+    root = os.path.realpath(files_dir)
+    path = os.path.realpath(os.path.join(root, value))
+    if os.path.isabs(value) or os.path.commonpath([root, path]) != root:
+        raise ValueError(f"{value!r} is not a file name inside the daemon's files directory")
+    return path
+
+def files_dir_name(files_dir, value):
+    """The name to send for a local file ``value`` so the daemon finds it in its ``files_dir``
+
+    A path to a file inside ``files_dir`` becomes its name relative to it;
+    other relative names are sent as they are. Raises ValueError for an
+    absolute path outside ``files_dir`` or if the daemon has none.
+    """
+    if not files_dir:
+        raise ValueError("The daemon has no files directory: start it with --files-dir to use "
+                         "--archive, --plan or --manifest")
+    root = os.path.realpath(files_dir)
+    path = os.path.realpath(value)
+    if os.path.commonpath([root, path]) == root:
+        return os.path.relpath(path, root)
+    if os.path.isabs(value):
+        raise ValueError(f"{value} is outside the daemon's files directory {root}: copy it there and "
+                         f"pass its name instead")
+    return value
+
+class Job:
+    """One cleanup request and the progress events it has produced
+
+    Events are numbered in order (their ``seq``) and only the last
+    ``max_events`` are kept.
+    """
+
+    _ids = itertools.count(1)
+
+    def __init__(self, spec, max_events=EVENT_HISTORY):
+        self.id = str(next(self._ids))
+        self.spec = spec
+        self.username = spec["username"]
+        self.state = QUEUED
+        self.deleted = 0
+        self.error = None
+        self.created = time.time()
+        self.started = None
+        self.finished = None
+        self.events = collections.deque(maxlen=max_events)
+        self.emitted = 0  # Events produced so far, including the dropped ones
+        self._condition = threading.Condition()
+
+    def emit(self, event):
+        """Record a progress event (also used as delete_tweets()'s progress_callback)"""
+        with self._condition:
+            self.events.append(dict(event, job=self.id, seq=self.emitted))
+            self.emitted += 1
+            self._condition.notify_all()
+
+    def set_state(self, state, **fields):
+        with self._condition:
+            # Together, so a stream that sees the final state also sees its event
+            self.state = state
+            self.emit(dict({"event": "job", "state": state, "time": time.time()}, **fields))
+
+    def events_after(self, since, timeout=15):
+        """Kept events numbered ``since`` or later, waiting up to ``timeout`` seconds for new ones
+
+        Events that were already dropped are skipped; the ``seq`` of the
+        first one returned shows the gap.
+        """
+        with self._condition:
+            if since >= self.emitted and self.state not in (DONE, FAILED):
+                self._condition.wait(timeout)
+            return [event for event in self.events if event["seq"] >= since]
+
+    def summary(self):
+        return {
+            "id": self.id,
+            "username": self.username,
+            "state": self.state,
+            "deleted": self.deleted,
+            "error": self.error,
+            "created": self.created,
+            "started": self.started,
+            "finished": self.finished,
+            "events": self.emitted,
+        }
+
+def safe_name(username):
+    """A username made safe to use as a file or directory name"""
+    return re.sub(r"[^A-Za-z0-9_]", "_", username)
+
+class BrowserPool:
+    """Chrome instances kept running between jobs
+
+    Each account gets its own browser, which stays logged in after its first
+    job. ``spares`` unassigned browsers are launched ahead of time, so even
+    the first job of a new account does not wait for Chrome to start. The
+    session cookies of each account are saved in ``sessions_dir``, so a
+    spare browser can pick up an existing session without the login form.
+    """
+
+    def __init__(self, chrome_driver_path, headless=True, spares=1, lean_browsing=True, capture_network=False,
+                 sessions_dir="sessions"):
+        self.chrome_driver_path = chrome_driver_path
+        self.headless = headless
+        self.spares = spares
+        self.lean_browsing = lean_browsing
+        self.capture_network = capture_network
+        self.sessions_dir = sessions_dir
+        self._drivers = {}
+        self._spare = []
+        self._lock = threading.Lock()
+        self._filling = threading.Lock()
+        os.makedirs(sessions_dir, mode=0o700, exist_ok=True)
+
+    def _launch(self):
+        import delete_tweets
+        with delete_tweets.metrics.span("launch_browser"):
+            return delete_tweets.create_driver(self.chrome_driver_path, self.headless,
+                                               lean_browsing=self.lean_browsing,
+                                               capture_network=self.capture_network)
+
+    def fill(self):
+        """Launch spare browsers until ``spares`` are ready"""
+        if not self._filling.acquire(blocking=False):
+            return  # Another thread is already launching them
+        try:
+            while True:
+                with self._lock:
+                    if len(self._spare) >= self.spares:
+                        return
+                driver = self._launch()
+                with self._lock:
+                    self._spare.append(driver)
+                logger.info(f"Spare browser ready ({len(self._spare)}/{self.spares})")
+        finally:
+            self._filling.release()
+
+    def cookies_path(self, username):
+        return os.path.join(self.sessions_dir, f"{safe_name(username)}.json")
+
+    def checkout(self, username):
+        """The browser of an account: its warm one, a spare, or a newly launched one"""
+        with self._lock:
+            driver = self._drivers.pop(username.lower(), None)
+            if driver is None and self._spare:
+                driver = self._spare.pop()
+        if driver is None:
+            driver = self._launch()
+        # Replace the spare that was just used, in the background
+        threading.Thread(target=self.fill, daemon=True).start()
+        return driver
+
+    def checkin(self, username, driver):
+        """Keep a browser for the account's next job, or quit it if it no longer responds"""
+        try:
+            driver.current_url
+        except Exception:
+            logger.warning(f"Browser for @{username} stopped responding. It will be replaced.")
+            self.discard(driver)
+            return
+        with self._lock:
+            previous = self._drivers.pop(username.lower(), None)
+            self._drivers[username.lower()] = driver
+        if previous is not None and previous is not driver:
+            self.discard(previous)
+
+    def discard(self, driver):
+        try:
+            driver.quit()
+        except Exception:
+            pass
+
+    def warm(self, username, password, base_url):
+        """Log an account in ahead of its first job"""
+        import delete_tweets
+        driver = self.checkout(username)
+        try:
+            waiter = delete_tweets.WaitEngine(driver)
+            cookies_path = self.cookies_path(username)
+            if not delete_tweets.restore_session(driver, waiter, username, cookies_path, base_url=base_url):
+                delete_tweets.log_in(driver, waiter, username, password, base_url)
+                delete_tweets.save_session_cookies(driver, cookies_path)
+            logger.info(f"Browser for @{username} is logged in and waiting for jobs")
+        finally:
+            self.checkin(username, driver)
+
+    def status(self):
+        with self._lock:
+            return {"accounts": sorted(self._drivers), "spares": len(self._spare)}
+
+    def close(self):
+        with self._lock:
+            drivers = list(self._drivers.values()) + self._spare
+            self._drivers.clear()
+            self._spare = []
+        for driver in drivers:
+            self.discard(driver)
+
+class CleanerDaemon:
+    """Runs queued jobs one at a time on browsers from a BrowserPool
+
+    The file fields of a job (PATH_FIELDS) are resolved inside
+    ``files_dir``, and rejected if there is none.
+    """
+
+    def __init__(self, pool, base_url, history=100, files_dir=None):
+        self.pool = pool
+        self.base_url = base_url
+        self.files_dir = files_dir
+        self.jobs = collections.OrderedDict()
+        self.history = history
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def submit(self, spec):
+        """Queue a job. Raises ValueError if the spec is invalid."""
+        if not isinstance(spec, dict) or not spec.get("username"):
+            raise ValueError("A job needs a username")
+        unknown = set(spec) - set(JOB_FIELDS) - {"username", "password"}
+        if unknown:
+            raise ValueError(f"Unknown job field(s): {', '.join(sorted(unknown))}")
+        spec = dict(spec)
+        for field in PATH_FIELDS:
+            if spec.get(field):
+                spec[field] = confine_path(self.files_dir, str(spec[field]))
+        job = Job(spec)
+        with self._lock:
+            self.jobs[job.id] = job
+            while len(self.jobs) > self.history:
+                oldest = next(iter(self.jobs.values()))
+                if oldest.state not in (DONE, FAILED):
+                    break
+                self.jobs.popitem(last=False)
+        job.set_state(QUEUED, position=self._queue.qsize() + 1)
+        self._queue.put(job)
+        return job
+
+    def get(self, job_id):
+        with self._lock:
+            return self.jobs.get(job_id)
+
+    def list_jobs(self):
+        with self._lock:
+            return [job.summary() for job in self.jobs.values()]
+
+    def status(self):
+        return {"ok": True, "browsers": self.pool.status(), "queued": self._queue.qsize(),
+                "files_dir": os.path.realpath(self.files_dir) if self.files_dir else None}
+
+    def _run(self):
+        while True:
+            job = self._queue.get()
+            try:
+                self._execute(job)
+            except Exception as e:
+                logger.error(f"Job {job.id} failed: {e}")
+                job.error = str(e)
+                job.finished = time.time()
+                job.set_state(FAILED, error=job.error)
+
+    def _execute(self, job):
+        import delete_tweets
+        job.started = time.time()
+        job.set_state(RUNNING)
+        logger.info(f"Job {job.id}: cleaning @{job.username}")
+        driver = self.pool.checkout(job.username)
+        try:
+            arguments = {JOB_FIELDS[field]: value for field, value in job.spec.items() if field in JOB_FIELDS}
+            arguments.setdefault("max_delete", delete_tweets.MAX_TWEETS_TO_DELETE)
+            arguments.setdefault("sleep_time", delete_tweets.SLEEP_BETWEEN_ACTIONS)
+            arguments.setdefault("adaptive_rate", delete_tweets.ADAPTIVE_RATE)
+            arguments.setdefault("prune_dom", delete_tweets.DOM_PRUNING)
+            arguments.setdefault("heap_limit_mb", delete_tweets.HEAP_LIMIT_MB)
+            arguments.setdefault("recycle_every", delete_tweets.RECYCLE_EVERY)
+            deleted = delete_tweets.delete_tweets(
+                job.username, job.spec.get("password", ""), self.pool.chrome_driver_path,
+                self.pool.headless,
+                journal_path=delete_tweets.JOURNAL_PATH or None,
+                cookies_path=self.pool.cookies_path(job.username),
+                selector_stats_path=delete_tweets.SELECTOR_STATS_PATH or None,
+                base_url=self.base_url,
+                driver=driver,
+                progress_callback=job.emit,
+                lean_browsing=self.pool.lean_browsing,
+                raise_errors=True,
+                **arguments)
+        except delete_tweets.RunAborted as e:
+            job.deleted = e.deleted
+            raise
+        else:
+            job.deleted = deleted
+        finally:
+            self.pool.checkin(job.username, driver)
+        job.finished = time.time()
+        job.set_state(DONE, deleted=job.deleted, seconds=round(job.finished - job.started, 3))
+
+class DaemonHandler(BaseHTTPRequestHandler):
+    """Routes requests of the job API"""
+
+    server_version = "TwitterCleaner/1.0"
+    JOB_PATH = re.compile(r"^/jobs/(\d+)(/events)?$")
+
+    def log_message(self, format, *args):
+        logger.debug("api: " + format % args)
+
+    @property
+    def cleaner(self):
+        return self.server.cleaner
+
+    def _allowed(self):
+        """Check the token and that the request comes from a local, non-browser client; answer if not"""
+        host = urllib.parse.urlsplit(f"//{self.headers.get('Host', '')}").hostname
+        origin = self.headers.get("Origin")
+        if host not in LOCAL_HOSTS or (origin and urllib.parse.urlsplit(origin).hostname not in LOCAL_HOSTS):
+            self._json(403, {"error": "forbidden"})
+            return False
+        supplied = self.headers.get("Authorization", "")
+        if not hmac.compare_digest(supplied.encode("utf-8"), f"Bearer {self.server.token}".encode("utf-8")):
+            self._json(401, {"error": "missing or wrong token"})
+            return False
+        return True
+
+    def _json(self, status, payload):
+        data = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        if not self._allowed():
+            return
+        url = urllib.parse.urlsplit(self.path)
+        if url.path == "/health":
+            self._json(200, self.cleaner.status())
+            return
+        if url.path == "/jobs":
+            self._json(200, {"jobs": self.cleaner.list_jobs()})
+            return
+        match = self.JOB_PATH.match(url.path)
+        job = self.cleaner.get(match.group(1)) if match else None
+        if job is None:
+            self._json(404, {"error": "not found"})
+        elif match.group(2):
+            since = urllib.parse.parse_qs(url.query).get("since", ["0"])[0]
+            if not since.isdigit():
+                self._json(400, {"error": "since must be an event number"})
+                return
+            self._stream(job, int(since))
+        else:
+            self._json(200, job.summary())
+
+    def _stream(self, job, since=0):
+        """Send the job's events from number ``since`` on as NDJSON until it has finished"""
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-ndjson")
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        try:
+            while True:
+                events = job.events_after(since)
+                for event in events:
+                    self.wfile.write((json.dumps(event) + "\n").encode("utf-8"))
+                if events:
+                    since = events[-1]["seq"] + 1
+                self.wfile.flush()
+                if job.state in (DONE, FAILED) and since >= job.emitted:
+                    return
+        except (BrokenPipeError, ConnectionResetError):
+            # The client stopped listening; the job keeps running
+            return
+
+    def do_POST(self):
+        if not self._allowed():
+            return
+        if self.path != "/jobs":
+            self._json(404, {"error": "not found"})
+            return
+        if self.headers.get("Content-Type", "").split(";")[0].strip().lower() != "application/json":
+            self._json(415, {"error": "the body must be application/json"})
+            return
+        try:
+            length = int(self.headers.get("Content-Length") or 0)
+            job = self.cleaner.submit(json.loads(self.rfile.read(length) or b"{}"))
+        except ValueError as e:
+            self._json(400, {"error": str(e)})
+            return
+        self._json(202, job.summary())
+
+def _headers(token):
+    return {"Authorization": f"Bearer {token}"}
+
+def submit_job(daemon_url, spec, token):
+    """Post a job to a running daemon. Returns the job summary; raises ValueError if it is rejected."""
+    request = urllib.request.Request(f"{daemon_url.rstrip('/')}/jobs", data=json.dumps(spec).encode("utf-8"),
+                                     headers=dict(_headers(token), **{"Content-Type": "application/json"}),
+                                     method="POST")
+    try:
+        with urllib.request.urlopen(request, timeout=30) as response:
+            return json.loads(response.read().decode("utf-8"))
+    except urllib.error.HTTPError as e:
+        raise ValueError(f"Daemon rejected the job: {json.loads(e.read().decode('utf-8')).get('error')}") from None
+
+def get_status(daemon_url, token):
+    """The daemon's GET /health answer"""
+    request = urllib.request.Request(f"{daemon_url.rstrip('/')}/health", headers=_headers(token))
+    with urllib.request.urlopen(request, timeout=30) as response:
+        return json.loads(response.read().decode("utf-8"))
+
+def stream_events(daemon_url, job_id, token, since=0):
+    """Yield the progress events of a job, from event number ``since`` on, until it has finished"""
+    request = urllib.request.Request(f"{daemon_url.rstrip('/')}/jobs/{job_id}/events?since={int(since)}",
+                                     headers=_headers(token))
+    with urllib.request.urlopen(request) as response:
+        for line in response:
+            if line.strip():
+                yield json.loads(line.decode("utf-8"))
+
+def run_client(daemon_url, spec, token_path=DEFAULT_TOKEN_PATH):
+    """Thin client: run a job on the daemon and log its progress. Returns the number deleted.
+
+    The token is read as the daemon reads it (see load_token()). Local
+    file paths in the spec (PATH_FIELDS) are sent as names inside the
+    daemon's --files-dir (see files_dir_name()). Raises ValueError if there
+    is no token, a file is outside that directory or the job is rejected.
+    """
+    token = load_token(token_path)
+    if token is None:
+        raise ValueError(f"No daemon token: set {TOKEN_ENV} or point to the daemon's token file")
+    if any(spec.get(field) for field in PATH_FIELDS):
+        files_dir = get_status(daemon_url, token).get("files_dir")
+        spec = dict(spec, **{field: files_dir_name(files_dir, spec[field])
+                             for field in PATH_FIELDS if spec.get(field)})
+    job = submit_job(daemon_url, spec, token)
+    logger.info(f"Submitted job {job['id']} for @{spec['username']} to {daemon_url}")
+    deleted = 0
+    for event in stream_events(daemon_url, job["id"], token):
+        if event.get("event") == "post":
+            deleted = event["deleted"]
+            logger.info(f"{event['status']} {event['id']} ({event['deleted']} deleted, {event['duration']:.2f}s)")
+        elif event.get("event") == "job":
+            logger.info(f"Job {job['id']} {event['state']}"
+                        + (f": {event['error']}" if event.get("error") else ""))
+            if event["state"] == DONE:
+                deleted = event.get("deleted", deleted)
+    return deleted
+
+def parse_arguments():
+    """Parse command line arguments"""
+    parser = argparse.ArgumentParser(description='Keep warm browsers and run cleanup jobs from a local HTTP API')
+    parser.add_argument('--host', default='127.0.0.1', help='Address to listen on (keep it local)')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT, help='Port to listen on')
+    parser.add_argument('--token-file', metavar='PATH',
+                        help=f'API token file, created with mode 0600 if missing (default: DAEMON_TOKEN_PATH); '
+                             f'{TOKEN_ENV} takes precedence')
+    parser.add_argument('--files-dir', metavar='PATH',
+                        help='Directory that job archive, plan and manifest file names refer to '
+                             '(without it jobs cannot name files)')
+    parser.add_argument('--spares', type=int, default=1, help='Browsers to keep launched ahead of new accounts')
+    parser.add_argument('--sessions-dir', default='sessions', help='Where session cookies are kept per account')
+    parser.add_argument('--no-warm', action='store_true', help='Do not log in the configured account at startup')
+    return parser.parse_args()
+
+if __name__ == "__main__":
+    import delete_tweets
+
+    args = parse_arguments()
+    delete_tweets.configure_logging()
+    try:
+        token = load_token(args.token_file or delete_tweets.DAEMON_TOKEN_PATH, create=True)
+    except (OSError, ValueError) as e:
+        token = None
+        logger.error(str(e))
+    if not token:
+        logger.error("The daemon needs an API token")
+        raise SystemExit(1)
+    pool = BrowserPool(delete_tweets.CHROME_DRIVER_PATH or None, delete_tweets.HEADLESS, args.spares,
+                       delete_tweets.LEAN_BROWSING, delete_tweets.NETWORK_REPLAY, args.sessions_dir)
+    cleaner = CleanerDaemon(pool, delete_tweets.BASE_URL, files_dir=args.files_dir).start()
+    pool.fill()
+    if delete_tweets.TWITTER_USERNAME and delete_tweets.TWITTER_PASSWORD and not args.no_warm:
+        pool.warm(delete_tweets.TWITTER_USERNAME, delete_tweets.TWITTER_PASSWORD, delete_tweets.BASE_URL)
+
+    httpd = ThreadingHTTPServer((args.host, args.port), DaemonHandler)
+    httpd.daemon_threads = True
+    httpd.cleaner = cleaner
+    httpd.token = token
+    logger.info(f"Cleaner daemon listening on http://{args.host}:{args.port}")
+    try:
+        httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        httpd.server_close()
+        pool.close()
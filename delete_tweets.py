@@ -7,25 +7,32 @@ import time
 import datetime
 import logging
 import argparse
+import collections
+import fnmatch
+import json
+import os
 import sys
-from selenium import webdriver
+import threading
+import urllib.parse
+# The rest of Selenium (the Chrome driver, waits, expected conditions) is imported
+# where it is used: it takes longer to load than everything else here together,
+# and --help, planning and dry runs never need it
 from selenium.webdriver.common.by import By
 from selenium.webdriver.common.keys import Keys
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver import ChromeOptions
-from selenium.common.exceptions import TimeoutException, NoSuchElementException
-
-# Set up logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler("twitter_cleaner.log"),
-        logging.StreamHandler(sys.stdout)
-    ]
-)
+from selenium.common.exceptions import TimeoutException
+from archive import load_archive_index
+from journal import CheckpointJournal
+from instrumentation import metrics
+from replay import STATUS_ID_JS, NetworkReplayer
+from pacing import SUCCESS_STATUSES, AdaptiveRate
+from filters import PostFilter, compile_filter
+from cdp import CDPDriver
+from drivercache import resolve_driver
+from recycling import PageRecycler
+from manifest import ManifestProducer, ManifestWriter, log_plan_summary, manifest_counts
+from logsetup import LOG_FORMAT, log_step, setup_logging
+
+# Logging is set up by configure_logging() when a run starts
 logger = logging.getLogger("TwitterCleaner")
 
 # Default configuration (will be overridden by config.py if available)
@@ -36,8 +43,57 @@ HEADLESS = False  # Run browser in headless mode
 SLEEP_BETWEEN_ACTIONS = 1  # Seconds to wait between actions
 MAX_TWEETS_TO_DELETE = 100  # Maximum number of tweets to delete
 DEBUG_MODE = False  # Enable additional debug output
+WAIT_TIMEOUT = 5  # Maximum seconds to wait for elements
+POLL_FREQUENCY = 0.05  # Seconds between checks while waiting for elements
+WORKERS = 1  # Number of parallel deletion workers
+WORKER_MODE = "tabs"  # "tabs" (one browser) or "browsers" (one Chrome per worker)
+ARCHIVE_PATH = ""  # Twitter/X data export (ZIP, folder or tweets.js) to delete from
+JOURNAL_PATH = "twitter_cleaner_journal.db"  # SQLite checkpoint journal (empty to disable)
+CHROME_PROFILE_DIR = ""  # Chrome user data dir to keep the session in between runs
+COOKIES_PATH = ""  # File to save the session cookies to and restore them from
+SELECTOR_STATS_PATH = "selector_stats.json"  # Where selector hit/miss statistics are kept
+BASE_URL = "https://x.com"  # Site to clean (a local mock server for benchmarks)
+METRICS_JSON_PATH = ""  # Write timing histograms and counters as JSON (empty to disable)
+METRICS_PROMETHEUS_PATH = ""  # Write them as a Prometheus textfile (empty to disable)
+METRICS_EXPORT_EVERY = 0  # Also export every N deletions while running (0 = only at the end)
+LEAN_BROWSING = True  # Block images, video and fonts the cleaner never looks at
+# URL patterns (* wildcards) blocked in lean browsing mode
+BLOCKED_URL_PATTERNS = [
+    "*pbs.twimg.com/*", "*video.twimg.com/*", "*ton.twimg.com/*",
+    "*.jpg*", "*.jpeg*", "*.png*", "*.gif*", "*.webp*",
+    "*.mp4*", "*.m3u8*", "*.m4s*",
+    "*.woff*", "*.ttf*", "*.otf*",
+]
+ALLOWED_URL_PATTERNS = []  # Patterns to take back out of BLOCKED_URL_PATTERNS
+NETWORK_REPLAY = False  # Delete by replaying the page's own delete requests after one UI deletion
+REPLAY_CONCURRENCY = 4  # Replayed requests in flight at once
+ADAPTIVE_RATE = True  # Tune the delay between deletions (and concurrency) from how the site responds
+MIN_SLEEP = 0.0  # Shortest delay between deletions the adaptive rate may use
+MAX_SLEEP = 30.0  # Longest delay between deletions the adaptive rate may use
+DAEMON_URL = ""  # Run jobs on a warm-browser daemon (daemon.py) instead, e.g. "http://127.0.0.1:8765"
+DAEMON_TOKEN_PATH = "daemon.token"  # The daemon's API token file (or set TWITTER_CLEANER_DAEMON_TOKEN)
+CDP_TRANSPORT = False  # Run the deletion loop's page scripts over a direct DevTools websocket
+DELETE_FILTER = {}  # Only delete matching posts, e.g. {"before": "2020-01-01", "keep_min_likes": 100}
+DOM_PRUNING = True  # Empty handled articles that have scrolled out of view, so the page stays small
+HEAP_LIMIT_MB = 768  # Reload the page when its JS heap grows past this (0 to disable)
+RECYCLE_EVERY = 0  # Also reload the page every N deletions (0 to disable)
+LOOKAHEAD = 2  # Start loading the next page of the timeline when this few posts are left to delete
+# Loading the next page scrolls to the bottom, and X unmounts the posts that
+# end up far above the viewport: only prefetch when the queued posts are few
+# enough to still be near the bottom, or each would wait out the timeout
+MAX_LOOKAHEAD = 3
+TAB_POLL_INTERVAL = 0.05  # Seconds between rounds of checking the worker tabs for finished deletions
+ATTACH_ADDRESS = ""  # Use an already running Chrome at this DevTools address (e.g. "127.0.0.1:9222")
+DRIVER_CACHE_PATH = "driver_cache.json"  # Where the ChromeDriver found by Selenium Manager is remembered
+LOG_PATH = "twitter_cleaner.log"  # Log file (empty for console only)
+ASYNC_LOGGING = True  # Write logs from a background thread instead of the deletion loop
+LOG_MAX_MB = 50  # Rotate the log files at this size, keeping LOG_BACKUPS gzipped old files (0 = never)
+LOG_BACKUPS = 5
+STEP_LOG_PATH = ""  # Write per-step timings and chatter here as JSON lines instead of to the log
+STEP_LOG_SAMPLE = 1.0  # Fraction of those step events to keep
 
 # Try to load configuration from config.py
+_config_missing = False
 try:
     from config import (
         TWITTER_USERNAME, TWITTER_PASSWORD, CHROME_DRIVER_PATH,
@@ -45,16 +101,225 @@ try:
         DEBUG_MODE
     )
 except ImportError:
-    logger.warning("config.py not found. Please create one using config.example.py as a template.")
-    if not TWITTER_USERNAME or not TWITTER_PASSWORD:
-        logger.error("Twitter/X credentials not set! Please set them in config.py or via command line arguments.")
-        sys.exit(1)
+    # Credentials can still come from the command line; they are checked before running.
+    # configure_logging() warns about it, so the warning reaches the configured log.
+    _config_missing = True
+
+# Optional advanced settings (older config.py files may not define them)
+try:
+    import config as _user_config
+except ImportError:
+    _user_config = None
+
+def _optional_setting(name, default):
+    """Return an optional setting from config.py, falling back to the default"""
+    return getattr(_user_config, name, default)
+
+WAIT_TIMEOUT = _optional_setting("WAIT_TIMEOUT", WAIT_TIMEOUT)
+POLL_FREQUENCY = _optional_setting("POLL_FREQUENCY", POLL_FREQUENCY)
+WORKERS = _optional_setting("WORKERS", WORKERS)
+WORKER_MODE = _optional_setting("WORKER_MODE", WORKER_MODE)
+ARCHIVE_PATH = _optional_setting("ARCHIVE_PATH", ARCHIVE_PATH)
+JOURNAL_PATH = _optional_setting("JOURNAL_PATH", JOURNAL_PATH)
+CHROME_PROFILE_DIR = _optional_setting("CHROME_PROFILE_DIR", CHROME_PROFILE_DIR)
+COOKIES_PATH = _optional_setting("COOKIES_PATH", COOKIES_PATH)
+SELECTOR_STATS_PATH = _optional_setting("SELECTOR_STATS_PATH", SELECTOR_STATS_PATH)
+BASE_URL = _optional_setting("BASE_URL", BASE_URL)
+METRICS_JSON_PATH = _optional_setting("METRICS_JSON_PATH", METRICS_JSON_PATH)
+METRICS_PROMETHEUS_PATH = _optional_setting("METRICS_PROMETHEUS_PATH", METRICS_PROMETHEUS_PATH)
+METRICS_EXPORT_EVERY = _optional_setting("METRICS_EXPORT_EVERY", METRICS_EXPORT_EVERY)
+LEAN_BROWSING = _optional_setting("LEAN_BROWSING", LEAN_BROWSING)
+BLOCKED_URL_PATTERNS = _optional_setting("BLOCKED_URL_PATTERNS", BLOCKED_URL_PATTERNS)
+ALLOWED_URL_PATTERNS = _optional_setting("ALLOWED_URL_PATTERNS", ALLOWED_URL_PATTERNS)
+NETWORK_REPLAY = _optional_setting("NETWORK_REPLAY", NETWORK_REPLAY)
+REPLAY_CONCURRENCY = _optional_setting("REPLAY_CONCURRENCY", REPLAY_CONCURRENCY)
+ADAPTIVE_RATE = _optional_setting("ADAPTIVE_RATE", ADAPTIVE_RATE)
+MIN_SLEEP = _optional_setting("MIN_SLEEP", MIN_SLEEP)
+MAX_SLEEP = _optional_setting("MAX_SLEEP", MAX_SLEEP)
+CDP_TRANSPORT = _optional_setting("CDP_TRANSPORT", CDP_TRANSPORT)
+DAEMON_URL = _optional_setting("DAEMON_URL", DAEMON_URL)
+DAEMON_TOKEN_PATH = _optional_setting("DAEMON_TOKEN_PATH", DAEMON_TOKEN_PATH)
+DELETE_FILTER = _optional_setting("DELETE_FILTER", DELETE_FILTER)
+DOM_PRUNING = _optional_setting("DOM_PRUNING", DOM_PRUNING)
+HEAP_LIMIT_MB = _optional_setting("HEAP_LIMIT_MB", HEAP_LIMIT_MB)
+RECYCLE_EVERY = _optional_setting("RECYCLE_EVERY", RECYCLE_EVERY)
+LOOKAHEAD = _optional_setting("LOOKAHEAD", LOOKAHEAD)
+ATTACH_ADDRESS = _optional_setting("ATTACH_ADDRESS", ATTACH_ADDRESS)
+DRIVER_CACHE_PATH = _optional_setting("DRIVER_CACHE_PATH", DRIVER_CACHE_PATH)
+LOG_PATH = _optional_setting("LOG_PATH", LOG_PATH)
+ASYNC_LOGGING = _optional_setting("ASYNC_LOGGING", ASYNC_LOGGING)
+LOG_MAX_MB = _optional_setting("LOG_MAX_MB", LOG_MAX_MB)
+LOG_BACKUPS = _optional_setting("LOG_BACKUPS", LOG_BACKUPS)
+STEP_LOG_PATH = _optional_setting("STEP_LOG_PATH", STEP_LOG_PATH)
+STEP_LOG_SAMPLE = _optional_setting("STEP_LOG_SAMPLE", STEP_LOG_SAMPLE)
+
+def configure_logging(fmt=LOG_FORMAT):
+    """Set up logging from the LOG_* and STEP_LOG_* settings (see logsetup.setup_logging())
+
+    Also warns, now that the log is in place, if config.py could not be loaded.
+    """
+    listener = setup_logging(LOG_PATH or None, ASYNC_LOGGING, LOG_MAX_MB, LOG_BACKUPS, STEP_LOG_PATH or None,
+                             STEP_LOG_SAMPLE, fmt)
+    if _config_missing:
+        logger.warning("config.py not found. Please create one using config.example.py as a template.")
+    return listener
+
+# Named DOM conditions the wait engine can watch for. Expects `target` to be
+# defined (an optional element the condition refers to).
+DOM_CONDITIONS = """
+var conditions = {
+    menu_open: function () {
+        return document.querySelector('[role="menu"] [role="menuitem"]') !== null;
+    },
+    menu_closed: function () {
+        return document.querySelector('[role="menu"]') === null;
+    },
+    confirmation_sheet: function () {
+        return document.querySelector(
+            '[data-testid="confirmationSheetConfirm"], [data-testid="unretweetConfirm"]') !== null;
+    },
+    confirmation_closed: function () {
+        return document.querySelector(
+            '[data-testid="confirmationSheetConfirm"], [data-testid="unretweetConfirm"]') === null;
+    },
+    article_removed: function () {
+        return !target || !target.isConnected || target.offsetParent === null;
+    },
+    caret_present: function () {
+        return document.querySelector('div[data-testid="caret"]') !== null;
+    }
+};
+"""
+
+# In-page wait: resolves as soon as a named DOM condition holds, using a
+# MutationObserver so we react to the page instead of sleeping for a fixed time.
+# Arguments: condition name, optional target element, timeout in milliseconds.
+WAIT_FOR_CONDITION_JS = """
+var name = arguments[0];
+var target = arguments[1];
+var timeoutMs = arguments[2];
+var done = arguments[arguments.length - 1];
+""" + DOM_CONDITIONS + """
+var check = conditions[name];
+if (!check) {
+    done({ok: false, reason: 'unknown condition: ' + name});
+    return;
+}
+if (check()) {
+    done({ok: true});
+    return;
+}
+
+var finished = false;
+var observer = new MutationObserver(function () {
+    if (check()) { finish(true); }
+});
+var timer = setTimeout(function () { finish(check()); }, timeoutMs);
+function finish(ok) {
+    if (finished) { return; }
+    finished = true;
+    observer.disconnect();
+    clearTimeout(timer);
+    done({ok: ok});
+}
+observer.observe(document.documentElement, {
+    childList: true, subtree: true, attributes: true,
+    attributeFilter: ['style', 'class', 'aria-hidden', 'data-testid']
+});
+"""
+
+# Synchronous check of a named DOM condition, used when async scripts are unavailable
+CHECK_CONDITION_JS = """
+var name = arguments[0];
+var target = arguments[1];
+""" + DOM_CONDITIONS + """
+return conditions[name] ? Boolean(conditions[name]()) : false;
+"""
+
+class WaitEngine:
+    """Wait for page conditions instead of sleeping for a fixed amount of time.
+
+    ``floor`` is an optional politeness delay: pace() makes sure at least that
+    many seconds pass between consecutive deletions, but only sleeps for the
+    part that has not already been spent waiting on the page. With an
+    AdaptiveRate ``rate`` its current delay is used as the floor instead.
+    """
+
+    def __init__(self, driver, timeout=WAIT_TIMEOUT, poll_frequency=POLL_FREQUENCY, floor=0, rate=None):
+        self.driver = driver
+        self.timeout = timeout
+        self.poll_frequency = poll_frequency
+        self._floor = floor
+        self.rate = rate
+        self._last_pace = time.monotonic()
+
+    @property
+    def floor(self):
+        return self.rate.delay if self.rate is not None else self._floor
+
+    def until(self, condition, timeout=None):
+        """Wait for a Selenium expected condition, polling tightly. Raises TimeoutException."""
+        from selenium.webdriver.support.ui import WebDriverWait
+
+        if timeout is None:
+            timeout = self.timeout
+        return WebDriverWait(self.driver, timeout, poll_frequency=self.poll_frequency).until(condition)
+
+    def quietly(self, condition, timeout=None):
+        """Like until(), but return None instead of raising on timeout"""
+        try:
+            return self.until(condition, timeout)
+        except TimeoutException:
+            metrics.count("timeouts")
+            return None
+
+    def condition(self, name, target=None, timeout=None):
+        """Wait in the page for a named DOM condition (see WAIT_FOR_CONDITION_JS).
+
+        Returns True if the condition was met before the timeout.
+        """
+        if timeout is None:
+            timeout = self.timeout
+        try:
+            self.driver.set_script_timeout(timeout + 1)
+            result = self.driver.execute_async_script(
+                WAIT_FOR_CONDITION_JS, name, target, int(timeout * 1000))
+            if result and result.get("ok"):
+                return True
+            metrics.count("timeouts")
+            return False
+        except TimeoutException:
+            metrics.count("timeouts")
+            return False
+        except Exception as e:
+            # Fall back to polling from Python if the in-page wait cannot run
+            logger.debug(f"In-page wait for {name} failed ({type(e).__name__}), polling instead")
+            return self.quietly(
+                lambda d: d.execute_script(CHECK_CONDITION_JS, name, target), timeout) is not None
+
+    def pace(self):
+        """Apply the politeness floor between deletions"""
+        if self.floor:
+            remaining = self.floor - (time.monotonic() - self._last_pace)
+            if remaining > 0:
+                time.sleep(remaining)
+        self._last_pace = time.monotonic()
+
+def next_login_field(previous_field):
+    """Expected condition: the next login input (password or another username prompt)"""
+    def condition(driver):
+        for field in driver.find_elements(By.CSS_SELECTOR, 'input[name="password"], input[name="text"]'):
+            if field != previous_field:
+                return field
+        return False
+    return condition
 
 def log_time(action, start_time):
-    """Log the time taken for an action"""
-    end_time = time.time()
+    """Log the time taken since ``start_time`` (time.monotonic()) and add it to the current span"""
+    end_time = time.monotonic()
     elapsed = end_time - start_time
-    logger.info(f"[TIMING] {action}: {elapsed:.3f} seconds")
+    metrics.record(action, elapsed, nested=True)
+    log_step("[TIMING] %s: %.3f seconds", action, elapsed, event="timing", name=action, seconds=round(elapsed, 4))
     return end_time
 
 def enable_performance_options(options):
@@ -66,448 +331,2040 @@ def enable_performance_options(options):
     options.add_argument("--disable-infobars")
     options.add_argument("--disable-notifications")
     options.add_argument("--dns-prefetch-disable")
+    # Keep background tabs running at full speed for tab workers
+    options.add_argument("--disable-background-timer-throttling")
+    options.add_argument("--disable-backgrounding-occluded-windows")
+    options.add_argument("--disable-renderer-backgrounding")
+    return options
+
+def enable_lean_options(options):
+    """Stop Chrome from loading images and autoplaying media"""
+    options.add_experimental_option("prefs", {
+        "profile.managed_default_content_settings.images": 2,
+    })
+    options.add_argument("--blink-settings=imagesEnabled=false")
+    options.add_argument("--autoplay-policy=user-gesture-required")
     return options
 
-def delete_tweets(username, password, chrome_driver_path, headless=True, sleep_time=0.5, max_delete=float('inf')):
-    """Main function to delete tweets, retweets, and replies from a Twitter/X account"""
+def lean_url_patterns(blocked=None, allowed=None):
+    """The URL patterns to block: BLOCKED_URL_PATTERNS minus those matched by ALLOWED_URL_PATTERNS
+
+    Chrome's URL blocking has no exceptions, so an allow pattern removes
+    every block pattern it matches (e.g. "*.png*" or "*twimg.com*").
+    """
+    blocked = BLOCKED_URL_PATTERNS if blocked is None else blocked
+    allowed = ALLOWED_URL_PATTERNS if allowed is None else allowed
+    return [pattern for pattern in blocked
+            if not any(fnmatch.fnmatchcase(pattern, allow) for allow in allowed)]
+
+def block_urls(driver, patterns):
+    """Block requests matching the patterns in the current tab through the DevTools protocol"""
+    if not patterns:
+        return
     try:
-        # Start overall timing
-        overall_start_time = time.time()
-        cycle_start_time = time.time()
-        deleted_count = 0
-        
-        logger.info(f"Starting tweet deletion for user @{username}")
-        logger.info(f"Maximum tweets to delete: {max_delete}")
-        
-        # Set up Chrome driver
-        service = Service(executable_path=chrome_driver_path)
-        options = ChromeOptions()
-
-        if headless:
-            options.add_argument("--headless=new")
-            logger.info("Running in headless mode")
-
-        # Configure browser options
-        options.add_argument("user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/123.0.0.0 Safari/537.36")
-        options.add_argument("--disable-blink-features=AutomationControlled")
-        options.add_experimental_option("excludeSwitches", ["enable-automation"])
-        options.add_experimental_option('useAutomationExtension', False)
-        options.add_argument("--accept-insecure-certs=true")
-        options.add_argument("--window-size=1920,1080")
-        options.add_argument("--disable-notifications")
-        options.add_argument("--disable-popup-blocking")
-        
-        # Add performance options
-        options = enable_performance_options(options)
+        driver.execute_cdp_cmd("Network.enable", {})
+        driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": list(patterns)})
+    except Exception as e:
+        logger.warning(f"Could not enable request blocking: {e}")
+
+def create_driver(chrome_driver_path, headless=True, profile_dir=None, lean_browsing=False, capture_network=False,
+                  attach=None):
+    """Launch a Chrome instance configured for the cleaner
+
+    Without ``chrome_driver_path`` the chromedriver matching the installed
+    Chrome is looked up once and remembered in DRIVER_CACHE_PATH (see
+    drivercache.resolve_driver()).
 
+    ``profile_dir`` keeps cookies and storage in a persistent Chrome user
+    data directory, so a logged-in session survives between runs.
+
+    With ``lean_browsing`` images are disabled and requests for media, video
+    and fonts (see lean_url_patterns()) are blocked, so each scroll only
+    loads the markup the cleaner works with.
+
+    ``capture_network`` turns on Chrome's performance log, from which
+    NetworkReplayer picks up the page's own delete requests.
+
+    With ``attach`` ("host:port") no browser is started: the driver connects
+    to a Chrome already running with --remote-debugging-port, and the
+    options above that only apply at launch are ignored. Quitting such a
+    driver leaves the browser open.
+    """
+    from selenium import webdriver
+    from selenium.webdriver.chrome.service import Service
+
+    driver_path, browser_path = resolve_driver(chrome_driver_path, DRIVER_CACHE_PATH)
+    service = Service(executable_path=driver_path)
+    options = webdriver.ChromeOptions()
+
+    if attach:
+        options.debugger_address = attach
+        if capture_network:
+            options.set_capability("goog:loggingPrefs", {"performance": "ALL"})
         driver = webdriver.Chrome(service=service, options=options)
-        wait = WebDriverWait(driver, 5)  # Wait timeout in seconds
-
-        # Log in to Twitter/X
-        logger.info("Navigating to login page...")
-        time_start = time.time()
-        driver.get("https://x.com/login")
-        time_start = log_time("Navigate to login page", time_start)
-
-        logger.info("Entering username...")
-        time_start = time.time()
-        username_field = wait.until(EC.presence_of_element_located((By.NAME, "text")))
-        time_start = log_time("Find username field", time_start)
-        username_field.send_keys(username)
-        username_field.send_keys(Keys.RETURN)
-        time_start = log_time("Enter username", time_start)
-        time.sleep(sleep_time)
-
-        # Handle username verification if needed
-        try:
-            username_field2 = wait.until(EC.presence_of_element_located((By.NAME, "text")))
-            logger.info("Additional username verification required")
-            username_field2.send_keys(username)
-            username_field2.send_keys(Keys.RETURN)
-            time.sleep(sleep_time)
-        except:
-            pass
-
-        logger.info("Entering password...")
-        time_start = time.time()
-        password_field = wait.until(EC.presence_of_element_located((By.NAME, "password")))
-        time_start = log_time("Find password field", time_start)
-        password_field.send_keys(password)
-        password_field.send_keys(Keys.RETURN)
-        time_start = log_time("Enter password", time_start)
-        time.sleep(sleep_time)
-
-        logger.info(f"Page title after login: {driver.title}")
-        profile_url = f"https://x.com/{username}"
+        logger.info(f"Attached to Chrome at {attach}")
+        if lean_browsing:
+            block_urls(driver, lean_url_patterns())
+        return driver
+
+    if browser_path:
+        options.binary_location = browser_path
+    if profile_dir:
+        options.add_argument(f"--user-data-dir={os.path.abspath(profile_dir)}")
+        logger.info(f"Using Chrome profile in {profile_dir}")
+
+    if headless:
+        options.add_argument("--headless=new")
+        logger.info("Running in headless mode")
+
+    # Configure browser options
+    options.add_argument("user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/123.0.0.0 Safari/537.36")
+    options.add_argument("--disable-blink-features=AutomationControlled")
+    options.add_experimental_option("excludeSwitches", ["enable-automation"])
+    options.add_experimental_option('useAutomationExtension', False)
+    options.add_argument("--accept-insecure-certs=true")
+    options.add_argument("--window-size=1920,1080")
+    options.add_argument("--disable-notifications")
+    options.add_argument("--disable-popup-blocking")
+
+    # Add performance options
+    options = enable_performance_options(options)
+    if lean_browsing:
+        options = enable_lean_options(options)
+    if capture_network:
+        options.set_capability("goog:loggingPrefs", {"performance": "ALL"})
+        options.add_experimental_option("perfLoggingPrefs", {"enableNetwork": True, "enablePage": False})
+
+    driver = webdriver.Chrome(service=service, options=options)
+    if lean_browsing:
+        block_urls(driver, lean_url_patterns())
+        logger.info("Lean browsing: images, video and fonts are not loaded")
+    return driver
+
+def log_in(driver, waiter, username, password, base_url=BASE_URL):
+    """Log in to Twitter/X through the login form"""
+    from selenium.webdriver.support.ui import WebDriverWait
+    from selenium.webdriver.support import expected_conditions as EC
+
+    wait = WebDriverWait(driver, waiter.timeout, poll_frequency=waiter.poll_frequency)
+
+    logger.info("Navigating to login page...")
+    time_start = time.monotonic()
+    driver.get(f"{base_url}/login")
+    time_start = log_time("Navigate to login page", time_start)
+
+    logger.info("Entering username...")
+    time_start = time.monotonic()
+    username_field = wait.until(EC.presence_of_element_located((By.NAME, "text")))
+    time_start = log_time("Find username field", time_start)
+    username_field.send_keys(username)
+    username_field.send_keys(Keys.RETURN)
+    time_start = log_time("Enter username", time_start)
+
+    # Wait for the next step: either the password field or a second username prompt
+    next_field = waiter.quietly(next_login_field(username_field))
+
+    # Handle username verification if needed
+    if next_field is not None and next_field.get_attribute("name") == "text":
+        logger.info("Additional username verification required")
+        next_field.send_keys(username)
+        next_field.send_keys(Keys.RETURN)
+
+    logger.info("Entering password...")
+    time_start = time.monotonic()
+    password_field = wait.until(EC.presence_of_element_located((By.NAME, "password")))
+    time_start = log_time("Find password field", time_start)
+    password_field.send_keys(password)
+    password_field.send_keys(Keys.RETURN)
+    time_start = log_time("Enter password", time_start)
+    waiter.quietly(lambda d: "/login" not in d.current_url and "/flow/" not in d.current_url)
+
+    logger.info(f"Page title after login: {driver.title}")
+
+# Whether the current page belongs to a logged-in session: "authenticated",
+# "anonymous", or null while the page has not rendered enough to tell
+SESSION_STATE_JS = """
+if (document.querySelector('[data-testid="SideNav_AccountSwitcher_Button"], a[data-testid="AppTabBar_Profile_Link"]')) {
+    return 'authenticated';
+}
+if (location.pathname.indexOf('/login') !== -1 || location.pathname.indexOf('/i/flow/') !== -1 ||
+        document.querySelector('[data-testid="loginButton"], a[href="/login"]')) {
+    return 'anonymous';
+}
+return null;
+"""
+
+def load_session_cookies(path):
+    """Read cookies saved by save_session_cookies(), or None if there are none"""
+    if not path or not os.path.exists(path):
+        return None
+    try:
+        with open(path, "r", encoding="utf-8") as cookie_file:
+            return json.load(cookie_file)
+    except (OSError, ValueError) as e:
+        logger.warning(f"Could not read saved cookies from {path}: {e}")
+        return None
+
+def save_session_cookies(driver, path):
+    """Save the browser's Twitter/X cookies so the next run can skip the login flow"""
+    cookies = driver.get_cookies()
+    # The file holds session tokens: keep it readable by the owner only. The
+    # mode given to os.open only applies to a new file, so an existing one is
+    # tightened too.
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    with os.fdopen(fd, "w", encoding="utf-8") as cookie_file:
+        json.dump(cookies, cookie_file)
+    os.chmod(path, 0o600)
+    logger.info(f"Saved {len(cookies)} session cookies to {path}")
+
+def switch_to_profile_tab(driver, username, base_url=BASE_URL):
+    """Switch to an open tab showing the user's profile (posts or replies). Returns whether there was one."""
+    profile_url = f"{base_url}/{username}".lower()
+    current = driver.current_window_handle
+    for handle in [current] + [handle for handle in driver.window_handles if handle != current]:
+        if handle != current:
+            driver.switch_to.window(handle)
+        url = driver.current_url.lower().split("?")[0].rstrip("/")
+        if url in (profile_url, profile_url + "/with_replies"):
+            return True
+    if driver.current_window_handle != current:
+        driver.switch_to.window(current)
+    return False
+
+def restore_session(driver, waiter, username, cookies_path=None, profile_dir=None, base_url=BASE_URL,
+                    attached=False):
+    """Try to reuse a saved session instead of logging in
+
+    Installs saved cookies (if any), then loads the profile page once and
+    checks whether it renders as logged in. Returns True if the session is
+    valid; the profile page is then already open.
+
+    In an ``attached`` browser (one the cleaner did not start) the session
+    is the browser's own, and a tab that already shows the profile is used
+    as it is, without loading anything.
+    """
+    if attached and switch_to_profile_tab(driver, username, base_url):
+        if waiter.quietly(lambda d: d.execute_script(SESSION_STATE_JS)) == "authenticated":
+            logger.info("Using the profile tab already open in the attached browser.")
+            return True
+    cookies = load_session_cookies(cookies_path)
+    if cookies:
+        set_cookies(driver, cookies)
+    elif not (profile_dir or attached):
+        return False
+
+    time_start = time.monotonic()
+    driver.get(f"{base_url}/{username}")
+    state = waiter.quietly(lambda d: d.execute_script(SESSION_STATE_JS))
+    log_time("Validate saved session", time_start)
+    if state == "authenticated":
+        logger.info("Saved session is valid. Skipping login.")
+        return True
+    logger.info("Saved session is not logged in. Falling back to the login flow.")
+    return False
+
+def open_profile(driver, waiter, username, navigate=True, base_url=BASE_URL):
+    """Open the user's profile (replies tab if available) and clear overlays"""
+    from selenium.webdriver.support import expected_conditions as EC
+
+    if navigate:
+        profile_url = f"{base_url}/{username}"
         logger.info(f"Navigating to profile page: {profile_url}")
-        time_start = time.time()
+        time_start = time.monotonic()
         driver.get(profile_url)
+        waiter.quietly(EC.presence_of_element_located((By.CSS_SELECTOR, 'div[data-testid="primaryColumn"]')))
         time_start = log_time("Navigate to profile page", time_start)
-        time.sleep(sleep_time)
 
-        # Handle overlays and popups
-        try:
-            logger.info("Checking for overlays or popups...")
-            driver.execute_script("""
-                // Remove overlay elements that might intercept clicks
-                var overlays = document.querySelectorAll('.r-1habvwh, .r-1xcajam, [role="dialog"]');
-                for (var i = 0; i < overlays.length; i++) {
-                    overlays[i].style.display = 'none';
-                }
-                
-                // Remove fixed position elements that might be in the way
-                var fixed = document.querySelectorAll('.r-fixedPositive, .r-1kihuf0, .r-1upvrn0');
-                for (var i = 0; i < fixed.length; i++) {
-                    fixed[i].style.display = 'none';
-                }
-            """)
-        except:
-            pass
+    # Handle overlays and popups
+    try:
+        logger.info("Checking for overlays or popups...")
+        driver.execute_script("""
+            // Remove overlay elements that might intercept clicks
+            var overlays = document.querySelectorAll('.r-1habvwh, .r-1xcajam, [role="dialog"]');
+            for (var i = 0; i < overlays.length; i++) {
+                overlays[i].style.display = 'none';
+            }
+            
+            // Remove fixed position elements that might be in the way
+            var fixed = document.querySelectorAll('.r-fixedPositive, .r-1kihuf0, .r-1upvrn0');
+            for (var i = 0; i < fixed.length; i++) {
+                fixed[i].style.display = 'none';
+            }
+        """)
+    except:
+        pass
+    
+    # First navigate to the replies tab to clean those too
+    try:
+        logger.info("Checking for replies tab...")
+        time_start = time.monotonic()
+        replies_tab = driver.find_element(By.XPATH, '//a[contains(@href, "/with_replies")]')
+        driver.execute_script("arguments[0].click();", replies_tab)
+        waiter.quietly(EC.url_contains("/with_replies"))
+        log_time("Navigate to replies tab", time_start)
+    except:
+        logger.info("Could not find replies tab. Staying on main profile.")
         
-        # First navigate to the replies tab to clean those too
+    # Scroll to load content
+    driver.execute_script("window.scrollBy(0, 300)")
+    waiter.condition("caret_present")
+
+# Post types reported by the harvester. "other" posts (someone else's post
+# shown as context, e.g. the parent of a reply) are never opened.
+OWN = "own"
+RETWEET = "retweet"
+REPLY = "reply"
+QUOTE = "quote"
+OTHER = "other"
+DELETABLE_TYPES = (OWN, RETWEET, REPLY, QUOTE)
+
+# Describe every article loaded in the timeline in one call.
+# Arguments: username, status IDs to tag as kept (posts not to be tried
+# again, e.g. ones the filter chose not to delete), whether to return
+# element handles, whether to prune. Returns {items, empty, rateLimited,
+# pruned}: items is a list of {id, url, type, timestamp, likes, text,
+# article, caret} in page order (article and caret come back as element
+# handles, or null without them), empty is true if the
+# page shows the "hasn't posted" state, rateLimited if a toast says the
+# account is being throttled. Articles tagged data-cleaner-attempted (tried
+# by DELETE_ARTICLE_JS, kept, or someone else's post seen before) are left out.
+# With pruning, those of them more than a screen above the viewport are
+# emptied (see pruneArticle) and pruned is how many were.
+HARVEST_ARTICLES_JS = """
+var username = (arguments[0] || '').toLowerCase();
+var handles = arguments[2] !== false;
+var prune = arguments[3] === true;
+var kept = {};
+(arguments[1] || []).forEach(function (id) { kept[id] = true; });
+
+// Free a handled article's text, media and listeners but keep an empty box of
+// the same height, so nothing below it moves. The article element itself
+// stays, so the site's own list can still unmount it.
+var pruned = 0;
+function pruneArticle(article) {
+    if (article.hasAttribute('data-cleaner-pruned') || article.getBoundingClientRect().bottom > -window.innerHeight) {
+        return;
+    }
+    article.style.minHeight = article.getBoundingClientRect().height + 'px';
+    article.querySelectorAll('img, video, source').forEach(function (media) { media.removeAttribute('src'); });
+    article.replaceChildren();
+    article.setAttribute('data-cleaner-pruned', '');
+    pruned++;
+}
+
+var items = [];
+var articles = document.querySelectorAll('article');
+for (var i = 0; i < articles.length; i++) {
+    var article = articles[i];
+    if (article.hasAttribute('data-cleaner-attempted')) {
+        if (prune) { pruneArticle(article); }
+        continue;
+    }
+    var links = article.querySelectorAll('a[href*="/status/"]');
+    var match = null, time = null;
+    for (var j = 0; j < links.length && !match; j++) {
+        time = links[j].querySelector('time');
+        match = time && links[j].getAttribute('href').match(/^\\/([^\\/]+)\\/status\\/(\\d+)/);
+    }
+    if (!match) { continue; }
+    if (kept[match[2]]) {
+        article.setAttribute('data-cleaner-attempted', 'kept');
+        continue;
+    }
+
+    var context = article.querySelector('[data-testid="socialContext"]');
+    var contextText = context ? context.textContent.toLowerCase() : '';
+    var type;
+    if (contextText.indexOf('repost') !== -1 || contextText.indexOf('retweet') !== -1) {
+        type = 'retweet';
+    } else if (match[1].toLowerCase() !== username) {
+        type = 'other';
+        article.setAttribute('data-cleaner-attempted', 'other');
+    } else if (article.querySelector('[data-testid="quoteTweet"]') || article.querySelectorAll('time').length > 1) {
+        type = 'quote';
+    } else {
+        var body = article.querySelector('[data-testid="tweetText"]');
+        var header = article.textContent.replace(body ? body.textContent : '', '');
+        type = header.indexOf('Replying to') !== -1 ? 'reply' : 'own';
+    }
+
+    // Like count from the button's label ("12 Likes. Like") or its text ("1.2K")
+    var likes = null;
+    var like = article.querySelector('[data-testid="like"], [data-testid="unlike"]');
+    if (like) {
+        var label = (like.getAttribute('aria-label') || '').match(/([\\d,]+) Like/);
+        var count = label ? label[1] : like.textContent.trim();
+        var number = count.replace(/,/g, '').match(/^([\\d.]+)([KM]?)$/i);
+        likes = number ? Math.round(parseFloat(number[1]) *
+            ({'': 1, k: 1e3, m: 1e6})[number[2].toLowerCase()]) : (count ? null : 0);
+    }
+    var text = article.querySelector('[data-testid="tweetText"]');
+
+    items.push({
+        id: match[2],
+        url: new URL(match[0], location.href).href,
+        type: type,
+        timestamp: time.getAttribute('datetime'),
+        likes: likes,
+        text: text ? text.textContent : '',
+        article: handles ? article : null,
+        caret: handles ? article.querySelector('[data-testid="caret"], [aria-label="More"], [aria-label="More options"]')
+            : null
+    });
+}
+var empty = !articles.length && (document.querySelector('[data-testid="emptyState"]') !== null ||
+    /hasn.t posted|No posts/.test(document.body.innerText));
+var toast = document.querySelector('[data-testid="toast"]');
+var rateLimited = !!toast && /rate limit|over the daily limit|try again later/i.test(toast.textContent);
+return {items: items, empty: empty, rateLimited: rateLimited, pruned: pruned};
+"""
+
+def harvest_articles(driver, username, kept_ids=(), prune=False):
+    """Run HARVEST_ARTICLES_JS and return its {items, empty, rateLimited, pruned} result
+
+    Over a cdp.CDPDriver, which cannot return element handles, the items
+    carry no article or caret. With ``prune`` handled articles far above
+    the viewport are emptied in the same call.
+    """
+    result = driver.execute_script(HARVEST_ARTICLES_JS, username, list(kept_ids),
+                                   getattr(driver, "element_handles", True), prune)
+    if not isinstance(result, dict):
+        return {"items": [], "empty": False, "rateLimited": False, "pruned": 0}
+    if result.get("pruned"):
+        metrics.count("dom.pruned", result["pruned"])
+    return result
+
+# Load the next page of the timeline: scroll the last loaded article into
+# view (which makes the site fetch more) and wait until articles appear
+# after it, or the timeline-end marker or empty state shows.
+# Arguments: timeout in milliseconds (0 only starts loading, e.g. to
+# prefetch while posts are still being deleted). Resolves with {loaded,
+# end, pending}: loaded is the number of articles added after the previous
+# last one, end whether the end of the timeline is shown, pending the
+# number of loaded articles not tried yet.
+LOAD_MORE_JS = """
+var timeoutMs = arguments[0];
+var done = arguments[arguments.length - 1];
+
+function lastArticle() {
+    var articles = document.querySelectorAll('article');
+    return articles.length ? articles[articles.length - 1] : null;
+}
+var previous = lastArticle();
+
+function loaded() {
+    var articles = document.querySelectorAll('article');
+    var count = 0;
+    for (var i = articles.length - 1; i >= 0 && articles[i] !== previous; i--) { count++; }
+    return count;
+}
+function atEnd() {
+    return document.querySelector('[data-testid="timelineEnd"], [data-testid="emptyState"]') !== null;
+}
+function result() {
+    return {loaded: loaded(), end: atEnd(),
+            pending: document.querySelectorAll('article:not([data-cleaner-attempted])').length};
+}
+
+if (previous) {
+    previous.scrollIntoView({block: 'end'});
+} else {
+    window.scrollTo(0, document.body.scrollHeight);
+}
+if (!timeoutMs || atEnd()) {
+    done(result());
+    return;
+}
+
+var finished = false;
+var observer = new MutationObserver(function () {
+    if (loaded() || atEnd()) { finish(); }
+});
+var timer = setTimeout(finish, timeoutMs);
+function finish() {
+    if (finished) { return; }
+    finished = true;
+    observer.disconnect();
+    clearTimeout(timer);
+    done(result());
+}
+observer.observe(document.documentElement, {childList: true, subtree: true});
+"""
+
+def load_more(driver, timeout=WAIT_TIMEOUT, wait=True):
+    """Scroll to the last loaded article and wait for the next page (see LOAD_MORE_JS)
+
+    With ``wait`` False the next page only starts loading. Returns the
+    script's {loaded, end, pending} result.
+    """
+    try:
+        driver.set_script_timeout(timeout + 2)
+        result = driver.execute_async_script(LOAD_MORE_JS, int(timeout * 1000) if wait else 0)
+    except TimeoutException:
+        result = None
+    if not isinstance(result, dict):
+        return {"loaded": 0, "end": False, "pending": 0}
+    return result
+
+class TimelineCursor:
+    """Hands out each loaded post of the timeline once, in page order
+
+    Every harvested status ID is remembered in a bounded LRU, so posts that
+    could not be deleted are never reopened while memory stays flat on long
+    runs. Attempted articles are also tagged in the DOM, so the harvest
+    script does not even return them again.
+
+    Posts the ``post_filter`` rejects are never queued, so keeping a post
+    costs no menu clicks. They are tagged in the DOM by the next harvest, as
+    are remembered posts that show up untagged again (after a reload, or
+    deleted by replaying requests). With ``prune`` tagged articles are
+    emptied once they are far above the viewport.
+    """
+
+    def __init__(self, driver, username, skip_ids=(), memory=10000, post_filter=None, prune=False):
+        self.driver = driver
+        self.username = username
+        self.skip_ids = skip_ids
+        self.memory = memory
+        self.post_filter = post_filter
+        self.prune = prune
+        self.kept_ids = []  # Posts not to try again, to tag on the next harvest
+        self.seen = collections.OrderedDict()
+        self.work = collections.deque()
+        self.new_articles = 0  # Articles the last harvest had not seen before
+        self.empty = False  # Whether the page shows the empty-timeline state
+        self.rate_limited = False  # Whether the page shows a rate limit banner
+
+    def _remember(self, tweet_id):
+        self.seen[tweet_id] = True
+        self.seen.move_to_end(tweet_id)
+        if len(self.seen) > self.memory:
+            self.seen.popitem(last=False)
+
+    @property
+    def pending(self):
+        return len(self.work)
+
+    def harvest(self):
+        """Queue the untried posts currently loaded. Returns the number queued."""
+        harvest = harvest_articles(self.driver, self.username, self.kept_ids, self.prune)
+        self.kept_ids = []
+        self.empty = harvest["empty"]
+        self.rate_limited = bool(harvest.get("rateLimited"))
+        self.new_articles = 0
+        queued = 0
+        for item in harvest["items"]:
+            if item["id"] in self.seen:
+                # Tried before but not tagged in this page: tag it, and count it as loaded so the loop scrolls on
+                self.kept_ids.append(item["id"])
+                self.new_articles += 1
+                continue
+            self._remember(item["id"])
+            self.new_articles += 1
+            if item["type"] not in DELETABLE_TYPES:
+                continue
+            if item["id"] in self.skip_ids:
+                # Already handled in an earlier run (e.g. a post we cannot delete)
+                logger.info(f"Post {item['id']} is already done according to the journal. Skipping.")
+                continue
+            if self.post_filter is not None and not self.post_filter(item):
+                self.kept_ids.append(item["id"])
+                metrics.count("filter.kept")
+                continue
+            self.work.append(item)
+            queued += 1
+        return queued
+
+    def next(self):
+        """The next untried post, or None if the queue is empty"""
+        return self.work.popleft() if self.work else None
+
+    def take(self, count, predicate):
+        """Up to ``count`` posts from the front of the queue, as long as they match ``predicate``"""
+        taken = []
+        while self.work and len(taken) < count and predicate(self.work[0]):
+            taken.append(self.work.popleft())
+        return taken
+
+    def invalidate(self):
+        """Drop queued posts (e.g. after an error) so the next harvest picks them up again"""
+        while self.work:
+            self.seen.pop(self.work.popleft()["id"], None)
+
+    def reset(self):
+        """Forget everything, e.g. after reloading the page"""
+        self.work.clear()
+        self.seen.clear()
+
+    def recycle(self):
+        """Drop queued posts after the page was reloaded, but keep remembering which were tried"""
+        self.work.clear()
+        self.kept_ids = []
+
+# Outcomes of a single deletion attempt (the successful ones, SUCCESS_STATUSES,
+# are defined in pacing.py, which counts them)
+RESULT_MESSAGES = {
+    "deleted": "Deleted tweet",
+    "unretweeted": "Unretweeted tweet",
+    "removed_reply": "Removed reply",
+}
+
+# Menu options the cleaner can act on, in order of preference. Both the
+# in-page routine and the Selenium fallback check the open menu for all of
+# them in one call (probeMenu in MENU_ACTIONS_JS), so a new X/Twitter UI
+# variant only needs another selector or text pattern here. Per action:
+#   name, status: what it is called, and the result status it leads to
+#   types: the post types it is meant for (tried first for those)
+#   item: CSS selectors of its menu item; text: a pattern its label may match
+#       instead (a case-insensitive JavaScript regex)
+#   confirm, confirm_text: the same for the confirmation button that may
+#       follow; a menu item that matches a confirm selector itself needs none
+#   confirm_required: fail without a confirmation (otherwise it gets 500 ms)
+#   opener: a button on the article that opens a menu offering the action;
+#       posts of its types use it instead of the caret menu (the repost
+#       button of a retweet), others only when the caret menu has no option
+#   done: appears in the article when the action took effect without
+#       removing it from the timeline
+MENU_ACTIONS = [
+    {
+        "name": "delete",
+        "status": "deleted",
+        "types": [OWN, REPLY, QUOTE],
+        "item": [],
+        "text": r"^delete",
+        "confirm": ['[data-testid="confirmationSheetConfirm"]'],
+        "confirm_text": r"^delete$",
+        "confirm_required": True,
+    },
+    {
+        "name": "unretweet",
+        "status": "unretweeted",
+        "types": [RETWEET],
+        "item": ['[data-testid="unretweetConfirm"]'],
+        "text": r"undo repost|undo retweet|unretweet",
+        "confirm": ['[data-testid="unretweetConfirm"]'],
+        "confirm_text": r"undo repost|undo retweet|unretweet",
+        "confirm_required": False,
+        "opener": '[data-testid="unretweet"]',
+        "done": '[data-testid="retweet"]',
+    },
+    {
+        "name": "remove_reply",
+        "status": "removed_reply",
+        "types": [REPLY],
+        "item": [],
+        "text": r"remove reply",
+        "confirm": ['[data-testid="confirmationSheetConfirm"]'],
+        "confirm_text": r"^remove",
+        "confirm_required": True,
+    },
+]
+
+def menu_actions_for(post_type):
+    """MENU_ACTIONS with the actions meant for ``post_type`` first (all in table order if it is unknown)"""
+    return sorted(MENU_ACTIONS, key=lambda spec: post_type not in spec["types"])
+
+def direct_action(post_type):
+    """The action a post of ``post_type`` reaches through its own button instead of the caret menu, or None"""
+    return next((spec for spec in MENU_ACTIONS if post_type in spec["types"] and spec.get("opener")), None)
+
+class SelectorRegistry:
+    """Learns which way of finding each menu option currently works
+
+    Every selector in a MENU_ACTIONS entry's ``item`` list, and its text
+    pattern, is a strategy for finding that option (chain ``menu.<name>``);
+    for a post type with a direct action, its button and the caret menu are
+    the strategies for reaching it (chain ``route.<type>``). Hits, misses
+    and latency are recorded for each, and chains are tried best-first:
+    highest recent hit rate, then lowest latency. Counts decay over time,
+    and every EXPLORE_EVERY posts a demoted direct button is tried again, so
+    after a Twitter/X UI change the way that stopped working costs a
+    timeout only until another one overtakes it. Stats are persisted as
+    JSON between runs.
+    """
+
+    DECAY = 0.9  # Weight kept by older observations on every new one
+    EXPLORE_EVERY = 20  # Try a demoted direct button again on every Nth post of its type
+
+    def __init__(self, stats_path=None):
+        self.stats_path = None
+        self.stats = {}
+        self._lookups = collections.Counter()
+        self._lock = threading.Lock()
+        self.load(stats_path)
+
+    def load(self, stats_path):
+        """Use ``stats_path`` for the statistics, starting from the ones saved there (None: keep them in memory)"""
+        self.stats_path = stats_path
+        if not stats_path or not os.path.exists(stats_path):
+            return
         try:
-            logger.info("Checking for replies tab...")
-            time_start = time.time()
-            replies_tab = driver.find_element(By.XPATH, '//a[contains(@href, "/with_replies")]')
-            driver.execute_script("arguments[0].click();", replies_tab)
-            log_time("Navigate to replies tab", time_start)
-            time.sleep(sleep_time)
+            with open(stats_path, "r", encoding="utf-8") as stats_file:
+                stats = json.load(stats_file)
+            with self._lock:
+                self.stats = stats if isinstance(stats, dict) else {}
+            logger.info(f"Loaded selector statistics from {stats_path}")
+        except (OSError, ValueError) as e:
+            logger.warning(f"Could not read selector statistics from {stats_path}: {e}")
+
+    def _score(self, name, position, strategy):
+        entry = self.stats.get(name, {}).get(strategy)
+        if not entry:
+            # Untried strategies keep their original order behind proven ones
+            return (0.5, 0.0, -position)
+        hit_rate = (entry["hits"] + 1) / (entry["hits"] + entry["misses"] + 2)
+        return (hit_rate, -entry["latency"], -position)
+
+    def ordered(self, name, chain):
+        """Strategies of a chain, best first"""
+        with self._lock:
+            ranked = sorted(enumerate(chain), key=lambda item: self._score(name, *item), reverse=True)
+        return [strategy for _, strategy in ranked]
+
+    def record(self, name, strategy, hit, elapsed):
+        """Record the outcome of one lookup"""
+        with self._lock:
+            entry = self.stats.setdefault(name, {}).setdefault(
+                strategy, {"hits": 0.0, "misses": 0.0, "latency": elapsed})
+            entry["hits"] = entry["hits"] * self.DECAY + (1 if hit else 0)
+            entry["misses"] = entry["misses"] * self.DECAY + (0 if hit else 1)
+            if hit:
+                entry["latency"] = entry["latency"] * self.DECAY + elapsed * (1 - self.DECAY)
+        if not hit:
+            metrics.count("selector_misses")
+
+    def actions_for(self, post_type):
+        """menu_actions_for(post_type), with each entry's item selectors best first"""
+        return [dict(spec, item=self.ordered(f"menu.{spec['name']}", spec["item"])) if len(spec["item"]) > 1
+                else spec for spec in menu_actions_for(post_type)]
+
+    def direct_for(self, post_type):
+        """direct_action(post_type), unless the caret menu currently works better for the type"""
+        direct = direct_action(post_type)
+        if direct is None:
+            return None
+        with self._lock:
+            self._lookups[post_type] += 1
+            explore = self._lookups[post_type] % self.EXPLORE_EVERY == 0
+        if explore or self.ordered(f"route.{post_type}", ["direct", "caret"])[0] == "direct":
+            return direct
+        return None
+
+    def observe(self, post_type, result, elapsed):
+        """Record how a deletion found its menu option (a result of delete_article() or the fallback path)"""
+        if result.get("direct") is not None:
+            self.record(f"route.{post_type}", "direct", result["direct"], elapsed)
+        if not result.get("action"):
+            return
+        if not result.get("direct") and direct_action(post_type) is not None:
+            self.record(f"route.{post_type}", "caret", True, elapsed)
+        spec = next((spec for spec in MENU_ACTIONS if spec["name"] == result["action"]), None)
+        if spec is None or not result.get("via"):
+            return
+        # The page checks the selectors in order, then the text pattern: the ones before the match missed
+        chain = self.ordered(f"menu.{spec['name']}", spec["item"])
+        if spec.get("text"):
+            chain.append(f"text:{spec['text']}")
+        for strategy in chain:
+            self.record(f"menu.{spec['name']}", strategy, strategy == result["via"], elapsed)
+            if strategy == result["via"]:
+                break
+
+    def save(self):
+        """Persist the statistics"""
+        if not self.stats_path:
+            return
+        with self._lock:
+            data = json.dumps(self.stats, indent=2, sort_keys=True)
+        temporary = f"{self.stats_path}.tmp.{os.getpid()}"
+        try:
+            with open(temporary, "w", encoding="utf-8") as stats_file:
+                stats_file.write(data)
+            os.replace(temporary, self.stats_path)
+        except OSError as e:
+            logger.warning(f"Could not save selector statistics to {self.stats_path}: {e}")
+
+# Shared by every tab and worker thread of the run (see delete_tweets())
+selector_stats = SelectorRegistry()
+
+# Lookups over a MENU_ACTIONS table, shared by the scripts below.
+# probeMenu(actions) lists every action the open menu offers, in table
+# order, as {spec, item, via, confirmed}: via names the selector or text
+# pattern that matched, confirmed is true if the item needs no confirmation.
+# findConfirm(spec) returns the action's confirmation button, or null.
+MENU_ACTIONS_JS = """
+function labelOf(el) {
+    return (el.textContent || '').trim();
+}
+
+function matchesAny(el, selectors) {
+    for (var i = 0; i < (selectors || []).length; i++) {
+        if (el.matches(selectors[i]) || el.querySelector(selectors[i])) { return selectors[i]; }
+    }
+    return null;
+}
+
+function probeMenu(actions) {
+    var items = document.querySelectorAll('[role="menu"] [role="menuitem"]');
+    var offered = [];
+    actions.forEach(function (spec) {
+        var pattern = spec.text ? new RegExp(spec.text, 'i') : null;
+        for (var i = 0; i < items.length; i++) {
+            var via = matchesAny(items[i], spec.item);
+            if (!via && pattern && pattern.test(labelOf(items[i]))) { via = 'text:' + spec.text; }
+            if (via) {
+                offered.push({spec: spec, item: items[i], via: via,
+                              confirmed: matchesAny(items[i], spec.confirm) !== null});
+                return;
+            }
+        }
+    });
+    return offered;
+}
+
+function findConfirm(spec) {
+    for (var i = 0; i < (spec.confirm || []).length; i++) {
+        var button = document.querySelector(spec.confirm[i]);
+        if (button) { return button; }
+    }
+    if (spec.confirm_text) {
+        var pattern = new RegExp(spec.confirm_text, 'i');
+        var buttons = document.querySelectorAll('[role="dialog"] [role="button"], [role="alertdialog"] [role="button"]');
+        for (var j = 0; j < buttons.length; j++) {
+            if (pattern.test(labelOf(buttons[j]))) { return buttons[j]; }
+        }
+    }
+    return null;
+}
+"""
+
+# Report every MENU_ACTIONS entry the open menu offers, for the Selenium path.
+# Arguments: the MENU_ACTIONS table. Returns a list of {name, via, confirmed,
+# item} in table order, with the menu item as an element handle.
+PROBE_MENU_JS = """
+var actions = arguments[0];
+""" + MENU_ACTIONS_JS + """
+return probeMenu(actions).map(function (found) {
+    return {name: found.spec.name, via: found.via, confirmed: found.confirmed, item: found.item};
+});
+"""
+
+# The confirmation button of one MENU_ACTIONS entry, or null.
+# Arguments: the entry.
+FIND_CONFIRM_JS = """
+var spec = arguments[0];
+""" + MENU_ACTIONS_JS + """
+return findConfirm(spec);
+"""
+
+# Delete one article entirely inside the page: open its caret menu, pick
+# the first MENU_ACTIONS entry it offers (Delete / Undo Retweet / Remove
+# reply), confirm, and wait for the article to leave the timeline. Runs as
+# a single execute_async_script round trip. With a direct action (a
+# retweet's Undo Retweet) the article's own button is used instead of the
+# caret menu.
+# Arguments: article element (or status ID string), options object
+# ({timeoutMs, statusPage, repost, actions, direct}). Resolves with {status,
+# reason, id}; status is one of deleted, unretweeted, removed_reply,
+# skipped or failed. Once a menu option was found the result also has
+# action, via (the selector or pattern that matched) and direct (whether
+# the direct action's button offered it, null if it was not tried).
+DELETE_ARTICLE_JS = """
+var target = arguments[0];
+var opts = arguments[1] || {};
+var done = arguments[arguments.length - 1];
+var timeoutMs = opts.timeoutMs || 5000;
+var actions = opts.actions || [];
+""" + MENU_ACTIONS_JS + STATUS_ID_JS + """
+function waitFor(check, ms) {
+    return new Promise(function (resolve) {
+        var found = check();
+        if (found) { resolve(found); return; }
+        var observer = new MutationObserver(function () {
+            var value = check();
+            if (value) { observer.disconnect(); clearTimeout(timer); resolve(value); }
+        });
+        var timer = setTimeout(function () { observer.disconnect(); resolve(check()); }, ms);
+        observer.observe(document.documentElement, {childList: true, subtree: true, attributes: true});
+    });
+}
+
+function findArticle(value) {
+    if (value && value.nodeType === 1) {
+        return value.closest('article') || value;
+    }
+    if (typeof value === 'string') {
+        // Only the post's own timestamp counts: a reply or quote of it also links to it
+        var articles = document.querySelectorAll('article');
+        for (var i = 0; i < articles.length; i++) {
+            if (statusId(articles[i]) === value) { return articles[i]; }
+        }
+        // The focal post of a status page, when the page is this post's: its
+        // ID cannot be read, or it is the original post a retweet's page shows
+        var focal = opts.statusPage ? document.querySelector('article[tabindex="-1"]') : null;
+        var page = location.pathname.match(/\\/status\\/(\\d+)/);
+        if (focal && page && page[1] === value && (statusId(focal) === null || opts.repost)) {
+            return focal;
+        }
+        return null;
+    }
+    return null;
+}
+
+function closeMenus() {
+    document.dispatchEvent(new KeyboardEvent('keydown', {key: 'Escape', bubbles: true}));
+    document.body.click();
+}
+
+function findOpener(article) {
+    for (var i = 0; i < actions.length; i++) {
+        var button = actions[i].opener && article.querySelector(actions[i].opener);
+        if (button) { return {spec: actions[i], button: button}; }
+    }
+    return null;
+}
+
+async function run() {
+    // A status ID may refer to a page that is still loading
+    var article = typeof target === 'string'
+        ? await waitFor(function () { return findArticle(target); }, timeoutMs)
+        : findArticle(target);
+    if (!article) {
+        return {status: 'failed', reason: 'article_not_found', id: null};
+    }
+    var id = statusId(article);
+    // Later harvests skip articles that were already tried
+    article.setAttribute('data-cleaner-attempted', '1');
+
+    var found = null;
+    var direct = null;  // Whether the direct action's button offered it (null if not tried)
+    var directButton = opts.direct && article.querySelector(opts.direct.opener);
+    if (directButton) {
+        directButton.click();
+        found = await waitFor(function () { return probeMenu([opts.direct])[0]; }, timeoutMs);
+        direct = !!found;
+        if (!found) {
+            // Not what the post type promised: fall back to the caret menu
+            closeMenus();
+            await waitFor(function () { return document.querySelector('[role="menu"]') === null; }, timeoutMs);
+        }
+    }
+
+    var caret = found ? null
+        : article.querySelector('[data-testid="caret"], [aria-label="More"], [aria-label="More options"]');
+    if (!found && !caret) {
+        return {status: 'failed', reason: 'caret_not_found', id: id};
+    }
+    if (caret) {
+        caret.click();
+        found = await waitFor(function () { return probeMenu(actions)[0]; }, timeoutMs);
+    }
+    if (!found) {
+        var menuOpen = document.querySelector('[role="menu"]') !== null;
+        closeMenus();
+        // A menu without any delete-like option is a post we cannot remove;
+        // no menu at all means the UI did not respond as expected.
+        if (!menuOpen) {
+            return {status: 'failed', reason: 'menu_not_opened', id: id};
+        }
+        var opener = findOpener(article);
+        if (!opener) {
+            return {status: 'skipped', reason: 'no_delete_option', id: id};
+        }
+        await waitFor(function () { return document.querySelector('[role="menu"]') === null; }, timeoutMs);
+        opener.button.click();
+        found = await waitFor(function () { return probeMenu([opener.spec])[0]; }, timeoutMs);
+        if (!found) {
+            closeMenus();
+            return {status: 'failed', reason: opener.spec.name + '_option_not_found', id: id};
+        }
+    }
+    var spec = found.spec;
+    // Report which option was chosen and how it was found, for the selector statistics
+    var outcome = function (status, reason) {
+        return {status: status, reason: reason, id: id, action: spec.name, via: found.via, direct: direct};
+    };
+    found.item.click();
+
+    // Deleting shows a confirmation sheet; undoing a retweet from the menu
+    // usually takes effect immediately.
+    if (!found.confirmed) {
+        var confirm = await waitFor(function () { return findConfirm(spec); },
+                                    spec.confirm_required ? timeoutMs : 500);
+        if (confirm) {
+            confirm.click();
+        } else if (spec.confirm_required) {
+            closeMenus();
+            return outcome('failed', 'confirm_not_found');
+        }
+    }
+
+    var removed = await waitFor(function () {
+        return !article.isConnected || article.offsetParent === null ||
+            (spec.done && article.querySelector(spec.done) !== null);
+    }, timeoutMs);
+    if (!removed) {
+        return outcome('failed', 'article_not_removed');
+    }
+    return outcome(spec.status, null);
+}
+
+run().then(done, function (error) {
+    closeMenus();
+    done({status: 'failed', reason: 'script_error: ' + (error && error.message), id: null});
+});
+"""
+
+# Start DELETE_ARTICLE_JS without waiting for it, so the scripts of several
+# tabs can run at once: its result is left in window.cleanerResult (null
+# until it resolves). Arguments: as for DELETE_ARTICLE_JS.
+START_DELETE_ARTICLE_JS = """
+var args = Array.prototype.slice.call(arguments);
+window.cleanerResult = null;
+args.push(function (result) { window.cleanerResult = result; });
+(function () {
+""" + DELETE_ARTICLE_JS + """
+}).apply(null, args);
+"""
+
+def _delete_options(timeout, status_page, post_type):
+    return {"timeoutMs": int(timeout * 1000), "statusPage": status_page, "repost": post_type == RETWEET,
+            "actions": selector_stats.actions_for(post_type), "direct": selector_stats.direct_for(post_type)}
+
+def _delete_result(result, post_type, start):
+    if not isinstance(result, dict) or "status" not in result:
+        return {"status": "failed", "reason": "unexpected_result", "id": None}
+    selector_stats.observe(post_type, result, time.monotonic() - start)
+    return result
+
+def delete_article(driver, article, timeout=WAIT_TIMEOUT, status_page=False, post_type=None):
+    """Delete, unretweet or remove one article with a single in-page script call
+
+    ``article`` is an article element or a status ID, which matches the
+    article whose own timestamp links to it. With ``status_page`` the focal
+    post of the status page for that ID is used when its ID cannot be read
+    from it, or, for a retweet, when it is the original post (the status
+    URL of a retweet shows the post it reposts). A known
+    ``post_type`` picks its fast path: retweets are undone from their own
+    repost button, and the menu options for the type are preferred. Both
+    follow what selector_stats has learned works, and it learns from the
+    outcome. Returns a result dict: {"status": ..., "reason": ..., "id": ...}
+    """
+    options = _delete_options(timeout, status_page, post_type)
+    start = time.monotonic()
+    try:
+        driver.set_script_timeout(timeout * 3 + 2)
+        result = driver.execute_async_script(DELETE_ARTICLE_JS, article, options)
+    except TimeoutException:
+        return {"status": "failed", "reason": "script_timeout", "id": None}
+    except Exception as e:
+        return {"status": "failed", "reason": f"script_error: {type(e).__name__}", "id": None}
+    return _delete_result(result, post_type, start)
+
+class PendingDeletion:
+    """delete_article() started in the current tab without waiting for it (see START_DELETE_ARTICLE_JS)
+
+    poll() returns the result once the script has resolved, None while it
+    is still running. A script that has not resolved in as long as
+    delete_article() would wait counts as a script_timeout.
+    """
+
+    def __init__(self, driver, article, timeout=WAIT_TIMEOUT, status_page=False, post_type=None):
+        self.post_type = post_type
+        self.timeout = timeout
+        self.start = time.monotonic()
+        self.result = None
+        try:
+            driver.execute_script(START_DELETE_ARTICLE_JS, article, _delete_options(timeout, status_page, post_type))
+        except Exception as e:
+            self.result = {"status": "failed", "reason": f"script_error: {type(e).__name__}", "id": None}
+
+    def poll(self, driver):
+        """The result, or None while the script runs (call with its tab current)"""
+        if self.result is not None:
+            return self.result
+        try:
+            result = driver.execute_script("return window.cleanerResult || null;")
+        except Exception as e:
+            self.result = {"status": "failed", "reason": f"script_error: {type(e).__name__}", "id": None}
+            return self.result
+        if result is not None:
+            self.result = _delete_result(result, self.post_type, self.start)
+        elif time.monotonic() - self.start > self.timeout * 3 + 2:
+            self.result = {"status": "failed", "reason": "script_timeout", "id": None}
+        return self.result
+
+def click_element(driver, element):
+    """Click with JavaScript (immune to overlays intercepting the click), falling back to a real click"""
+    try:
+        driver.execute_script("arguments[0].click();", element)
+    except:
+        element.click()
+
+def probe_menu(driver, waiter, actions=MENU_ACTIONS):
+    """Wait for the open menu to offer any of ``actions`` and return all it offers (see PROBE_MENU_JS)"""
+    return waiter.quietly(lambda d: d.execute_script(PROBE_MENU_JS, actions) or False) or []
+
+def delete_with_fallbacks(driver, waiter, tweet_menu_button, tweet_article, post_type=None):
+    """Fallback deletion path driving each step through Selenium
+
+    Used when the in-page routine fails (e.g. after a UI change). The open
+    menu is checked for every MENU_ACTIONS entry in one call, and the first
+    one it offers (preferring those for ``post_type``) is clicked and
+    confirmed; which selector or text pattern matched is logged and
+    recorded in selector_stats. Like delete_article(), a retweet is undone
+    from its own repost button without opening the caret menu. Returns a
+    result dict in the same format as delete_article().
+    """
+    start = time.monotonic()
+    offered = []
+    direct = selector_stats.direct_for(post_type)
+    buttons = tweet_article.find_elements(By.CSS_SELECTOR, direct["opener"]) if direct is not None else []
+    if buttons:
+        with metrics.span("open_direct"):
+            click_element(driver, buttons[0])
+            offered = probe_menu(driver, waiter, [direct])
+        if offered:
+            result = confirm_menu_action(driver, waiter, tweet_article, offered, direct=True)
+            selector_stats.observe(post_type, result, time.monotonic() - start)
+            return result
+        close_open_menus(driver, waiter)
+
+    with metrics.span("open_menu"):
+        # Try JavaScript click instead of regular click to avoid being intercepted
+        try:
+            driver.execute_script("arguments[0].click();", tweet_menu_button)
         except:
-            logger.info("Could not find replies tab. Staying on main profile.")
-            
-        # Scroll to load content
-        driver.execute_script("window.scrollBy(0, 300)")
-        time.sleep(sleep_time)
+            try:
+                tweet_menu_button.click()
+            except:
+                logger.info("Click was intercepted, trying to remove overlays...")
+                # Try to remove any overlays or popups that might be intercepting clicks
+                driver.execute_script("""
+                    var elements = document.getElementsByClassName('r-1habvwh');
+                    for(var i=0; i<elements.length; i++){
+                        elements[i].style.display='none';
+                    }
+                """)
+                driver.execute_script("arguments[0].click();", tweet_menu_button)
+
+        waiter.condition("menu_open")
+
+    with metrics.span("probe_menu"):
+        offered = probe_menu(driver, waiter, selector_stats.actions_for(post_type))
+        if not offered:
+            # No option in the caret menu: try a button on the article that opens one (e.g. Undo Retweet)
+            opener = next(((spec, button) for spec in MENU_ACTIONS if spec.get("opener")
+                           for button in tweet_article.find_elements(By.CSS_SELECTOR, spec["opener"])), None)
+            if opener is None:
+                logger.info("No delete, unretweet or remove option in the menu. Skipping.")
+                return {"status": "skipped", "reason": "no_delete_option", "id": None}
+            close_open_menus(driver, waiter)
+            click_element(driver, opener[1])
+            waiter.condition("menu_open")
+            offered = probe_menu(driver, waiter, [opener[0]])
+            if not offered:
+                close_open_menus(driver, waiter)
+                return {"status": "failed", "reason": f"{opener[0]['name']}_option_not_found", "id": None}
+    result = confirm_menu_action(driver, waiter, tweet_article, offered, direct=False if buttons else None)
+    selector_stats.observe(post_type, result, time.monotonic() - start)
+    return result
+
+def confirm_menu_action(driver, waiter, tweet_article, offered, direct=None):
+    """Click the first of the ``offered`` menu options (see probe_menu()) and confirm it
+
+    ``direct`` tells whether the direct action's button offered it (None if
+    it was not tried). Returns a result dict in the same format as
+    delete_article().
+    """
+    found = offered[0]
+    spec = next(spec for spec in MENU_ACTIONS if spec["name"] == found["name"])
+    chosen = {"action": spec["name"], "via": found["via"], "direct": direct}
+    metrics.count(f"menu.{spec['name']}")
+    logger.info(f"Menu offers {', '.join(option['name'] for option in offered)}. "
+                f"Choosing {spec['name']} (matched {found['via']})...")
+
+    with metrics.span("click_action"):
+        click_element(driver, found["item"])
+
+    if not found["confirmed"]:
+        with metrics.span("confirm"):
+            confirm = waiter.quietly(lambda d: d.execute_script(FIND_CONFIRM_JS, spec) or False,
+                                     None if spec.get("confirm_required") else 0.5)
+            if confirm:
+                click_element(driver, confirm)
+            elif spec.get("confirm_required"):
+                logger.info(f"Confirm {spec['name']} button not found. Might be a UI change.")
+                close_open_menus(driver, waiter)
+                return {"status": "failed", "reason": "confirm_not_found", "id": None, **chosen}
+            else:
+                logger.info(f"No confirmation for {spec['name']}, but it might still have worked")
+                waiter.condition("confirmation_closed")
+                return {"status": spec["status"], "reason": "unconfirmed", "id": None, **chosen}
+
+    if spec.get("done"):
+        waiter.condition("confirmation_closed")
+    else:
+        waiter.condition("article_removed", tweet_article)
+    return {"status": spec["status"], "reason": None, "id": None, **chosen}
+
+def close_open_menus(driver, waiter):
+    """Close any open menu or dialog"""
+    from selenium.webdriver import ActionChains
+
+    try:
+        ActionChains(driver).send_keys(Keys.ESCAPE).perform()
+    except:
+        pass
+    # Also try clicking away
+    driver.execute_script("document.body.click()")
+    waiter.condition("menu_closed")
+
+def report_progress(progress_callback, tweet_id, result, deleted_count, duration):
+    """Send a per-post progress event to an optional callback"""
+    if progress_callback is None:
+        return
+    try:
+        progress_callback({
+            "event": "post",
+            "id": tweet_id,
+            "status": result["status"],
+            "reason": result.get("reason"),
+            "deleted": deleted_count,
+            "duration": duration,
+            "time": time.time(),
+        })
+    except Exception as e:
+        logger.debug(f"Progress callback failed: {e}")
+
+class DeletionCoordinator:
+    """Work queue shared by deletion workers
+
+    De-duplicates status IDs and enforces the global ``max_delete`` budget:
+    an ID is only handed out while completed plus in-flight deletions stay
+    under the budget, so parallel workers never overshoot it. IDs in
+    ``skip_ids`` (already done in an earlier run) are never queued, and every
+    queued ID and result is written to the optional journal. Results are fed
+    to the optional AdaptiveRate ``rate``.
+    """
+
+    def __init__(self, max_delete=float('inf'), journal=None, skip_ids=(), progress_callback=None, rate=None):
+        self.max_delete = max_delete
+        self.journal = journal
+        self.progress_callback = progress_callback
+        self.rate = rate
+        self.deleted = 0
+        self.results = collections.Counter()
+        self._queue = collections.deque()
+        self._seen = set(skip_ids)
+        self._in_flight = 0
+        self._exhausted = False
+        self._condition = threading.Condition()
+
+    def submit(self, tweet_id, url, post_type=None):
+        """Queue a status page for deletion. Returns False if the ID was already seen."""
+        with self._condition:
+            if tweet_id in self._seen:
+                return False
+            self._seen.add(tweet_id)
+            self._queue.append({"id": tweet_id, "url": url, "type": post_type})
+            self._condition.notify()
+        if self.journal is not None:
+            self.journal.record(tweet_id, "pending")
+        return True
+
+    def finish_producing(self):
+        """Signal that no more IDs will be submitted"""
+        with self._condition:
+            self._exhausted = True
+            self._condition.notify_all()
+
+    def _budget_left(self):
+        return self.deleted + self._in_flight < self.max_delete
+
+    def claim(self, timeout=0):
+        """Take the next item to delete, waiting up to ``timeout`` seconds.
+
+        Returns None if nothing is available (or the budget is used up).
+        """
+        deadline = time.monotonic() + timeout
+        with self._condition:
+            while not (self._queue and self._budget_left()):
+                remaining = deadline - time.monotonic()
+                if self.finished or remaining <= 0:
+                    return None
+                self._condition.wait(remaining)
+            self._in_flight += 1
+            item = self._queue.popleft()
+            item["claimed_at"] = time.monotonic()
+            return item
+
+    def complete(self, item, result):
+        """Record the result of a claimed item"""
+        with self._condition:
+            self._in_flight -= 1
+            self.results[result["status"]] += 1
+            if result["status"] in SUCCESS_STATUSES:
+                self.deleted += 1
+                logger.info(f"{RESULT_MESSAGES[result['status']]} #{self.deleted} ({item['id']})")
+            else:
+                logger.info(f"Could not delete {item['id']}: {result['status']} ({result.get('reason')})")
+            self._condition.notify_all()
+            deleted = self.deleted
+        duration = time.monotonic() - item["claimed_at"]
+        if self.rate is not None:
+            self.rate.record(result)
+        metrics.record("post", duration)
+        metrics.record(f"post.{item.get('type') or 'unknown'}", duration)
+        metrics.count(f"result.{result['status']}")
+        if self.journal is not None:
+            self.journal.record(item["id"], result["status"], result.get("reason"))
+        report_progress(self.progress_callback, item["id"], result, deleted, duration)
+        metrics.deletion_done(deleted)
+
+    @property
+    def pending(self):
+        with self._condition:
+            return len(self._queue)
+
+    @property
+    def exhausted(self):
+        with self._condition:
+            return self._exhausted
+
+    @property
+    def finished(self):
+        with self._condition:
+            if self.deleted >= self.max_delete:
+                return True
+            return self._exhausted and not self._queue and self._in_flight == 0
+
+def set_cookies(driver, cookies):
+    """Install Selenium-format cookies in a browser without navigating first"""
+    cdp_cookies = []
+    for cookie in cookies:
+        cdp_cookie = {
+            "name": cookie["name"],
+            "value": cookie["value"],
+            "domain": cookie.get("domain", "." + urllib.parse.urlparse(BASE_URL).hostname),
+            "path": cookie.get("path", "/"),
+            "secure": cookie.get("secure", False),
+            "httpOnly": cookie.get("httpOnly", False),
+        }
+        if "expiry" in cookie:
+            cdp_cookie["expires"] = cookie["expiry"]
+        if cookie.get("sameSite") in ("Strict", "Lax", "None"):
+            cdp_cookie["sameSite"] = cookie["sameSite"]
+        cdp_cookies.append(cdp_cookie)
+    driver.execute_cdp_cmd("Network.setCookies", {"cookies": cdp_cookies})
+
+def restart_browser(driver, waiter, username, chrome_driver_path, headless, profile_dir=None, lean_browsing=False,
+                    capture_network=False, base_url=BASE_URL):
+    """Replace the browser with a fresh one in the same session and open the profile again
+
+    For memory a page reload does not give back. Progress lives in the
+    caller's counters and journal, so the run goes on where it was. Returns
+    the new driver (attached over DevTools again if ``driver`` was a
+    CDPDriver); ``waiter`` is switched to it.
+    """
+    direct = isinstance(driver, CDPDriver)
+    if direct:
+        driver = driver.detach()
+    cookies = driver.get_cookies()
+    try:
+        driver.quit()
+    except:
+        pass
+    driver = create_driver(chrome_driver_path, headless, profile_dir, lean_browsing, capture_network=capture_network)
+    set_cookies(driver, cookies)
+    waiter.driver = driver
+    open_profile(driver, waiter, username, base_url=base_url)
+    if direct:
+        driver = waiter.driver = CDPDriver.attach(driver) or driver
+    return driver
+
+class TimelineHarvester:
+    """Work producer: queue the posts loaded on the profile timeline, then scroll for more
+
+    Runs in the browser tab that was current when it was created. After three
+    scrolls that find nothing new the coordinator is told no more work is coming.
+    Posts the ``post_filter`` rejects are not submitted. Posts that are
+    submitted are also written to the optional ``manifest`` (a ManifestWriter).
+    Submitted and rejected posts are tagged in the DOM by the next harvest;
+    with ``prune`` they are emptied once they are far above the viewport,
+    since this tab never sees them deleted.
+
+    After a harvest that found posts the next page only starts loading, so
+    the workers are not held up; after one that found nothing it waits for
+    the page to arrive. The timeline is exhausted as soon as its end marker
+    shows with nothing new left.
+    """
+
+    def __init__(self, driver, waiter, username, post_filter=None, manifest=None, prune=False):
+        self.driver = driver
+        self.waiter = waiter
+        self.username = username
+        self.post_filter = post_filter
+        self.manifest = manifest
+        self.prune = prune
+        self.handle = driver.current_window_handle
+        self.empty_rounds = 0
+        self.at_end = False
+        self.kept_ids = []
+        self.started = time.monotonic()
+
+    def __call__(self, coordinator):
+        self.driver.switch_to.window(self.handle)
+        with metrics.span("harvest"):
+            found = harvest_articles(self.driver, self.username, self.kept_ids, self.prune)["items"]
+        kept = {item["id"] for item in found if item["type"] in DELETABLE_TYPES
+                and self.post_filter is not None and not self.post_filter(item)}
+        metrics.count("filter.kept", len(kept))
+        self.kept_ids = list(kept)
+        new_items = 0
+        for item in found:
+            if item["type"] not in DELETABLE_TYPES or item["id"] in kept:
+                continue
+            self.kept_ids.append(item["id"])
+            if coordinator.submit(item["id"], item["url"], item["type"]):
+                new_items += 1
+                if self.manifest is not None:
+                    self.manifest.submit(item["id"], item["url"], item["type"])
+        queued = coordinator.pending
+        log_step("Harvested %d new posts from the timeline (%d queued, %d kept by the filter)",
+                 new_items, queued, len(kept), event="harvest", new=new_items, queued=queued, kept=len(kept))
+
+        self.empty_rounds = 0 if new_items or kept else self.empty_rounds + 1
+        if self.empty_rounds >= 3 or (self.empty_rounds and self.at_end):
+            logger.info("No new posts found after multiple scrolls. Timeline exhausted.")
+            coordinator.finish_producing()
+            if self.manifest is not None:
+                # Planning overlapped with deletion: estimate what is left from this run's pace
+                deleted = coordinator.deleted
+                self.manifest.finish_producing()
+                log_plan_summary(self.manifest.path, self.manifest.counts,
+                                 (time.monotonic() - self.started) / deleted if deleted else None, done=deleted)
+            return
+        if self.empty_rounds and self.waiter.rate is not None:
+            # Nothing new although the timeline has not ended: the site may be slow to serve the next page
+            self.waiter.rate.congestion("empty_harvest")
+
+        with metrics.span("scroll"):
+            self.at_end = load_more(self.driver, self.waiter.timeout, wait=not (new_items or kept))["end"]
+
+class ArchiveProducer:
+    """Work producer: queue posts from an archive index, a batch at a time"""
+
+    def __init__(self, index, username, base_url=BASE_URL, batch_size=100):
+        self.username = username
+        self.base_url = base_url
+        self.batch_size = batch_size
+        self._entries = iter(index)
+
+    def __call__(self, coordinator):
+        for _ in range(self.batch_size):
+            entry = next(self._entries, None)
+            if entry is None:
+                coordinator.finish_producing()
+                return
+            # The export lists a retweet under its own status ID, whose page shows the original
+            # post: it is undone from there with the repost button, like a retweet in the timeline
+            post_type = entry.type if entry.type in (REPLY, RETWEET) else OWN
+            coordinator.submit(str(entry.id), f"{self.base_url}/{self.username}/status/{entry.id}", post_type)
+
+def run_tab_workers(driver, waiter, coordinator, producer, username, workers, lean_browsing=False):
+    """Delete queued posts using several tabs of one browser session
+
+    Nothing blocks on a single tab: navigations are started without
+    waiting, then the deletion script is started in every tab whose status
+    page was opened (PendingDeletion), and only then are the tabs polled
+    for results. So the tabs load pages and delete posts at the same time.
+    """
+    profile_handle = driver.current_window_handle
+    tabs = {}  # Window handle: [item, PendingDeletion or None until started], or None when idle
+    for _ in range(workers):
+        driver.switch_to.new_window('tab')
+        if lean_browsing:
+            # Request blocking applies per tab
+            block_urls(driver, lean_url_patterns())
+        tabs[driver.current_window_handle] = None
+
+    while not coordinator.finished:
+        if coordinator.pending < workers and not coordinator.exhausted:
+            producer(coordinator)
+
+        for handle, slot in tabs.items():
+            if slot is not None and slot[1] is None:
+                driver.switch_to.window(handle)
+                slot[1] = PendingDeletion(driver, slot[0]["id"], waiter.timeout, status_page=True,
+                                          post_type=slot[0]["type"])
+
+        running = False
+        for position, handle in enumerate(tabs):
+            slot = tabs[handle]
+            if slot is not None:
+                driver.switch_to.window(handle)
+                item, deletion = slot
+                result = deletion.poll(driver)
+                if result is None:
+                    running = True
+                    continue
+                metrics.record("delete", time.monotonic() - deletion.start)
+                coordinator.complete(item, result)
+                tabs[handle] = None
+                waiter.pace()
+
+            if waiter.rate is not None and position >= waiter.rate.concurrency:
+                # The adaptive rate has parked this tab for now
+                continue
+            next_item = coordinator.claim()
+            if next_item is not None:
+                driver.switch_to.window(handle)
+                # Start loading the status page without waiting for it
+                driver.execute_script("window.location.href = arguments[0];", next_item["url"])
+                tabs[handle] = [next_item, None]
+
+        if coordinator.exhausted and all(slot is None for slot in tabs.values()) and not coordinator.pending:
+            break
+        if running:
+            # Let the scripts work before polling the tabs again
+            time.sleep(TAB_POLL_INTERVAL)
+
+    for handle in tabs:
+        driver.switch_to.window(handle)
+        driver.close()
+    driver.switch_to.window(profile_handle)
+
+def _browser_worker(index, chrome_driver_path, headless, cookies, coordinator, username, timeout, floor,
+                    lean_browsing=False, rate=None):
+    """Worker thread: own Chrome instance sharing the main session's cookies"""
+    worker_driver = None
+    try:
+        worker_driver = create_driver(chrome_driver_path, headless, lean_browsing=lean_browsing)
+        set_cookies(worker_driver, cookies)
+        waiter = WaitEngine(worker_driver, timeout=timeout, floor=floor, rate=rate)
+        logger.info(f"Worker {index} started")
+        while True:
+            if rate is not None and index > rate.concurrency and not coordinator.finished:
+                # The adaptive rate has parked this worker for now
+                time.sleep(0.5)
+                continue
+            item = coordinator.claim(timeout=1)
+            if item is None:
+                if coordinator.finished:
+                    break
+                continue
+            try:
+                with metrics.span("navigate"):
+                    worker_driver.get(item["url"])
+                with metrics.span("delete"):
+                    result = delete_article(worker_driver, item["id"], timeout, status_page=True,
+                                            post_type=item["type"])
+            except Exception as e:
+                result = {"status": "failed", "reason": f"{type(e).__name__}: {str(e)[:150]}", "id": item["id"]}
+            coordinator.complete(item, result)
+            waiter.pace()
+    except Exception as e:
+        logger.error(f"Worker {index} stopped: {e}")
+    finally:
+        if worker_driver is not None:
+            try:
+                worker_driver.quit()
+            except:
+                pass
+
+def run_browser_workers(driver, chrome_driver_path, headless, waiter, coordinator, producer, username, workers,
+                        lean_browsing=False):
+    """Delete queued posts using several Chrome instances sharing one login"""
+    cookies = driver.get_cookies()
+    threads = []
+    for index in range(workers):
+        thread = threading.Thread(
+            target=_browser_worker,
+            args=(index + 1, chrome_driver_path, headless, cookies, coordinator, username,
+                  waiter.timeout, waiter.floor, lean_browsing, waiter.rate),
+            daemon=True)
+        thread.start()
+        threads.append(thread)
+
+    # The main thread keeps discovering work for the workers
+    while not coordinator.finished and any(thread.is_alive() for thread in threads):
+        if coordinator.pending < workers * 2 and not coordinator.exhausted:
+            producer(coordinator)
+        else:
+            time.sleep(0.1)
+
+    coordinator.finish_producing()
+    for thread in threads:
+        thread.join()
+
+def run_replay_workers(driver, waiter, coordinator, producer, replayer):
+    """Delete queued posts by replaying captured requests
+
+    Until a request of the needed kind has been captured, posts are deleted
+    through the UI in a separate tab, one at a time; after that whole
+    batches are sent from the page with NetworkReplayer.
+    """
+    producer_handle = driver.current_window_handle
+    ui_handle = None
+    while not coordinator.finished:
+        if coordinator.pending < replayer.batch_size and not coordinator.exhausted:
+            producer(coordinator)
+
+        batch = []
+        while len(batch) < replayer.batch_size:
+            item = coordinator.claim()
+            if item is None:
+                break
+            batch.append(item)
+        if not batch:
+            continue
+
+        replayable = [item for item in batch if replayer.ready(item["type"])]
+        for item in batch:
+            if item in replayable:
+                continue
+            # Learn the request by deleting this post through the UI
+            if ui_handle is None:
+                driver.switch_to.new_window('tab')
+                ui_handle = driver.current_window_handle
+            driver.switch_to.window(ui_handle)
+            driver.get(item["url"])
+            with metrics.span("delete"):
+                result = delete_article(driver, item["id"], waiter.timeout, status_page=True,
+                                        post_type=item["type"])
+            coordinator.complete(item, result)
+            if result["status"] in SUCCESS_STATUSES:
+                replayer.observe()
+            waiter.pace()
+
+        if replayable:
+            # Replay from a page of the site so the requests carry its session
+            driver.switch_to.window(ui_handle or producer_handle)
+            if waiter.rate is not None:
+                replayer.concurrency = waiter.rate.concurrency
+            with metrics.span("replay"):
+                results = replayer.replay(replayable)
+            if waiter.rate is not None and replayer.take_throttled():
+                waiter.rate.congestion("http_429", severe=True)
+            for item, result in zip(replayable, results):
+                coordinator.complete(item, result)
+            waiter.pace()
+            driver.switch_to.window(producer_handle)
+
+    if ui_handle is not None:
+        driver.switch_to.window(ui_handle)
+        driver.close()
+        driver.switch_to.window(producer_handle)
+
+def run_worker_pool(driver, chrome_driver_path, headless, username, waiter, max_delete, workers,
+                    worker_mode="tabs", producer=None, journal=None, skip_ids=(), progress_callback=None,
+                    lean_browsing=False, replayer=None, post_filter=None, prune=False):
+    """Delete posts with a pool of workers pulling from a shared queue
+
+    ``producer`` fills the queue with status IDs; by default the logged-in
+    browser stays on the profile page and harvests them from the timeline,
+    leaving out posts ``post_filter`` rejects (and pruning handled articles
+    with ``prune``).
+    Workers open each ``/{user}/status/{id}`` page and delete it there.
+    With a ``replayer`` the posts are deleted by replaying captured requests
+    instead (see run_replay_workers()).
+    Returns the number of posts deleted.
+    """
+    logger.info(f"Starting {workers} {worker_mode} workers")
+    coordinator = DeletionCoordinator(max_delete, journal, skip_ids, progress_callback, waiter.rate)
+    if producer is None:
+        producer = TimelineHarvester(driver, waiter, username, post_filter, prune=prune)
+    if replayer is not None:
+        run_replay_workers(driver, waiter, coordinator, producer, replayer)
+    elif worker_mode == "browsers":
+        run_browser_workers(driver, chrome_driver_path, headless, waiter, coordinator, producer, username, workers,
+                            lean_browsing)
+    else:
+        run_tab_workers(driver, waiter, coordinator, producer, username, workers, lean_browsing)
+    logger.info(f"Worker pool finished: {dict(coordinator.results)}")
+    return coordinator.deleted
+
+class RunAborted(Exception):
+    """A run that stopped on an error instead of finishing (see delete_tweets(raise_errors=True))"""
+
+    def __init__(self, deleted, error):
+        super().__init__(f"Run aborted after {deleted} deletions: {error}")
+        self.deleted = deleted
+
+def delete_tweets(username, password, chrome_driver_path, headless=True, sleep_time=0.5, max_delete=float('inf'),
+                  wait_timeout=WAIT_TIMEOUT, workers=1, worker_mode="tabs", archive_path=None,
+                  journal_path=None, resume=False, profile_dir=None, cookies_path=None,
+                  selector_stats_path=None, base_url=BASE_URL, driver=None, progress_callback=None,
+                  metrics_json_path=None, metrics_prometheus_path=None, metrics_export_every=0,
+                  lean_browsing=False, network_replay=False, replay_concurrency=REPLAY_CONCURRENCY,
+                  adaptive_rate=False, min_sleep=MIN_SLEEP, max_sleep=MAX_SLEEP, delete_filter=None,
+                  plan_path=None, dry_run=False, manifest_path=None, cdp_transport=False,
+                  prune_dom=False, heap_limit_mb=0, recycle_every=0, lookahead=LOOKAHEAD, attach_address=None,
+                  raise_errors=False):
+    """Main function to delete tweets, retweets, and replies from a Twitter/X account
+
+    Every step waits for the page to react (menu opened, confirmation shown,
+    article removed) rather than sleeping. ``sleep_time`` is only used as a
+    politeness floor between consecutive deletions. With ``adaptive_rate``
+    it is just the starting point: an AdaptiveRate controller shortens the
+    delay while deletions succeed and backs off on timeouts, errors and
+    rate limits, within ``min_sleep`` and ``max_sleep``, and scales the
+    number of active workers the same way.
+
+    ``delete_filter`` (a filters.compile_filter() spec dict or a PostFilter)
+    limits deletion to matching posts, e.g. by date, type, likes or
+    keywords. It is checked against harvested metadata or the archive
+    before any menu is opened.
+
+    With ``plan_path`` the posts to delete are first written to a JSONL
+    manifest, with per-type counts and an estimated duration. An archive is
+    planned in full before deleting; the timeline is planned in the main
+    tab while worker tabs already delete what has been planned. With
+    ``dry_run`` the run stops after planning. ``manifest_path`` executes a
+    manifest written by an earlier run instead of looking for posts.
+
+    With ``cdp_transport`` the single-tab deletion loop runs its page
+    scripts (harvest, delete, waits) over one persistent DevTools websocket
+    instead of a chromedriver HTTP request each (see cdp.CDPDriver).
+
+    The timeline is loaded as it is used up: the single-tab loop starts
+    loading the next page when ``lookahead`` queued posts are left (at most
+    MAX_LOOKAHEAD, so they are still loaded when their turn comes), and
+    only waits for the network when nothing is left to delete. It stops at
+    the timeline's end marker instead of retrying.
+
+    To keep long runs at constant memory, ``prune_dom`` empties handled
+    articles once they are far above the viewport, and the single-tab loop
+    reloads the page when its JS heap passes ``heap_limit_mb`` or every
+    ``recycle_every`` deletions (see recycling.PageRecycler). If a reload
+    does not bring the heap back under the limit, a browser this function
+    started is replaced by a fresh one in the same session.
+
+    With ``workers`` > 1 posts are deleted by a worker pool instead: several
+    tabs of this browser (``worker_mode="tabs"``) or several Chrome instances
+    sharing its cookies (``worker_mode="browsers"``).
+
+    With ``archive_path`` the posts to delete are read from the Twitter/X data
+    export and opened directly by status URL instead of scrolling the timeline.
+
+    Every handled post is recorded in the checkpoint journal at
+    ``journal_path``. With ``resume`` posts the journal already marks as done
+    are skipped, so only new posts and earlier failures are attempted.
+
+    With ``profile_dir`` (a persistent Chrome profile) or ``cookies_path``
+    (cookies saved by an earlier run) the saved session is checked with a
+    single page load and the login flow only runs if it is no longer valid.
+
+    Selector hit/miss statistics (see SelectorRegistry) are loaded from and
+    saved to ``selector_stats_path``, so menu options are looked for the way
+    that worked last.
+
+    With ``lean_browsing`` the browsers this function starts skip images,
+    video and fonts.
+
+    With ``network_replay`` the first post of each kind is deleted through
+    the UI, and the DeleteTweet / UnretweetTweet request the page sent is
+    then replayed for the following posts, ``replay_concurrency`` requests
+    at a time. A passed-in ``driver`` must have been created with
+    ``capture_network=True``.
+
+    ``base_url`` selects the site (e.g. a local mock server). An already
+    running ``driver`` can be passed in; it is then left open afterwards.
+    With ``attach_address`` ("host:port") the run uses a Chrome that is
+    already running with remote debugging instead of starting one, and
+    reuses its logged-in session and open profile tab; the browser stays
+    open afterwards.
+    ``progress_callback`` receives a dict for every post handled.
+
+    Every step is timed as a span in the shared ``instrumentation.metrics``
+    collector. Its histograms and counters are written to
+    ``metrics_json_path`` and/or ``metrics_prometheus_path`` at the end of
+    the run, and every ``metrics_export_every`` deletions if set. The time
+    from the start of the call to the first deletion is logged when it happens.
+
+    Returns the number of posts deleted. A run that stops on an error (the
+    login fails, the browser dies) is logged and returns what it deleted so
+    far, or with ``raise_errors`` raises RunAborted once it has cleaned up.
+    """
+    post_filter = delete_filter if isinstance(delete_filter, PostFilter) else compile_filter(delete_filter)
+    if not post_filter.active:
+        post_filter = None
+    metrics.reset()
+    metrics.configure(metrics_json_path, metrics_prometheus_path, metrics_export_every)
+    overall_start_time = time.monotonic()
+    deleted_count = 0
+    journal = None
+    owns_driver = False
+    skip_ids = set()
+    plan = None
+    aborted = None
+    selector_stats.load(selector_stats_path)
+    try:
+        logger.info(f"Starting tweet deletion for user @{username}")
+        logger.info(f"Maximum tweets to delete: {max_delete}")
+
+        if journal_path:
+            journal = CheckpointJournal(journal_path)
+            if resume:
+                skip_ids = journal.done_ids()
+                logger.info(f"Resuming from {journal_path}: skipping {len(skip_ids)} posts already done, "
+                            f"retrying {len(journal.failed_ids())} failures")
+        seconds_per_post = journal.seconds_per_post() if journal is not None else None
+
+        if archive_path:
+            index = load_archive_index(archive_path, predicate=post_filter)
+            if plan_path:
+                # Planning an export needs no browser
+                with ManifestWriter(plan_path, skip_ids, max_delete) as writer:
+                    producer = ArchiveProducer(index, username, base_url)
+                    while not writer.exhausted:
+                        producer(writer)
+                log_plan_summary(plan_path, writer.counts, seconds_per_post)
+                if dry_run:
+                    return 0
+
+        owns_driver = driver is None
+        if owns_driver:
+            with metrics.span("start_browser"):
+                driver = create_driver(chrome_driver_path, headless, profile_dir, lean_browsing,
+                                       capture_network=network_replay, attach=attach_address)
+        rate = None
+        if adaptive_rate:
+            rate = AdaptiveRate(delay=sleep_time, min_delay=min_sleep, max_delay=max_sleep,
+                                max_concurrency=replay_concurrency if network_replay else max(1, workers),
+                                concurrency=replay_concurrency if network_replay else max(1, workers))
+        waiter = WaitEngine(driver, timeout=wait_timeout, floor=sleep_time, rate=rate)
+
+        with metrics.span("restore_session"):
+            profile_loaded = restore_session(driver, waiter, username, cookies_path, profile_dir, base_url,
+                                             attached=bool(attach_address))
+        if not profile_loaded:
+            with metrics.span("login"):
+                log_in(driver, waiter, username, password, base_url)
+            if cookies_path:
+                save_session_cookies(driver, cookies_path)
+
+        replayer = NetworkReplayer(driver, replay_concurrency) if network_replay else None
+        if replayer is not None:
+            # Discard requests logged before the first deletion
+            replayer.observe()
+
+        if manifest_path or archive_path:
+            if manifest_path:
+                log_plan_summary(manifest_path, manifest_counts(manifest_path), seconds_per_post)
+                producer = ManifestProducer(manifest_path)
+            elif plan_path:
+                producer = ManifestProducer(plan_path)
+            else:
+                producer = ArchiveProducer(index, username, base_url)
+            deleted_count = run_worker_pool(driver, chrome_driver_path, headless, username, waiter,
+                                            max_delete, max(1, workers), worker_mode,
+                                            producer=producer,
+                                            journal=journal, skip_ids=skip_ids,
+                                            progress_callback=progress_callback,
+                                            lean_browsing=lean_browsing, replayer=replayer)
+            return deleted_count
+
+        with metrics.span("open_profile"):
+            open_profile(driver, waiter, username, navigate=not profile_loaded, base_url=base_url)
+
+        if plan_path and dry_run:
+            with ManifestWriter(plan_path, skip_ids, max_delete) as writer:
+                harvester = TimelineHarvester(driver, waiter, username, post_filter, prune=prune_dom)
+                while not writer.exhausted:
+                    harvester(writer)
+            log_plan_summary(plan_path, writer.counts, seconds_per_post)
+            return 0
+
+        if plan_path:
+            # Plan in this tab while worker tabs delete the posts planned so far
+            plan = ManifestWriter(plan_path, skip_ids)
+            deleted_count = run_worker_pool(driver, chrome_driver_path, headless, username, waiter,
+                                            max_delete, max(1, workers), worker_mode,
+                                            producer=TimelineHarvester(driver, waiter, username, post_filter,
+                                                                       plan, prune_dom),
+                                            journal=journal, skip_ids=skip_ids,
+                                            progress_callback=progress_callback,
+                                            lean_browsing=lean_browsing, replayer=replayer)
+            return deleted_count
+
+        if workers > 1:
+            deleted_count = run_worker_pool(driver, chrome_driver_path, headless, username, waiter,
+                                            max_delete, workers, worker_mode,
+                                            journal=journal, skip_ids=skip_ids,
+                                            progress_callback=progress_callback,
+                                            lean_browsing=lean_browsing, replayer=replayer,
+                                            post_filter=post_filter, prune=prune_dom)
+            return deleted_count
+
+        if cdp_transport:
+            # From here on the loop stays in this tab: send its scripts over DevTools directly
+            fast_driver = CDPDriver.attach(driver)
+            if fast_driver is not None:
+                driver = waiter.driver = fast_driver
+                if replayer is not None:
+                    replayer.driver = fast_driver
 
         no_tweets_found_count = 0
+        empty_harvests = 0
+        timeline_end = False  # Whether the timeline shows its end marker
+        prefetched = False  # Whether the next page was requested since the last harvest
+        if lookahead > MAX_LOOKAHEAD:
+            logger.warning(f"A lookahead of {lookahead} posts would unload queued posts; using {MAX_LOOKAHEAD}.")
+            lookahead = MAX_LOOKAHEAD
+        cursor = TimelineCursor(driver, username, skip_ids, post_filter=post_filter, prune=prune_dom)
+        recycler = PageRecycler(heap_limit_mb, recycle_every)
+        cycle_start_time = time.monotonic()
         
         # Main deletion loop
         while deleted_count < max_delete:
             try:
-                logger.info("Finding tweet menu button...")
-                tweet_find_start = time.time()
-                
-                # First check if this is a retweet using its visual indicators
-                try:
-                    # Look for retweet indicator directly in the timeline
-                    retweet_indicator = driver.find_element(By.XPATH, 
-                        '//div[contains(@class, "timeline")]//span[contains(text(), "Retweeted") or contains(text(), "retweeted")]')
-                    
-                    logger.info("Found retweet indicator, looking for its menu...")
-                    # Navigate up to the tweet container and then find its menu button
-                    tweet_container = retweet_indicator.find_element(By.XPATH, './ancestor::article')
-                    retweet_menu_button = tweet_container.find_element(By.CSS_SELECTOR, 'div[data-testid="caret"]')
-                    
-                    tweet_menu_button = retweet_menu_button
-                    logger.info("Found menu button for retweet.")
-                except NoSuchElementException:
-                    # No retweet indicator found, continue with normal process
-                    pass
-                
-                # Try multiple selectors to locate the tweet menu button
-                try:
-                    # Try the original selector
-                    tweet_menu_button = wait.until(EC.element_to_be_clickable((By.CSS_SELECTOR, 'div[data-testid="caret"]')))
-                except TimeoutException:
-                    try:
-                        # Alternative selector 1
-                        tweet_menu_button = wait.until(EC.element_to_be_clickable((By.CSS_SELECTOR, '[aria-label="More"]')))
-                    except TimeoutException:
-                        try:
-                            # Alternative selector 2 - newer X/Twitter interface
-                            tweet_menu_button = wait.until(EC.element_to_be_clickable((By.XPATH, '//div[@aria-label="More" or @aria-label="More options"]')))
-                        except TimeoutException:
-                            logger.info("Checking for empty timeline...")
-                            # Check if the timeline is empty
-                            try:
-                                empty_timeline = driver.find_element(By.XPATH, '//*[contains(text(), "hasn\'t posted") or contains(text(), "No posts")]')
-                                logger.info("No tweets found. Timeline appears to be empty.")
-                                break
-                            except NoSuchElementException:
-                                # Try refreshing the page
-                                logger.info("No menu buttons found. Refreshing the page...")
-                                driver.refresh()
-                                time.sleep(sleep_time)
-                                no_tweets_found_count += 1
-                                
-                                if no_tweets_found_count >= 3:
-                                    logger.info("Unable to find tweets after multiple attempts. Exiting.")
-                                    break
-                                continue
-                
-                logger.info("Tweet menu button found. Clicking...")
-                log_time("Find tweet menu button", tweet_find_start)
-                click_start = time.time()
-                # Try JavaScript click instead of regular click to avoid being intercepted
-                try:
-                    driver.execute_script("arguments[0].click();", tweet_menu_button)
-                except:
-                    try:
-                        tweet_menu_button.click()
-                    except:
-                        logger.info("Click was intercepted, trying to remove overlays...")
-                        # Try to remove any overlays or popups that might be intercepting clicks
-                        driver.execute_script("""
-                            var elements = document.getElementsByClassName('r-1habvwh');
-                            for(var i=0; i<elements.length; i++){
-                                elements[i].style.display='none';
-                            }
-                        """)
-                        time.sleep(sleep_time)
-                        driver.execute_script("arguments[0].click();", tweet_menu_button)
-                
-                time.sleep(sleep_time)
-                log_time("Click tweet menu button", click_start)
+                if not cursor.pending:
+                    # Describe every loaded article in one call instead of searching per post
+                    with metrics.span("harvest"):
+                        queued = cursor.harvest()
+                    if replayer is not None:
+                        # Keep the performance log drained (and catch any missed request)
+                        replayer.observe()
+                    if rate is not None:
+                        if cursor.rate_limited:
+                            rate.congestion("rate_limit_banner", severe=True)
+                        if replayer is not None and replayer.take_throttled():
+                            rate.congestion("http_429", severe=True)
+                    log_step("Harvested %d posts to delete (%d new articles loaded)", queued, cursor.new_articles,
+                             event="harvest", queued=queued, new=cursor.new_articles)
 
-                logger.info("Finding delete button...")
-                delete_find_start = time.time()
-                try:
-                    # Try multiple selectors for the delete button
-                    try:
-                        delete_button = wait.until(EC.element_to_be_clickable((By.XPATH, '//span[text()="Delete"]')))
-                    except TimeoutException:
-                        try:
-                            delete_button = wait.until(EC.element_to_be_clickable((By.XPATH, '//span[contains(text(), "Delete")]')))
-                        except TimeoutException:
-                            try:
-                                delete_button = wait.until(EC.element_to_be_clickable((By.XPATH, '//*[contains(text(), "Delete") or contains(text(), "delete")]')))
-                            except TimeoutException:
-                                # Check for "Undo Retweet" option
-                                try:
-                                    logger.info("Checking for Undo Retweet option...")
-                                    unretweet_time_start = time.time()
-                                    # Try multiple ways to find the unretweet option
-                                    unretweet_button = None
-                                    
-                                    # Try method 1: Direct text match
-                                    try:
-                                        unretweet_button = wait.until(EC.element_to_be_clickable((
-                                            By.XPATH, '//span[text()="Undo Retweet" or text()="Unretweet"]')))
-                                    except:
-                                        # Try method 2: Contains text match
-                                        try:
-                                            unretweet_button = wait.until(EC.element_to_be_clickable((
-                                                By.XPATH, '//span[contains(text(), "Undo") or contains(text(), "unretweet") or contains(text(), "Unretweet")]')))
-                                        except:
-                                            # Try method 3: Check data-testid attributes
-                                            try:
-                                                unretweet_button = wait.until(EC.element_to_be_clickable((
-                                                    By.CSS_SELECTOR, '[data-testid="unretweet"]')))
-                                            except:
-                                                # Try method 4: Look for any menu item with 'retweet' in it
-                                                try:
-                                                    unretweet_button = driver.find_element(By.XPATH, 
-                                                        '//*[contains(@class, "menu") or @role="menu"]//span[contains(text(), "retweet") or contains(text(), "Retweet")]')
-                                                except:
-                                                    pass
-                                    
-                                    if unretweet_button:
-                                        logger.info("Undo Retweet button found. Clicking...")
-                                        log_time("Find unretweet button", unretweet_time_start)
-                                        
-                                        # Use multiple methods to click
-                                        try:
-                                            driver.execute_script("arguments[0].click();", unretweet_button)
-                                        except:
-                                            try:
-                                                unretweet_button.click()
-                                            except:
-                                                driver.execute_script(
-                                                    "document.evaluate('//span[contains(text(), \"Retweet\")]', document, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue.click();")
-                                        
-                                        time.sleep(sleep_time)
-                                    
-                                        # Look for confirmation dialog
-                                        try:
-                                            confirm_time_start = time.time()
-                                            confirm_unretweet = None
-                                            
-                                            # Try multiple ways to find the confirmation button
-                                            try:
-                                                confirm_unretweet = wait.until(EC.element_to_be_clickable((
-                                                    By.XPATH, '//div[@data-testid="unretweetConfirm"]')))
-                                            except:
-                                                try:
-                                                    confirm_unretweet = wait.until(EC.element_to_be_clickable((
-                                                        By.XPATH, '//span[contains(text(), "Undo Retweet") or contains(text(), "unretweet")]/ancestor::div[@role="button"]')))
-                                                except:
-                                                    try:
-                                                        confirm_unretweet = driver.find_element(By.XPATH, 
-                                                            '//div[contains(@class, "modal") or @role="dialog"]//div[@role="button"][.//span[contains(text(), "Retweet") or contains(text(), "retweet")]]')
-                                                    except:
-                                                        pass
-                                            
-                                            if confirm_unretweet:
-                                                logger.info("Found confirmation dialog for unretweet. Confirming...")
-                                                log_time("Find confirm unretweet button", confirm_time_start)
-                                                
-                                                # Try different click methods
-                                                try:
-                                                    driver.execute_script("arguments[0].click();", confirm_unretweet)
-                                                except:
-                                                    try:
-                                                        confirm_unretweet.click()
-                                                    except:
-                                                        driver.execute_script(
-                                                            "document.evaluate('//div[@role=\"dialog\"]//div[@role=\"button\"]', document, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue.click();")
-                                                
-                                                time.sleep(sleep_time)
-                                                deleted_count += 1
-                                                logger.info(f"Unretweeted tweet #{deleted_count}")
-                                                continue
-                                            else:
-                                                logger.info("No confirmation dialog found, but unretweet might still have worked")
-                                                deleted_count += 1
-                                                logger.info(f"Likely unretweeted tweet #{deleted_count}")
-                                                continue
-                                        except:
-                                            logger.info("Unretweet might have worked without confirmation")
-                                            deleted_count += 1
-                                            logger.info(f"Possibly unretweeted tweet #{deleted_count}")
-                                            continue
-                                except:
-                                    # Using alternative approach: look for retweet text in the document
-                                    try:
-                                        logger.info("Using alternative approach to find retweet option...")
-                                        
-                                        # Try to directly inject a click on any "Retweet" related item
-                                        driver.execute_script("""
-                                            var menuItems = document.querySelectorAll('[role="menuitem"]');
-                                            for (var i = 0; i < menuItems.length; i++) {
-                                                if (menuItems[i].textContent.toLowerCase().includes('retweet') || 
-                                                    menuItems[i].textContent.toLowerCase().includes('undo')) {
-                                                    console.log("Found retweet option, clicking it");
-                                                    menuItems[i].click();
-                                                    return true;
-                                                }
-                                            }
-                                            return false;
-                                        """)
-                                        
-                                        # Wait a moment to see if a confirmation dialog appears
-                                        time.sleep(sleep_time)
-                                        
-                                        # Try to click any dialog button that appears
-                                        driver.execute_script("""
-                                            var buttons = document.querySelectorAll('[role="dialog"] [role="button"]');
-                                            for (var i = 0; i < buttons.length; i++) {
-                                                if (buttons[i].textContent.toLowerCase().includes('retweet') || 
-                                                    buttons[i].textContent.toLowerCase().includes('undo')) {
-                                                    console.log("Found retweet confirmation, clicking it");
-                                                    buttons[i].click();
-                                                    return true;
-                                                }
-                                            }
-                                            return false;
-                                        """)
-                                        
-                                        time.sleep(sleep_time)
-                                        # Assume it worked
-                                        deleted_count += 1
-                                        logger.info(f"Used JavaScript injection to unretweet #{deleted_count}")
-                                        continue
-                                    except:
-                                        # None of the options found, close menu and continue
-                                        logger.info("No delete or unretweet option found. Closing menu.")
-                                        driver.execute_script("document.body.click()")
-                                        time.sleep(sleep_time)
-                                        driver.execute_script("window.scrollBy(0, 200)")
-                                        time.sleep(sleep_time)
-                                        continue
-                    
-                    logger.info("Delete button found. Clicking...")
-                    log_time("Find delete button", delete_find_start)
-                    delete_click_start = time.time()
-                    # Try JavaScript click instead of regular click
-                    try:
-                        driver.execute_script("arguments[0].click();", delete_button)
-                    except:
-                        delete_button.click()
-                    
-                    time.sleep(sleep_time)
-                    log_time("Click delete button", delete_click_start)
-                except TimeoutException:
-                    logger.info("Delete option not found in menu. Checking for reply/retweet options...")
-                    
-                    # Check for "remove reply" option - for replies
-                    try:
-                        remove_button = wait.until(EC.element_to_be_clickable(
-                            (By.XPATH, '//span[contains(text(), "Remove reply") or contains(text(), "Remove")]')))
-                        logger.info("Remove reply button found. Clicking...")
-                        driver.execute_script("arguments[0].click();", remove_button)
-                        time.sleep(sleep_time)
-                        
-                        # Confirm removal if needed
-                        try:
-                            confirm_remove = wait.until(EC.element_to_be_clickable(
-                                (By.XPATH, '//div[@data-testid="confirmationSheetConfirm" or contains(@class, "confirm")]')))
-                            driver.execute_script("arguments[0].click();", confirm_remove)
-                            time.sleep(sleep_time)
-                            deleted_count += 1
-                            logger.info(f"Removed reply #{deleted_count}")
+                    if not queued:
+                        if cursor.empty:
+                            logger.info("No tweets found. Timeline appears to be empty.")
+                            break
+                        # Only other people's posts or finished posts loaded: wait for the next page
+                        with metrics.span("scroll"):
+                            page = load_more(driver, wait_timeout)
+                        timeline_end = page["end"]
+                        if page["loaded"]:
                             continue
-                        except:
-                            logger.info("No confirmation dialog for reply removal")
-                    except:
-                        # If no options are found for this tweet, close the menu and move on
-                        logger.info("No delete options found for this tweet. Skipping.")
-                        # Try to close any open menus
-                        webdriver.ActionChains(driver).send_keys(Keys.ESCAPE).perform()
-                        time.sleep(sleep_time/2)
-                        # Also try clicking away
-                        driver.execute_script("document.body.click()")
-                        time.sleep(sleep_time/2)
-                    
-                    # Scroll a bit more and try again
-                    driver.execute_script("window.scrollBy(0, 200)")
-                    time.sleep(sleep_time)
+                        if timeline_end:
+                            logger.info("Reached the end of the timeline.")
+                            break
+                        empty_harvests += 1
+                        if rate is not None:
+                            # The next page did not arrive: the site may be throttling us
+                            rate.congestion("empty_harvest")
+                        if empty_harvests >= 3:
+                            logger.info("Unable to find tweets after multiple attempts. Exiting.")
+                            break
+                        if empty_harvests == 2:
+                            # Nothing arrives: reload and give posts that failed earlier one more chance
+                            logger.info("No new posts found. Refreshing the page...")
+                            metrics.count("retries")
+                            driver.refresh()
+                            waiter.condition("caret_present")
+                            cursor.reset()
+                        continue
+                    empty_harvests = 0
+                    prefetched = False
+
+                if lookahead and not prefetched and not timeline_end and cursor.pending <= lookahead:
+                    # Start loading the next page now, so it is there by the time the queued posts run out
+                    with metrics.span("prefetch"):
+                        timeline_end = load_more(driver, wait_timeout, wait=False)["end"]
+                    prefetched = True
+
+                item = cursor.next()
+                post_start = time.monotonic()
+
+                if replayer is not None and replayer.ready(item["type"]):
+                    # Send the captured request for this post and the ones after it
+                    batch = [item] + cursor.take(min(replayer.batch_size, max_delete - deleted_count) - 1,
+                                                 lambda queued: replayer.ready(queued["type"]))
+                    log_step("Deleting %d posts by replaying captured requests...", len(batch),
+                             event="replay", posts=len(batch))
+                    if rate is not None:
+                        replayer.concurrency = rate.concurrency
+                    with metrics.span("replay"):
+                        outcomes = list(zip(batch, replayer.replay(batch)))
+                    if rate is not None and replayer.take_throttled():
+                        rate.congestion("http_429", severe=True)
+                else:
+                    log_step("Deleting %s post %s...", item["type"], item["id"],
+                             event="delete", id=item["id"], type=item["type"])
+                    with metrics.span("delete"):
+                        # Without element handles (direct DevTools transport) the post is found by ID
+                        target = item["article"] if item["article"] is not None else item["id"]
+                        result = delete_article(driver, target, wait_timeout, post_type=item["type"])
+                        if result["status"] == "failed" and "StaleElement" in (result["reason"] or ""):
+                            # The timeline re-rendered since the harvest; look the post up by ID instead
+                            result = delete_article(driver, item["id"], wait_timeout, post_type=item["type"])
+                        if result["status"] == "failed" and item["caret"] is not None:
+                            # The in-page routine could not finish; drive each step from Selenium instead
+                            logger.info(f"In-page deletion failed ({result['reason']}). Using fallback path...")
+                            metrics.count("fallbacks")
+                            close_open_menus(driver, waiter)
+                            with metrics.span("fallback"):
+                                result = delete_with_fallbacks(driver, waiter, item["caret"],
+                                                               item["article"], item["type"])
+                    if result["status"] not in SUCCESS_STATUSES:
+                        close_open_menus(driver, waiter)
+                    elif replayer is not None and not replayer.ready(item["type"]):
+                        # Pick up the request the page just sent so the next posts can be replayed
+                        replayer.observe()
+                    outcomes = [(item, result)]
+
+                post_duration = (time.monotonic() - post_start) / len(outcomes)
+                deleted_before = deleted_count
+                for item, result in outcomes:
+                    if rate is not None:
+                        rate.record(result)
+                    metrics.count(f"result.{result['status']}")
+                    metrics.record("post", post_duration)
+                    metrics.record(f"post.{item['type']}", post_duration)
+                    if journal is not None:
+                        journal.record(item["id"], result["status"], result.get("reason"))
+                    if result["status"] not in SUCCESS_STATUSES:
+                        # If no options are found for this tweet, move on
+                        logger.info(f"Could not delete post {item['id']} ({result['reason']}). Skipping.")
+                    else:
+                        deleted_count += 1
+                        logger.info(f"{RESULT_MESSAGES[result['status']]} #{deleted_count}")
+                    report_progress(progress_callback, item["id"], result, deleted_count, post_duration)
+
+                if deleted_count == deleted_before:
                     continue
 
-                logger.info("Finding confirm delete button...")
-                confirm_find_start = time.time()
-                try:
-                    # Try multiple selectors for the confirm button
-                    try:
-                        confirm_delete_button = wait.until(EC.element_to_be_clickable((By.XPATH, '//div[@data-testid="confirmationSheetConfirm"]')))
-                    except TimeoutException:
-                        try:
-                            confirm_delete_button = wait.until(EC.element_to_be_clickable((By.XPATH, '//*[contains(text(), "Delete") and (@role="button" or ancestor::button)]')))
-                        except TimeoutException:
-                            confirm_delete_button = wait.until(EC.element_to_be_clickable((By.XPATH, '//div[contains(@class, "confirm") or contains(@class, "Confirm")]')))
-                            
-                    logger.info("Confirm delete button found. Clicking...")
-                    log_time("Find confirm button", confirm_find_start)
-                    confirm_click_start = time.time()
-                    # Try JavaScript click instead of regular click
-                    try:
-                        driver.execute_script("arguments[0].click();", confirm_delete_button)
-                    except:
-                        confirm_delete_button.click()
-                        
-                    time.sleep(sleep_time)  # Reduced wait time after deletion
-                    log_time("Click confirm button", confirm_click_start)
-
-                    deleted_count += 1
-                    logger.info(f"Deleted tweet #{deleted_count}")
-                    
-                    # Record total time for this deletion cycle
-                    if 'cycle_start_time' in locals():
-                        total_cycle_time = time.time() - cycle_start_time
-                        logger.info(f"[TIMING] Total deletion cycle time: {total_cycle_time:.3f} seconds")
-                    
-                    # Start timing the next cycle
-                    cycle_start_time = time.time()
-                    
-                    no_tweets_found_count = 0  # Reset the counter after successful deletion
-                    
-                except TimeoutException:
-                    logger.info("Confirm delete button not found. Might be a UI change.")
-                    # Try to press Escape to close any dialogs
-                    webdriver.ActionChains(driver).send_keys(Keys.ESCAPE).perform()
-                    time.sleep(sleep_time)
+                waiter.pace()
+
+                # Record total time for this deletion cycle and start timing the next one
+                cycle_start_time = log_time("Total deletion cycle time", cycle_start_time)
+                metrics.deletion_done(deleted_count)
+
+                reason = recycler.due(driver, deleted_count) if recycler.active else None
+                if reason is not None:
+                    logger.info(f"Reloading the page to free memory ({reason}) after {deleted_count} deletions...")
+                    with metrics.span("recycle"):
+                        driver.refresh()
+                        waiter.condition("caret_present")
+                        if owns_driver and not attach_address and recycler.over_limit(driver):
+                            logger.info("The reload did not free enough memory. Restarting the browser...")
+                            driver = restart_browser(driver, waiter, username, chrome_driver_path, headless,
+                                                     profile_dir, lean_browsing, network_replay, base_url)
+                            cursor.driver = driver
+                            if replayer is not None:
+                                replayer.driver = driver
+                    cursor.recycle()
+                    recycler.recycled(deleted_count, reason)
+                    timeline_end = prefetched = False
+
+                no_tweets_found_count = 0  # Reset the counter after successful deletion
 
             except Exception as e:
                 logger.warning(f"Error deleting tweet: {type(e)}, {str(e)[:150]}...")  # Only print first 150 chars of error
+                metrics.count("errors")
+                if rate is not None:
+                    rate.congestion("error")
+                # Handles from the last harvest may be stale now
+                cursor.invalidate()
                 
                 # Clean up any overlays before trying again
                 try:
@@ -520,50 +2377,60 @@ def delete_tweets(username, password, chrome_driver_path, headless=True, sleep_t
                     """)
                 except:
                     pass
-                # Scroll a bit more and continue
-                driver.execute_script("window.scrollBy(0, 300)")
-                time.sleep(sleep_time)
+                # Move on to the next posts and continue
+                load_more(driver, wait_timeout, wait=False)
                 no_tweets_found_count += 1
                 
                 if no_tweets_found_count >= 5:
+                    try:
+                        driver.execute_script("return 1")
+                    except Exception as error:
+                        raise RuntimeError(f"The browser stopped responding: {error}") from error
                     logger.info("Repeated errors encountered. There might be no more tweets to delete.")
                     break
 
-            # Add parallel tweet processing
-            try:
-                # Try to find multiple tweet menu buttons at once and process them in sequence
-                menu_buttons = driver.find_elements(By.CSS_SELECTOR, 'div[data-testid="caret"]')
-                if len(menu_buttons) > 1:
-                    logger.info(f"Found {len(menu_buttons)} tweet menu buttons. Processing them sequentially.")
-                    # Process the first one in the next iteration
-            except:
-                pass
-                
-            # Scroll to load more tweets - more aggressive scrolling
-            scroll_start = time.time()
-            driver.execute_script("window.scrollBy(0, 500)")
-            time.sleep(sleep_time/2)  # Reduced wait time after scrolling
-            log_time("Scroll to load more tweets", scroll_start)
-
     except Exception as e:
         logger.error(f"An error occurred: {e}")
+        aborted = e
 
     finally:
-        try:
-            driver.quit()
-        except:
-            pass
+        if isinstance(driver, CDPDriver):
+            driver = driver.detach()
+        if owns_driver:
+            try:
+                driver.quit()
+            except:
+                pass
+
+        if plan is not None:
+            plan.close()
+        if journal is not None:
+            logger.info(f"Journal {journal_path}: {journal.counts()}")
+            journal.close()
+        selector_stats.save()
         
         # Log overall execution time
-        if 'overall_start_time' in locals():
-            total_execution_time = time.time() - overall_start_time
-            logger.info(f"[TIMING] Total execution time: {total_execution_time:.3f} seconds")
-            if deleted_count > 0:
-                avg_time_per_tweet = total_execution_time / deleted_count
-                logger.info(f"[TIMING] Average time per tweet: {avg_time_per_tweet:.3f} seconds")
+        total_execution_time = time.monotonic() - overall_start_time
+        logger.info(f"[TIMING] Total execution time: {total_execution_time:.3f} seconds")
+        if deleted_count > 0:
+            avg_time_per_tweet = total_execution_time / deleted_count
+            logger.info(f"[TIMING] Average time per tweet: {avg_time_per_tweet:.3f} seconds")
+        log_metrics_summary()
+        metrics.export()
         
         logger.info("Script finished.")
-        return deleted_count
+    if aborted is not None and raise_errors:
+        raise RunAborted(deleted_count, aborted) from aborted
+    return deleted_count
+
+def log_metrics_summary():
+    """Log the latency percentiles of each span and the event counters"""
+    summary = metrics.summary()
+    for name, span in summary["spans"].items():
+        logger.info(f"[TIMING] {name}: n={span['count']} p50={span['p50']:.3f}s "
+                    f"p90={span['p90']:.3f}s p99={span['p99']:.3f}s max={span['max']:.3f}s")
+    if summary["counters"]:
+        logger.info(f"Counters: {summary['counters']}")
 
 def parse_arguments():
     """Parse command line arguments"""
@@ -574,6 +2441,63 @@ def parse_arguments():
     parser.add_argument('--headless', action='store_true', help='Run in headless mode')
     parser.add_argument('-s', '--sleep', type=float, help='Sleep time between actions (seconds)')
     parser.add_argument('-m', '--max', type=int, help='Maximum number of tweets to delete')
+    parser.add_argument('-w', '--workers', type=int, help='Number of parallel deletion workers')
+    parser.add_argument('--worker-mode', choices=['tabs', 'browsers'],
+                        help='Run workers as tabs of one browser or as separate browsers')
+    parser.add_argument('--archive', metavar='PATH',
+                        help='Delete the posts listed in a Twitter/X data export (ZIP, folder or tweets.js)')
+    parser.add_argument('--journal', metavar='PATH', help='SQLite checkpoint journal to record progress in')
+    parser.add_argument('--resume', action='store_true',
+                        help='Skip posts the journal marks as done and retry only failures')
+    parser.add_argument('--export-journal', metavar='PATH', help='Export the journal as JSONL and exit')
+    parser.add_argument('--profile-dir', metavar='PATH', help='Chrome profile directory to keep the session in')
+    parser.add_argument('--cookies', metavar='PATH', help='File to save and restore session cookies')
+    parser.add_argument('--metrics-json', metavar='PATH', help='Write timing histograms and counters as JSON')
+    parser.add_argument('--metrics-prom', metavar='PATH', help='Write timing metrics as a Prometheus textfile')
+    parser.add_argument('--metrics-every', type=int, metavar='N',
+                        help='Also export the metrics every N deletions')
+    parser.add_argument('--no-lean', action='store_true',
+                        help='Load images, video and fonts (lean browsing is on by default)')
+    parser.add_argument('--replay', action='store_true',
+                        help='After one deletion through the UI, delete by replaying its network request')
+    parser.add_argument('--replay-concurrency', type=int, metavar='N',
+                        help='Replayed requests in flight at once')
+    parser.add_argument('--fixed-rate', action='store_true',
+                        help='Always wait exactly the sleep time between deletions (no adaptive pacing)')
+    parser.add_argument('--min-sleep', type=float, help='Shortest delay the adaptive pacing may use (seconds)')
+    parser.add_argument('--max-sleep', type=float, help='Longest delay the adaptive pacing may use (seconds)')
+    parser.add_argument('--before', metavar='DATE', help='Only delete posts created before this date (YYYY-MM-DD)')
+    parser.add_argument('--after', metavar='DATE', help='Only delete posts created on or after this date')
+    parser.add_argument('--types', metavar='TYPES',
+                        help='Only delete these post types (comma-separated: own, reply, retweet, quote)')
+    parser.add_argument('--keep-min-likes', type=int, metavar='N', help='Keep posts with at least N likes')
+    parser.add_argument('--keep-keywords', metavar='WORDS',
+                        help='Keep posts containing any of these comma-separated words')
+    parser.add_argument('--only-keywords', metavar='WORDS',
+                        help='Only delete posts containing one of these comma-separated words')
+    parser.add_argument('--plan', metavar='PATH',
+                        help='Write the posts to delete to a JSONL manifest (with counts and an ETA) first')
+    parser.add_argument('--dry-run', action='store_true', help='Stop after planning (requires --plan)')
+    parser.add_argument('--manifest', metavar='PATH', help='Delete the posts listed in a manifest from --plan')
+    parser.add_argument('--cdp', action='store_true',
+                        help='Send page scripts over a direct DevTools connection instead of WebDriver')
+    parser.add_argument('--no-prune', action='store_true',
+                        help='Keep handled articles in the page (pruning them is on by default)')
+    parser.add_argument('--heap-limit', type=int, metavar='MB',
+                        help='Reload the page when its JS heap grows past this many MB (0 to disable)')
+    parser.add_argument('--recycle-every', type=int, metavar='N', help='Reload the page every N deletions')
+    parser.add_argument('--lookahead', type=int, metavar='N',
+                        help='Start loading more of the timeline when N posts are left to delete '
+                             f'(at most {MAX_LOOKAHEAD}, 0 to disable)')
+    parser.add_argument('--daemon', metavar='URL', help='Run the job on a warm-browser daemon (see daemon.py)')
+    parser.add_argument('--attach', metavar='HOST:PORT',
+                        help='Use a Chrome already running with --remote-debugging-port instead of starting one')
+    parser.add_argument('--sync-logging', action='store_true',
+                        help='Write log lines from the deletion loop itself instead of a background thread')
+    parser.add_argument('--step-log', metavar='PATH',
+                        help='Write per-step timings and chatter to PATH as JSON lines instead of the log')
+    parser.add_argument('--step-sample', type=float, metavar='FRACTION',
+                        help='Keep only this fraction of the step log events (e.g. 0.1)')
     parser.add_argument('-v', '--verbose', action='store_true', help='Enable verbose logging')
     return parser.parse_args()
 
@@ -594,21 +2518,121 @@ if __name__ == "__main__":
         SLEEP_BETWEEN_ACTIONS = args.sleep
     if args.max:
         MAX_TWEETS_TO_DELETE = args.max
+    if args.workers:
+        WORKERS = args.workers
+    if args.worker_mode:
+        WORKER_MODE = args.worker_mode
+    if args.archive:
+        ARCHIVE_PATH = args.archive
+    if args.journal:
+        JOURNAL_PATH = args.journal
+    if args.profile_dir:
+        CHROME_PROFILE_DIR = args.profile_dir
+    if args.cookies:
+        COOKIES_PATH = args.cookies
+    if args.metrics_json:
+        METRICS_JSON_PATH = args.metrics_json
+    if args.metrics_prom:
+        METRICS_PROMETHEUS_PATH = args.metrics_prom
+    if args.metrics_every:
+        METRICS_EXPORT_EVERY = args.metrics_every
+    if args.no_lean:
+        LEAN_BROWSING = False
+    if args.replay:
+        NETWORK_REPLAY = True
+    if args.replay_concurrency:
+        REPLAY_CONCURRENCY = args.replay_concurrency
+    if args.fixed_rate:
+        ADAPTIVE_RATE = False
+    if args.min_sleep is not None:
+        MIN_SLEEP = args.min_sleep
+    if args.max_sleep is not None:
+        MAX_SLEEP = args.max_sleep
+    # Filter options on the command line are added to (or replace parts of) DELETE_FILTER
+    DELETE_FILTER = dict(DELETE_FILTER)
+    for key in ("before", "after", "types", "keep_min_likes", "keep_keywords", "only_keywords"):
+        if getattr(args, key) is not None:
+            DELETE_FILTER[key] = getattr(args, key)
+    if args.cdp:
+        CDP_TRANSPORT = True
+    if args.no_prune:
+        DOM_PRUNING = False
+    if args.heap_limit is not None:
+        HEAP_LIMIT_MB = args.heap_limit
+    if args.recycle_every is not None:
+        RECYCLE_EVERY = args.recycle_every
+    if args.lookahead is not None:
+        LOOKAHEAD = args.lookahead
+    if args.daemon:
+        DAEMON_URL = args.daemon
+    if args.attach:
+        ATTACH_ADDRESS = args.attach
+    if args.sync_logging:
+        ASYNC_LOGGING = False
+    if args.step_log:
+        STEP_LOG_PATH = args.step_log
+    if args.step_sample is not None:
+        STEP_LOG_SAMPLE = args.step_sample
+    configure_logging()
     if args.verbose:
         logger.setLevel(logging.DEBUG)
         logger.debug("Debug logging enabled")
+
+    if args.dry_run and not args.plan:
+        logger.error("--dry-run needs a manifest path: use --plan PATH --dry-run")
+        sys.exit(1)
+
+    if args.export_journal:
+        if not JOURNAL_PATH:
+            logger.error("No journal configured to export!")
+            sys.exit(1)
+        with CheckpointJournal(JOURNAL_PATH) as journal:
+            journal.export_jsonl(args.export_journal)
+        sys.exit(0)
         
-    # Verify required parameters
-    if not TWITTER_USERNAME or not TWITTER_PASSWORD:
+    if DAEMON_URL:
+        # Thin client: the daemon's warm browser does the work
+        from daemon import run_client
+        if not TWITTER_USERNAME:
+            logger.error("Twitter/X username is required!")
+            sys.exit(1)
+        start_time = time.time()
+        try:
+            deleted = run_client(DAEMON_URL, {
+                "username": TWITTER_USERNAME,
+                "password": TWITTER_PASSWORD,
+                "max": MAX_TWEETS_TO_DELETE,
+                "sleep": SLEEP_BETWEEN_ACTIONS,
+                "workers": WORKERS,
+                "worker_mode": WORKER_MODE,
+                "archive": ARCHIVE_PATH or None,
+                "resume": args.resume,
+                "filter": DELETE_FILTER,
+                "plan": args.plan,
+                "dry_run": args.dry_run,
+                "manifest": args.manifest,
+                "replay": NETWORK_REPLAY,
+                "adaptive_rate": ADAPTIVE_RATE,
+                "cdp": CDP_TRANSPORT,
+            }, DAEMON_TOKEN_PATH)
+        except (OSError, ValueError) as e:
+            logger.error(f"Daemon job failed: {e}")
+            sys.exit(1)
+        logger.info(f"Summary: Deleted {deleted} posts in {time.time() - start_time:.2f} seconds")
+        sys.exit(0)
+
+    # Verify required parameters (a saved session or an attached browser can stand in
+    # for the password, and planning from an export needs no browser at all). Without
+    # a ChromeDriver path the driver is looked up once and cached (DRIVER_CACHE_PATH).
+    offline = args.dry_run and ARCHIVE_PATH
+    if not TWITTER_USERNAME or not (TWITTER_PASSWORD or COOKIES_PATH or CHROME_PROFILE_DIR or ATTACH_ADDRESS
+                                    or offline):
         logger.error("Twitter/X username and password are required!")
         sys.exit(1)
-    if not CHROME_DRIVER_PATH:
-        logger.error("ChromeDriver path is required!")
-        sys.exit(1)
         
     # Run the deletion process
     logger.info(f"Starting Twitter/X Post Cleaner for user @{TWITTER_USERNAME}")
-    logger.info(f"Configuration: headless={HEADLESS}, sleep={SLEEP_BETWEEN_ACTIONS}, max_delete={MAX_TWEETS_TO_DELETE}")
+    logger.info(f"Configuration: headless={HEADLESS}, sleep={SLEEP_BETWEEN_ACTIONS}, max_delete={MAX_TWEETS_TO_DELETE}, workers={WORKERS}")
     
     start_time = time.time()
     deleted = delete_tweets(
@@ -617,7 +2641,34 @@ if __name__ == "__main__":
         CHROME_DRIVER_PATH,
         HEADLESS, 
         SLEEP_BETWEEN_ACTIONS, 
-        MAX_TWEETS_TO_DELETE
+        MAX_TWEETS_TO_DELETE,
+        workers=WORKERS,
+        worker_mode=WORKER_MODE,
+        archive_path=ARCHIVE_PATH or None,
+        journal_path=JOURNAL_PATH or None,
+        resume=args.resume,
+        profile_dir=CHROME_PROFILE_DIR or None,
+        cookies_path=COOKIES_PATH or None,
+        selector_stats_path=SELECTOR_STATS_PATH or None,
+        metrics_json_path=METRICS_JSON_PATH or None,
+        metrics_prometheus_path=METRICS_PROMETHEUS_PATH or None,
+        metrics_export_every=METRICS_EXPORT_EVERY,
+        lean_browsing=LEAN_BROWSING,
+        network_replay=NETWORK_REPLAY,
+        replay_concurrency=REPLAY_CONCURRENCY,
+        adaptive_rate=ADAPTIVE_RATE,
+        min_sleep=MIN_SLEEP,
+        max_sleep=MAX_SLEEP,
+        delete_filter=DELETE_FILTER,
+        plan_path=args.plan,
+        dry_run=args.dry_run,
+        manifest_path=args.manifest,
+        cdp_transport=CDP_TRANSPORT,
+        prune_dom=DOM_PRUNING,
+        heap_limit_mb=HEAP_LIMIT_MB,
+        recycle_every=RECYCLE_EVERY,
+        lookahead=LOOKAHEAD,
+        attach_address=ATTACH_ADDRESS or None
     )
     
     # Final summary
@@ -0,0 +1,92 @@
+"""
+ChromeDriver and Chrome lookup, resolved once and cached on disk
+"""
+
+import json
+import logging
+import os
+import time
+
+logger = logging.getLogger("TwitterCleaner")
+
+# Resolutions already made by this process, by cache file
+_resolved = {}
+
+def _fingerprint(path):
+    """(size, mtime) of a file, so a cached entry is dropped when the file is replaced (e.g. Chrome updates)"""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return [stat.st_size, int(stat.st_mtime)]
+
+def _load(cache_path):
+    try:
+        with open(cache_path, encoding="utf-8") as f:
+            entry = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if not isinstance(entry, dict) or not entry.get("driver_path") or not entry.get("browser_path"):
+        return None
+    if _fingerprint(entry["driver_path"]) is None:
+        return None
+    if _fingerprint(entry["browser_path"]) != entry.get("browser"):
+        return None
+    return entry
+
+def _save(cache_path, entry):
+    directory = os.path.dirname(os.path.abspath(cache_path))
+    temporary = f"{cache_path}.tmp.{os.getpid()}"
+    try:
+        os.makedirs(directory, exist_ok=True)
+        with open(temporary, "w", encoding="utf-8") as f:
+            json.dump(entry, f, indent=2)
+        os.replace(temporary, cache_path)
+    except OSError as e:
+        logger.warning(f"Could not save the driver cache {cache_path}: {e}")
+
+def _selenium_manager():
+    """Ask Selenium Manager for {driver_path, browser_path} (it may download a matching chromedriver)
+
+    SeleniumManager.binary_paths() exists since Selenium 4.20, the minimum
+    in requirements.txt.
+    """
+    from selenium.webdriver.common.selenium_manager import SeleniumManager
+    return SeleniumManager().binary_paths(["--browser", "chrome"])
+
+def resolve_driver(chrome_driver_path=None, cache_path="driver_cache.json"):
+    """Paths of chromedriver and Chrome to start the browser with, as (driver_path, browser_path)
+
+    An explicit ``chrome_driver_path`` is used as is, with Chrome left for
+    chromedriver to find. Otherwise Selenium would run Selenium Manager on
+    every start to match a chromedriver to the installed Chrome, which
+    spawns a process and may go to the network. Here it runs once, and its
+    answer is kept in ``cache_path`` until Chrome is updated or the driver
+    disappears. Returns (None, None) if the lookup fails, leaving it to
+    Selenium.
+    """
+    if chrome_driver_path:
+        return chrome_driver_path, None
+    if not cache_path:
+        return None, None
+    if cache_path in _resolved:
+        return _resolved[cache_path]
+
+    entry = _load(cache_path)
+    if entry is None:
+        start = time.monotonic()
+        try:
+            found = _selenium_manager()
+        except Exception as e:
+            logger.warning(f"Could not resolve ChromeDriver with Selenium Manager: {e}")
+            return None, None
+        entry = {
+            "driver_path": found["driver_path"],
+            "browser_path": found["browser_path"],
+            "browser": _fingerprint(found["browser_path"]),
+        }
+        logger.info(f"Resolved ChromeDriver {entry['driver_path']} for {entry['browser_path']} "
+                    f"in {time.monotonic() - start:.2f} seconds (cached in {cache_path})")
+        _save(cache_path, entry)
+    _resolved[cache_path] = entry["driver_path"], entry["browser_path"]
+    return _resolved[cache_path]
@@ -0,0 +1,133 @@
+"""
+Selective cleanup: compile a filter specification into a fast post predicate
+"""
+
+import datetime
+import logging
+import re
+
+logger = logging.getLogger("TwitterCleaner")
+
+# Post types a filter can select. The data export does not tell quotes from
+# other posts, so its "tweet" type matches both "own" and "quote".
+FILTER_TYPES = ("own", "reply", "retweet", "quote")
+ARCHIVE_TYPE_ALIASES = {"tweet": ("own", "quote")}
+
+FILTER_KEYS = ("before", "after", "types", "keep_min_likes", "keep_keywords", "only_keywords")
+
+def parse_date(value):
+    """Convert "YYYY-MM-DD", an ISO timestamp or Unix seconds to Unix seconds (UTC)"""
+    if isinstance(value, (int, float)):
+        return int(value)
+    text = str(value).strip().replace(" ", "T")
+    try:
+        # Fractional seconds and the "Z" suffix of page timestamps are dropped (always UTC)
+        if len(text) >= 19:
+            parsed = datetime.datetime.strptime(text[:19], "%Y-%m-%dT%H:%M:%S")
+        else:
+            parsed = datetime.datetime.strptime(text, "%Y-%m-%d")
+    except ValueError:
+        raise ValueError(f"Unrecognised date: {value!r} (expected YYYY-MM-DD)") from None
+    return int(parsed.replace(tzinfo=datetime.timezone.utc).timestamp())
+
+def compile_keywords(keywords):
+    """One case-insensitive regex matching any of the keywords as whole words"""
+    if isinstance(keywords, str):
+        keywords = keywords.split(",")
+    keywords = [keyword.strip() for keyword in keywords or () if keyword.strip()]
+    if not keywords:
+        return None
+    # Longest first, so "cat food" wins over "cat" inside the alternation
+    alternatives = "|".join(re.escape(keyword) for keyword in sorted(keywords, key=len, reverse=True))
+    return re.compile(r"(?<!\w)(?:%s)(?!\w)" % alternatives, re.IGNORECASE)
+
+class PostFilter:
+    """Compiled predicate deciding which posts to delete
+
+    Built once from a specification dict (see compile_filter()) and then
+    called with a post: a dict with ``type``, ``timestamp`` (ISO string or
+    Unix seconds), and optionally ``likes`` and ``text``. Each clause is
+    compiled to a small check, cheapest first, and evaluation stops at the
+    first clause that keeps the post. Posts missing a field a clause needs
+    (e.g. no like count) are kept, so a filter never deletes more than it
+    was asked to.
+    """
+
+    def __init__(self, spec=None):
+        spec = dict(spec or {})
+        unknown = set(spec) - set(FILTER_KEYS)
+        if unknown:
+            raise ValueError(f"Unknown filter setting(s): {', '.join(sorted(unknown))}")
+        self.spec = spec
+        self.checks = []
+
+        types = spec.get("types")
+        if isinstance(types, str):
+            types = types.split(",")
+        if types:
+            types = {post_type.strip().lower() for post_type in types if post_type.strip()}
+            invalid = types - set(FILTER_TYPES)
+            if invalid:
+                raise ValueError(f"Unknown post type(s) in filter: {', '.join(sorted(invalid))}")
+            self.checks.append(lambda post: _types_of(post) & types)
+
+        before = parse_date(spec["before"]) if spec.get("before") is not None else None
+        after = parse_date(spec["after"]) if spec.get("after") is not None else None
+        if before is not None or after is not None:
+            def in_range(post):
+                created = post.get("created_at")
+                if created is None:
+                    created = post.get("timestamp")
+                    if created is None:
+                        return False
+                    created = parse_date(created)
+                return (before is None or created < before) and (after is None or created >= after)
+            self.checks.append(in_range)
+
+        keep_min_likes = spec.get("keep_min_likes")
+        if keep_min_likes is not None:
+            keep_min_likes = int(keep_min_likes)
+            self.checks.append(lambda post: post.get("likes") is not None and post["likes"] < keep_min_likes)
+
+        only = compile_keywords(spec.get("only_keywords"))
+        if only is not None:
+            self.checks.append(lambda post: only.search(post.get("text") or "") is not None)
+
+        keep = compile_keywords(spec.get("keep_keywords"))
+        if keep is not None:
+            self.checks.append(lambda post: keep.search(post.get("text") or "") is None)
+
+    @property
+    def active(self):
+        """Whether any clause is set (an empty filter deletes everything)"""
+        return bool(self.checks)
+
+    def __call__(self, post):
+        """True if the post should be deleted"""
+        for check in self.checks:
+            if not check(post):
+                return False
+        return True
+
+    def describe(self):
+        return ", ".join(f"{key}={self.spec[key]}" for key in FILTER_KEYS if self.spec.get(key) not in (None, "", []))
+
+def _types_of(post):
+    post_type = post.get("type")
+    return set(ARCHIVE_TYPE_ALIASES.get(post_type, (post_type,)))
+
+def compile_filter(spec=None):
+    """Compile a filter specification into a PostFilter
+
+    ``spec`` is a dict with any of:
+      - ``before`` / ``after``: dates ("YYYY-MM-DD"); only posts created
+        before / on or after them are deleted
+      - ``types``: post types to delete, from FILTER_TYPES
+      - ``keep_min_likes``: keep posts with at least this many likes
+      - ``keep_keywords``: keep posts containing any of these words
+      - ``only_keywords``: only delete posts containing one of these words
+    """
+    post_filter = PostFilter(spec)
+    if post_filter.active:
+        logger.info(f"Only deleting posts matching the filter: {post_filter.describe()}")
+    return post_filter
@@ -0,0 +1,237 @@
+"""
+Lightweight timing instrumentation: nested spans, histograms and counters
+"""
+
+import collections
+import contextlib
+import json
+import logging
+import os
+import threading
+import time
+
+from logsetup import log_step
+
+logger = logging.getLogger("TwitterCleaner")
+
+# Upper bounds (seconds) of the histogram buckets in the Prometheus export
+PROMETHEUS_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+METRIC_PREFIX = "twitter_cleaner"
+
+class Histogram:
+    """HDR-style log-linear histogram of durations
+
+    Values are stored in microseconds in buckets that keep the top 6 bits,
+    i.e. about 3% relative precision at any magnitude, with memory bounded
+    by the number of distinct buckets rather than the number of samples.
+    """
+
+    SIGNIFICANT_BITS = 6
+
+    def __init__(self):
+        self.buckets = collections.Counter()
+        self.count = 0
+        self.total = 0.0
+        self.min = float('inf')
+        self.max = 0.0
+
+    @classmethod
+    def _index(cls, micros):
+        shift = max(0, micros.bit_length() - cls.SIGNIFICANT_BITS)
+        return (shift << cls.SIGNIFICANT_BITS) | (micros >> shift)
+
+    @classmethod
+    def _midpoint(cls, index):
+        """Middle of a bucket, in seconds"""
+        shift = index >> cls.SIGNIFICANT_BITS
+        lower = (index & ((1 << cls.SIGNIFICANT_BITS) - 1)) << shift
+        return (lower + ((1 << shift) - 1) / 2) / 1e6
+
+    def record(self, seconds):
+        self.buckets[self._index(max(0, int(seconds * 1e6)))] += 1
+        self.count += 1
+        self.total += seconds
+        self.min = min(self.min, seconds)
+        self.max = max(self.max, seconds)
+
+    def percentile(self, fraction):
+        """Approximate percentile (0-1) in seconds, None if empty"""
+        if not self.count:
+            return None
+        target = max(1, fraction * self.count)
+        seen = 0
+        for index in sorted(self.buckets):
+            seen += self.buckets[index]
+            if seen >= target:
+                return min(max(self._midpoint(index), self.min), self.max)
+        return self.max
+
+    def cumulative(self, bounds):
+        """Counts of values at or below each bound, for Prometheus buckets"""
+        result = []
+        ordered = sorted((self._midpoint(index), count) for index, count in self.buckets.items())
+        for bound in bounds:
+            result.append(sum(count for midpoint, count in ordered if midpoint <= bound))
+        return result
+
+    def summary(self):
+        return {
+            "count": self.count,
+            "sum": round(self.total, 6),
+            "min": round(self.min, 6) if self.count else None,
+            "max": round(self.max, 6) if self.count else None,
+            "mean": round(self.total / self.count, 6) if self.count else None,
+            "p50": self.percentile(0.50),
+            "p90": self.percentile(0.90),
+            "p99": self.percentile(0.99),
+        }
+
+class Instrumentation:
+    """Collects span timings and event counters for a run
+
+    ``span(name)`` times a block with the monotonic clock. Spans nest per
+    thread, so a "confirm" span inside "delete" is recorded as
+    "delete/confirm". Each span name gets its own histogram. Counters track
+    events such as timeouts, fallbacks and retries. The collected data can be
+    exported as JSON and as a Prometheus textfile, at the end of the run and
+    optionally every N deletions.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self.reset()
+
+    def reset(self):
+        """Clear collected data"""
+        with self._lock:
+            self.histograms = collections.defaultdict(Histogram)
+            self.counters = collections.Counter()
+            self.started = time.time()
+            self.run_start = time.monotonic()
+            self.first_deletion = None
+        self.json_path = None
+        self.prometheus_path = None
+        self.export_every = 0
+        self.log_spans = True
+        self._last_export_count = 0
+
+    def configure(self, json_path=None, prometheus_path=None, export_every=0, log_spans=True):
+        """Set export targets. ``export_every`` exports after every N deletions (0 = only at the end)."""
+        self.json_path = json_path
+        self.prometheus_path = prometheus_path
+        self.export_every = export_every or 0
+        self.log_spans = log_spans
+
+    def _stack(self):
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    @contextlib.contextmanager
+    def span(self, name):
+        """Time a block of code as a (possibly nested) span"""
+        stack = self._stack()
+        stack.append(name)
+        full_name = "/".join(stack)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            stack.pop()
+            self.record(full_name, elapsed)
+            if self.log_spans:
+                log_step("[TIMING] %s: %.3f seconds", full_name, elapsed,
+                         event="span", name=full_name, seconds=round(elapsed, 4))
+
+    def record(self, name, seconds, nested=False):
+        """Add a duration to a histogram. With ``nested`` the name is placed under the current span."""
+        if nested and self._stack():
+            name = "/".join(self._stack() + [name])
+        with self._lock:
+            self.histograms[name].record(seconds)
+
+    def count(self, name, amount=1):
+        """Increment an event counter"""
+        with self._lock:
+            self.counters[name] += amount
+
+    def summary(self):
+        """Snapshot of all histograms and counters as plain data"""
+        with self._lock:
+            return {
+                "started": self.started,
+                "uptime_seconds": round(time.time() - self.started, 3),
+                "first_deletion_seconds": self.first_deletion,
+                "spans": {name: histogram.summary() for name, histogram in sorted(self.histograms.items())},
+                "counters": dict(self.counters),
+            }
+
+    def deletion_done(self, deleted_count):
+        """Note the time to the first deletion and export periodically while a run is in progress"""
+        if self.first_deletion is None and deleted_count:
+            with self._lock:
+                first = self.first_deletion is None
+                if first:
+                    self.first_deletion = round(time.monotonic() - self.run_start, 3)
+            if first:
+                logger.info(f"[TIMING] Time to first deletion: {self.first_deletion:.3f} seconds")
+        if self.export_every and deleted_count - self._last_export_count >= self.export_every:
+            self._last_export_count = deleted_count
+            self.export()
+
+    def export(self):
+        """Write the configured JSON and Prometheus files"""
+        try:
+            if self.json_path:
+                _write_atomically(self.json_path, json.dumps(self.summary(), indent=2))
+            if self.prometheus_path:
+                _write_atomically(self.prometheus_path, self.prometheus_text())
+        except OSError as e:
+            logger.warning(f"Could not export metrics: {e}")
+
+    def prometheus_text(self):
+        """Render all metrics in the Prometheus text exposition format"""
+        lines = [
+            f"# HELP {METRIC_PREFIX}_span_seconds Time spent in each step of the cleaner",
+            f"# TYPE {METRIC_PREFIX}_span_seconds histogram",
+        ]
+        with self._lock:
+            histograms = sorted(self.histograms.items())
+            counters = sorted(self.counters.items())
+            started = self.started
+            first_deletion = self.first_deletion
+        for name, histogram in histograms:
+            label = _escape_label(name)
+            for bound, cumulative in zip(PROMETHEUS_BUCKETS, histogram.cumulative(PROMETHEUS_BUCKETS)):
+                lines.append(f'{METRIC_PREFIX}_span_seconds_bucket{{span="{label}",le="{bound}"}} {cumulative}')
+            lines.append(f'{METRIC_PREFIX}_span_seconds_bucket{{span="{label}",le="+Inf"}} {histogram.count}')
+            lines.append(f'{METRIC_PREFIX}_span_seconds_sum{{span="{label}"}} {histogram.total:.6f}')
+            lines.append(f'{METRIC_PREFIX}_span_seconds_count{{span="{label}"}} {histogram.count}')
+        lines.append(f"# HELP {METRIC_PREFIX}_events_total Events such as timeouts, fallbacks and results")
+        lines.append(f"# TYPE {METRIC_PREFIX}_events_total counter")
+        for name, value in counters:
+            lines.append(f'{METRIC_PREFIX}_events_total{{event="{_escape_label(name)}"}} {value}')
+        lines.append(f"# HELP {METRIC_PREFIX}_start_time_seconds Unix time the run started")
+        lines.append(f"# TYPE {METRIC_PREFIX}_start_time_seconds gauge")
+        lines.append(f"{METRIC_PREFIX}_start_time_seconds {started:.3f}")
+        if first_deletion is not None:
+            lines.append(f"# HELP {METRIC_PREFIX}_first_deletion_seconds Time from the start of the run to the first deletion")
+            lines.append(f"# TYPE {METRIC_PREFIX}_first_deletion_seconds gauge")
+            lines.append(f"{METRIC_PREFIX}_first_deletion_seconds {first_deletion:.3f}")
+        return "\n".join(lines) + "\n"
+
+def _escape_label(value):
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+def _write_atomically(path, text):
+    """Write a file via a temporary file so readers never see a partial export"""
+    temporary = f"{path}.tmp"
+    with open(temporary, "w", encoding="utf-8") as output:
+        output.write(text)
+    os.replace(temporary, path)
+
+# Shared instance used by the cleaner
+metrics = Instrumentation()
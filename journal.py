@@ -0,0 +1,151 @@
+"""
+Persistent checkpoint journal of handled posts, for resumable runs
+"""
+
+import json
+import logging
+import sqlite3
+import threading
+import time
+
+logger = logging.getLogger("TwitterCleaner")
+
+# Statuses recorded per post ID
+PENDING = "pending"
+FAILED = "failed"
+DONE_STATUSES = ("deleted", "unretweeted", "removed_reply", "skipped")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS posts (
+    id TEXT PRIMARY KEY,
+    status TEXT NOT NULL,
+    reason TEXT,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    first_seen REAL NOT NULL,
+    updated_at REAL NOT NULL
+)
+"""
+
+UPSERT = """
+INSERT INTO posts (id, status, reason, attempts, first_seen, updated_at)
+VALUES (?, ?, ?, ?, ?, ?)
+ON CONFLICT(id) DO UPDATE SET
+    status = CASE WHEN excluded.status = 'pending' THEN posts.status ELSE excluded.status END,
+    reason = CASE WHEN excluded.status = 'pending' THEN posts.reason ELSE excluded.reason END,
+    attempts = posts.attempts + excluded.attempts,
+    updated_at = excluded.updated_at
+"""
+
+class CheckpointJournal:
+    """SQLite journal of every post the cleaner has queued or handled
+
+    Rows are keyed by status ID and hold the latest status (pending, deleted,
+    unretweeted, removed_reply, skipped or failed), the failure reason, the
+    number of attempts and timestamps. Writes are buffered and flushed in
+    batches in WAL mode, so recording a result costs almost nothing in the
+    deletion loop. Safe to share between worker threads.
+    """
+
+    def __init__(self, path, batch_size=50, flush_interval=2.0):
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._buffer = []
+        self._last_flush = time.monotonic()
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(SCHEMA)
+        self._conn.commit()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def record(self, tweet_id, status, reason=None):
+        """Record the status of a post (buffered)"""
+        now = time.time()
+        attempts = 0 if status == PENDING else 1
+        with self._lock:
+            self._buffer.append((str(tweet_id), status, reason, attempts, now, now))
+            if (len(self._buffer) >= self.batch_size
+                    or time.monotonic() - self._last_flush >= self.flush_interval):
+                self._flush_locked()
+
+    def flush(self):
+        """Write buffered records to disk"""
+        with self._lock:
+            self._flush_locked()
+
+    def _flush_locked(self):
+        if self._buffer:
+            with self._conn:
+                self._conn.executemany(UPSERT, self._buffer)
+            self._buffer = []
+        self._last_flush = time.monotonic()
+
+    def close(self):
+        """Flush and close the journal"""
+        self.flush()
+        self._conn.close()
+
+    def _ids_with_status(self, statuses):
+        self.flush()
+        placeholders = ", ".join("?" for _ in statuses)
+        with self._lock:
+            rows = self._conn.execute(f"SELECT id FROM posts WHERE status IN ({placeholders})", statuses)
+            return {row[0] for row in rows}
+
+    def done_ids(self):
+        """IDs that need no further work (deleted, unretweeted, removed or skipped)"""
+        return self._ids_with_status(DONE_STATUSES)
+
+    def failed_ids(self):
+        """IDs whose last attempt failed"""
+        return self._ids_with_status((FAILED,))
+
+    def counts(self):
+        """Number of journaled posts per status"""
+        self.flush()
+        with self._lock:
+            return dict(self._conn.execute("SELECT status, COUNT(*) FROM posts GROUP BY status"))
+
+    def seconds_per_post(self, sample=500):
+        """Measured time per deletion from the latest ``sample`` deletions, None if unknown
+
+        Uses the median gap between consecutive deletions, so pauses between
+        runs do not skew the estimate.
+        """
+        self.flush()
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT updated_at FROM posts WHERE status IN ('deleted', 'unretweeted', 'removed_reply') "
+                "ORDER BY updated_at DESC LIMIT ?", (sample,))
+            times = [row[0] for row in rows]
+        gaps = sorted(newer - older for newer, older in zip(times, times[1:]))
+        if not gaps:
+            return None
+        return gaps[len(gaps) // 2]
+
+    def export_jsonl(self, path):
+        """Write every journal row to a JSONL file. Returns the number of rows."""
+        self.flush()
+        count = 0
+        with self._lock, open(path, "w", encoding="utf-8") as output:
+            rows = self._conn.execute(
+                "SELECT id, status, reason, attempts, first_seen, updated_at FROM posts ORDER BY updated_at")
+            for tweet_id, status, reason, attempts, first_seen, updated_at in rows:
+                output.write(json.dumps({
+                    "id": tweet_id,
+                    "status": status,
+                    "reason": reason,
+                    "attempts": attempts,
+                    "first_seen": first_seen,
+                    "updated_at": updated_at,
+                }) + "\n")
+                count += 1
+        logger.info(f"Exported {count} journal entries to {path}")
+        return count
@@ -0,0 +1,130 @@
+"""
+Logging pipeline: background handler thread, rotated gzip log files and a sampled JSONL step log
+"""
+
+import atexit
+import gzip
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import random
+import shutil
+import sys
+
+LOG_FORMAT = '%(asctime)s - %(levelname)s - %(message)s'
+
+# Per-step chatter (span timings, "Deleting ..." lines) goes to this child
+# logger, so it can be sampled and routed apart from the run's own messages
+steps = logging.getLogger("TwitterCleaner.steps")
+
+_listener = None
+_step_sample = 1.0  # Fraction of step events kept (set by setup_logging())
+
+def log_step(message, *args, **fields):
+    """Log one step of the hot loop
+
+    Written as a normal log line (``message`` %-formatted with ``args``),
+    or, with a step log configured, as a compact JSON event made of
+    ``fields`` (sampled). Steps that are sampled out or disabled return
+    before a record is made, and the message is only formatted if a line
+    is written, so callers should pass its values as ``args``.
+    """
+    if (_step_sample < 1 and random.random() >= _step_sample) or not steps.isEnabledFor(logging.INFO):
+        return
+    steps.info(message, *args, extra={"fields": fields})
+
+def _gzip_rotator(source, destination):
+    with open(source, "rb") as plain, gzip.open(destination, "wb") as compressed:
+        shutil.copyfileobj(plain, compressed)
+    os.remove(source)
+
+class GzipRotatingFileHandler(logging.handlers.RotatingFileHandler):
+    """RotatingFileHandler that compresses the files it rotates out (log.1.gz, log.2.gz, ...)"""
+
+    def __init__(self, filename, max_bytes, backups):
+        super().__init__(filename, maxBytes=max_bytes, backupCount=backups, encoding="utf-8", delay=True)
+        self.namer = lambda name: name + ".gz"
+        self.rotator = _gzip_rotator
+
+class JSONLineFormatter(logging.Formatter):
+    """One JSON object per record: time, level and the record's structured fields (or its message)"""
+
+    def format(self, record):
+        event = {"ts": round(record.created, 3), "level": record.levelname}
+        fields = getattr(record, "fields", None)
+        if fields:
+            event.update(fields)
+        else:
+            event["msg"] = record.getMessage()
+        return json.dumps(event, separators=(",", ":"), default=str)
+
+def _is_step(record):
+    return record.name == steps.name
+
+def _file_handler(path, max_mb, backups):
+    if max_mb:
+        return GzipRotatingFileHandler(path, max_mb * 1024 * 1024, backups)
+    return logging.FileHandler(path, encoding="utf-8")
+
+def setup_logging(log_path="twitter_cleaner.log", async_logging=True, max_mb=50, backups=5,
+                  step_log_path=None, step_sample=1.0, fmt=LOG_FORMAT):
+    """Configure the root logger for a run (replacing an earlier configuration)
+
+    Messages go to stdout and to ``log_path``, which is rotated at
+    ``max_mb`` MB with ``backups`` (at least 1) gzipped old files kept
+    (``max_mb`` 0 = never rotate). With ``step_log_path`` per-step chatter
+    (see log_step()) goes there instead, as JSON lines, keeping a
+    ``step_sample`` fraction of them. With ``async_logging`` the handlers run on a background thread
+    behind a queue, so the deletion loop never waits for disk or console
+    I/O; the queue is flushed at exit (or by stop_logging()).
+    """
+    stop_logging()
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+        handler.close()
+    root.setLevel(logging.INFO)
+
+    formatter = logging.Formatter(fmt)
+    handlers = [logging.StreamHandler(sys.stdout)]
+    if log_path:
+        handlers.append(_file_handler(log_path, max_mb, backups))
+    for handler in handlers:
+        handler.setFormatter(formatter)
+
+    global _step_sample
+    _step_sample = 1.0
+    if step_log_path:
+        for handler in handlers:
+            handler.addFilter(lambda record: not _is_step(record))
+        step_handler = _file_handler(step_log_path, max_mb, backups)
+        step_handler.setFormatter(JSONLineFormatter())
+        step_handler.addFilter(_is_step)
+        handlers.append(step_handler)
+        # Dropped by log_step() before a record is even made
+        _step_sample = step_sample
+
+    if not async_logging:
+        for handler in handlers:
+            root.addHandler(handler)
+        return None
+
+    global _listener
+    records = queue.SimpleQueue()
+    root.addHandler(logging.handlers.QueueHandler(records))
+    _listener = logging.handlers.QueueListener(records, *handlers, respect_handler_level=True)
+    _listener.start()
+    return _listener
+
+def stop_logging():
+    """Write out queued records and stop the background logging thread, if any"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        for handler in _listener.handlers:
+            handler.close()
+        _listener = None
+
+atexit.register(stop_logging)
@@ -0,0 +1,129 @@
+"""
+Deletion plans: a streaming JSONL manifest of the posts a run will delete
+"""
+
+import collections
+import json
+import logging
+import os
+import threading
+
+logger = logging.getLogger("TwitterCleaner")
+
+# Assumed time per deletion when no earlier run has measured it
+DEFAULT_SECONDS_PER_POST = 2.0
+
+class ManifestWriter:
+    """Writes planned posts to a new JSONL manifest as they are discovered
+
+    Each line is {id, url, type}. Lines are flushed as they are written, so
+    the manifest can be inspected (or consumed) while planning is still
+    running. The writer also works as a producer's sink in place of a
+    DeletionCoordinator: submit() de-duplicates, skips ``skip_ids`` and
+    stops accepting posts after ``limit``.
+    """
+
+    def __init__(self, path, skip_ids=(), limit=float('inf')):
+        self.path = path
+        self.limit = limit
+        self.counts = collections.Counter()
+        self._seen = set(skip_ids)
+        self._exhausted = False
+        self._lock = threading.Lock()
+        self._output = open(path, "w", encoding="utf-8")
+
+    def submit(self, tweet_id, url, post_type=None):
+        """Add a post to the plan. Returns False if it was already planned (or skipped)."""
+        with self._lock:
+            if tweet_id in self._seen or self._exhausted:
+                return False
+            self._seen.add(tweet_id)
+            self._output.write(json.dumps({"id": tweet_id, "url": url, "type": post_type}) + "\n")
+            self._output.flush()
+            self.counts[post_type] += 1
+            if self.total >= self.limit:
+                self._exhausted = True
+        return True
+
+    def finish_producing(self):
+        with self._lock:
+            self._exhausted = True
+
+    @property
+    def total(self):
+        return sum(self.counts.values())
+
+    @property
+    def pending(self):
+        # Nothing waits in a queue: planned posts go straight to disk
+        return 0
+
+    @property
+    def exhausted(self):
+        with self._lock:
+            return self._exhausted
+
+    def close(self):
+        with self._lock:
+            if not self._output.closed:
+                self._output.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+def read_manifest(path):
+    """Yield the planned posts of a manifest one at a time"""
+    with open(path, encoding="utf-8") as manifest:
+        for line in manifest:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield json.loads(line)
+            except ValueError:
+                # A line cut off by an interrupted plan
+                logger.warning(f"Skipping malformed manifest line in {path}")
+
+class ManifestProducer:
+    """Work producer: queue the posts of a manifest, a batch at a time"""
+
+    def __init__(self, path, batch_size=100):
+        self.path = path
+        self.batch_size = batch_size
+        self._entries = read_manifest(path)
+
+    def __call__(self, coordinator):
+        for _ in range(self.batch_size):
+            entry = next(self._entries, None)
+            if entry is None:
+                coordinator.finish_producing()
+                return
+            coordinator.submit(entry["id"], entry["url"], entry.get("type"))
+
+def manifest_counts(path):
+    """Number of planned posts per type in an existing manifest"""
+    return collections.Counter(entry.get("type") for entry in read_manifest(path))
+
+def format_duration(seconds):
+    """Render a duration like "2h 05m" or "3m 20s\""""
+    seconds = int(round(seconds))
+    hours, remainder = divmod(seconds, 3600)
+    minutes, seconds = divmod(remainder, 60)
+    if hours:
+        return f"{hours}h {minutes:02d}m"
+    return f"{minutes}m {seconds:02d}s"
+
+def log_plan_summary(path, counts, seconds_per_post=None, done=0):
+    """Log the per-type counts of a plan and an ETA for the posts not ``done`` yet"""
+    total = sum(counts.values())
+    measured = seconds_per_post is not None
+    seconds_per_post = seconds_per_post if measured else DEFAULT_SECONDS_PER_POST
+    size = os.path.getsize(path) if os.path.exists(path) else 0
+    logger.info(f"Plan: {total} posts to delete in {path} ({size / 1024:.0f} KB): "
+                f"{dict(sorted(counts.items(), key=lambda pair: str(pair[0])))}")
+    logger.info(f"Estimated time for {max(0, total - done)} remaining posts: "
+                f"{format_duration(max(0, total - done) * seconds_per_post)} at {seconds_per_post:.2f}s per post "
+                f"({'measured' if measured else 'no measured throughput yet'})")
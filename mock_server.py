@@ -0,0 +1,639 @@
+#!/usr/bin/env python3
+"""
+Offline stand-in for Twitter/X used to test and benchmark the cleaner
+
+Serves a fake login flow, a profile timeline with infinite scroll, status
+pages, and the menus, buttons and confirmation sheets the cleaner looks for
+(caret, Delete / Undo Retweet / Remove reply, confirmationSheetConfirm),
+backed by synthetic posts held in memory.
+"""
+
+import argparse
+import datetime
+import json
+import logging
+import random
+import re
+import threading
+import time
+import urllib.parse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+logger = logging.getLogger("TwitterCleaner")
+
+SESSION_COOKIE = "auth_token"
+
+# Types of synthetic posts, with their default share of the timeline
+POST_MIX = {
+    "tweet": 0.5,      # Own post: caret menu has Delete
+    "reply": 0.2,      # Own reply: caret menu has Delete (or Remove reply in the legacy UI)
+    "retweet": 0.2,    # Repost: undone with the retweet button (or Undo Retweet in the legacy UI)
+    "foreign": 0.1,    # Someone else's post shown in a thread: nothing to delete
+}
+
+PAGE_TEMPLATE = """<!DOCTYPE html>
+<html lang="en">
+<head>
+<meta charset="utf-8">
+<title>{title}</title>
+<style>
+body {{ font-family: sans-serif; margin: 0; }}
+nav {{ position: fixed; left: 0; top: 0; width: 200px; }}
+main {{ margin-left: 220px; width: 600px; }}
+article {{ border-bottom: 1px solid #ddd; padding: 12px; position: relative; min-height: 120px; }}
+[data-testid="caret"] {{ position: absolute; right: 8px; top: 8px; cursor: pointer; padding: 4px; }}
+[role="menu"] {{ position: absolute; background: #fff; border: 1px solid #999; z-index: 10; }}
+[role="menuitem"] {{ padding: 8px 16px; cursor: pointer; }}
+[role="group"] div {{ display: inline-block; margin-right: 24px; cursor: pointer; }}
+.sheet {{ position: fixed; inset: 0; background: rgba(0,0,0,.4); z-index: 20; }}
+.sheet > div {{ background: #fff; width: 300px; margin: 200px auto; padding: 16px; }}
+.r-1habvwh {{ position: fixed; inset: 0; background: rgba(0,0,0,.2); z-index: 30; }}
+</style>
+</head>
+<body>
+<nav>{nav}</nav>
+<main data-testid="primaryColumn">{body}</main>
+<script>
+var CONFIG = {config};
+{script}
+</script>
+</body>
+</html>
+"""
+
+LOGIN_BODY = """<h1>Sign in to X</h1><div id="flow"></div>"""
+
+LOGIN_SCRIPT = r"""
+var flow = document.getElementById('flow');
+var state = {username: null};
+
+function prompt(name, type, onSubmit) {
+    flow.innerHTML = '';
+    var input = document.createElement('input');
+    input.name = name;
+    input.type = type;
+    input.autocomplete = 'off';
+    input.addEventListener('keydown', function (event) {
+        if (event.key === 'Enter') {
+            var value = input.value;
+            setTimeout(function () { onSubmit(value); }, CONFIG.uiDelayMs);
+        }
+    });
+    flow.appendChild(input);
+    input.focus();
+}
+
+function askPassword() {
+    prompt('password', 'password', function (password) {
+        fetch('/api/login', {
+            method: 'POST',
+            headers: {'Content-Type': 'application/json'},
+            body: JSON.stringify({username: state.username, password: password})
+        }).then(function (response) {
+            if (response.ok) {
+                location.href = '/home';
+            } else {
+                flow.insertAdjacentHTML('beforeend', '<p role="alert">Wrong password!</p>');
+            }
+        });
+    });
+}
+
+prompt('text', 'text', function (username) {
+    state.username = username;
+    if (CONFIG.verifyUsername) {
+        prompt('text', 'text', function () { askPassword(); });
+    } else {
+        askPassword();
+    }
+});
+"""
+
+TIMELINE_SCRIPT = r"""
+var main = document.querySelector('main');
+var timeline = document.getElementById('timeline');
+var cursor = 0;
+var loading = false;
+var finished = false;
+
+function el(tag, attrs, html) {
+    var node = document.createElement(tag);
+    Object.keys(attrs || {}).forEach(function (key) { node.setAttribute(key, attrs[key]); });
+    if (html !== undefined) { node.innerHTML = html; }
+    return node;
+}
+
+function later(callback) {
+    setTimeout(callback, CONFIG.uiDelayMs);
+}
+
+function maybeOverlay() {
+    if (Math.random() < CONFIG.overlayRate) {
+        var overlay = el('div', {'class': 'r-1habvwh', 'role': 'dialog', 'aria-label': 'Promotion'},
+                         '<p>Upgrade to Premium!</p>');
+        document.body.appendChild(overlay);
+        overlay.addEventListener('click', function () { overlay.remove(); });
+    }
+}
+
+function closeMenus() {
+    document.querySelectorAll('[role="menu"]').forEach(function (menu) { menu.remove(); });
+}
+
+function api(action, id) {
+    var name = action === 'unretweet' ? 'UnretweetTweet' : 'DeleteTweet';
+    var variables = action === 'unretweet' ? {source_tweet_id: id} : {tweet_id: id};
+    return fetch('/i/api/graphql/' + CONFIG.queryIds[name] + '/' + name, {
+        method: 'POST',
+        credentials: 'include',
+        headers: {
+            'Content-Type': 'application/json',
+            'authorization': 'Bearer MOCK',
+            'x-csrf-token': CONFIG.csrfToken
+        },
+        body: JSON.stringify({variables: variables, queryId: CONFIG.queryIds[name]})
+    });
+}
+
+function removeCell(article) {
+    var cell = article.closest('[data-testid="cellInnerDiv"]') || article;
+    cell.remove();
+    if (CONFIG.statusPage) {
+        main.insertAdjacentHTML('beforeend', '<p>This post was deleted by the post author.</p>');
+    }
+}
+
+function confirmationSheet(label, onConfirm) {
+    var sheet = el('div', {'class': 'sheet', 'role': 'dialog', 'data-testid': 'confirmationSheetDialog'});
+    var box = el('div');
+    box.appendChild(el('p', {}, 'This can’t be undone.'));
+    var confirm = el('div', {'role': 'button', 'data-testid': 'confirmationSheetConfirm'}, '<span>' + label + '</span>');
+    var cancel = el('div', {'role': 'button', 'data-testid': 'confirmationSheetCancel'}, '<span>Cancel</span>');
+    confirm.addEventListener('click', function () { sheet.remove(); onConfirm(); });
+    cancel.addEventListener('click', function () { sheet.remove(); });
+    box.appendChild(confirm);
+    box.appendChild(cancel);
+    sheet.appendChild(box);
+    document.body.appendChild(sheet);
+}
+
+function openMenu(anchor, items) {
+    closeMenus();
+    later(function () {
+        var menu = el('div', {'role': 'menu', 'data-testid': 'Dropdown'});
+        items.forEach(function (item) {
+            var attrs = {'role': 'menuitem'};
+            if (item.testid) { attrs['data-testid'] = item.testid; }
+            var node = el('div', attrs, '<span>' + item.label + '</span>');
+            node.addEventListener('click', function (event) {
+                event.stopPropagation();
+                closeMenus();
+                later(item.action);
+            });
+            menu.appendChild(node);
+        });
+        anchor.appendChild(menu);
+        maybeOverlay();
+    });
+}
+
+function deleteFlow(article, post, label) {
+    confirmationSheet(label, function () {
+        api('delete', post.id).then(function (response) {
+            if (response.ok) { removeCell(article); }
+        });
+    });
+}
+
+function unretweetFlow(article, post) {
+    api('unretweet', post.id).then(function (response) {
+        if (response.ok) { removeCell(article); }
+    });
+}
+
+function caretItems(article, post) {
+    var items = [];
+    if (post.type === 'tweet' || (post.type === 'reply' && !CONFIG.legacyUi)) {
+        items.push({label: 'Delete', action: function () { deleteFlow(article, post, 'Delete'); }});
+        items.push({label: 'Pin to your profile', action: function () {}});
+    } else if (post.type === 'reply') {
+        items.push({label: 'Remove reply', action: function () { deleteFlow(article, post, 'Remove'); }});
+    } else if (post.type === 'retweet' && CONFIG.legacyUi) {
+        items.push({label: 'Undo Retweet', action: function () {
+            confirmationSheet('Undo Retweet', function () { unretweetFlow(article, post); });
+        }});
+    }
+    items.push({label: 'Not interested in this post', action: function () {}});
+    items.push({label: 'Follow @' + post.author, action: function () {}});
+    return items;
+}
+
+function renderPost(post, focal) {
+    var cell = el('div', {'data-testid': 'cellInnerDiv'});
+    var article = el('article', {'data-testid': 'tweet', 'role': 'article', 'tabindex': focal ? '-1' : '0'});
+    if (post.type === 'retweet') {
+        article.appendChild(el('div', {'data-testid': 'socialContext'}, 'You reposted'));
+    }
+    var permalink = '/' + post.author + '/status/' + post.id;
+    article.appendChild(el('div', {'data-testid': 'User-Name'},
+        '<a href="/' + post.author + '">@' + post.author + '</a> · ' +
+        '<a href="' + permalink + '"><time datetime="' + post.created_at + '">' +
+        post.created_at.slice(0, 10) + '</time></a>'));
+    if (post.type === 'reply') {
+        article.appendChild(el('div', {}, 'Replying to <a href="/someone">@someone</a>'));
+    }
+    article.appendChild(el('div', {'data-testid': 'tweetText', 'lang': 'en'}, post.text));
+    if (post.media) {
+        article.appendChild(el('div', {'data-testid': 'tweetPhoto'},
+            '<img alt="Image" src="/media/' + post.id + '.jpg" width="500" height="280">'));
+    }
+
+    var group = el('div', {'role': 'group'});
+    group.appendChild(el('div', {'data-testid': 'reply'}, '<span>' + post.replies + '</span>'));
+    var retweetButton = el('div', {'data-testid': post.type === 'retweet' ? 'unretweet' : 'retweet', 'role': 'button'},
+                           '<span>' + post.retweets + '</span>');
+    group.appendChild(retweetButton);
+    group.appendChild(el('div', {'data-testid': 'like', 'role': 'button'}, '<span>' + post.likes + '</span>'));
+    article.appendChild(group);
+
+    var caret = el('div', {'data-testid': 'caret', 'aria-label': 'More', 'role': 'button'}, '…');
+    caret.addEventListener('click', function (event) {
+        event.stopPropagation();
+        openMenu(caret, caretItems(article, post));
+    });
+    article.appendChild(caret);
+
+    if (post.type === 'retweet') {
+        retweetButton.addEventListener('click', function (event) {
+            event.stopPropagation();
+            openMenu(retweetButton, [
+                {label: 'Undo repost', testid: 'unretweetConfirm',
+                 action: function () { unretweetFlow(article, post); }},
+                {label: 'Quote', action: function () {}}
+            ]);
+        });
+    }
+
+    cell.appendChild(article);
+    return cell;
+}
+
+function showEmpty() {
+    timeline.appendChild(el('div', {'data-testid': 'emptyState'},
+        '<span>@' + CONFIG.username + ' hasn’t posted</span>'));
+}
+
+function loadMore() {
+    if (loading || finished) { return; }
+    loading = true;
+    fetch('/api/timeline?tab=' + CONFIG.tab + '&cursor=' + cursor + '&count=' + CONFIG.pageSize, {credentials: 'include'})
+        .then(function (response) { return response.json(); })
+        .then(function (page) {
+            page.posts.forEach(function (post) { timeline.appendChild(renderPost(post, false)); });
+            cursor = page.next_cursor;
+            finished = page.next_cursor === null;
+            if (finished && !timeline.querySelector('article')) { showEmpty(); }
+            if (finished) { timeline.appendChild(el('div', {'data-testid': 'timelineEnd'})); }
+            loading = false;
+            maybeOverlay();
+            nearBottom();
+        });
+}
+
+function nearBottom() {
+    if (window.innerHeight + window.scrollY >= document.body.scrollHeight - 1200) { loadMore(); }
+}
+
+document.addEventListener('click', closeMenus);
+document.addEventListener('keydown', function (event) {
+    if (event.key === 'Escape') {
+        closeMenus();
+        document.querySelectorAll('.sheet').forEach(function (sheet) { sheet.remove(); });
+    }
+});
+
+if (CONFIG.statusPage) {
+    fetch('/api/status/' + CONFIG.statusId, {credentials: 'include'})
+        .then(function (response) { return response.ok ? response.json() : null; })
+        .then(function (post) {
+            if (post) {
+                timeline.appendChild(renderPost(post, true));
+            } else {
+                main.insertAdjacentHTML('beforeend', '<p>Hmm...this page doesn’t exist.</p>');
+            }
+        });
+} else {
+    window.addEventListener('scroll', nearBottom);
+    loadMore();
+}
+"""
+
+class MockTimeline:
+    """Synthetic posts of one account, shared by all requests"""
+
+    def __init__(self, username, posts=200, mix=None, media_rate=0.3, seed=0):
+        self.username = username
+        self._lock = threading.Lock()
+        self.posts = []
+        self.deleted = set()
+        self.requests = {"DeleteTweet": 0, "UnretweetTweet": 0}
+        rng = random.Random(seed)
+        mix = mix or POST_MIX
+        types = list(mix)
+        weights = [mix[name] for name in types]
+        start = datetime.datetime(2024, 1, 1, tzinfo=datetime.timezone.utc)
+        for index in range(posts):
+            post_type = rng.choices(types, weights)[0]
+            created = start - datetime.timedelta(hours=index * 7 + rng.randint(0, 6))
+            self.posts.append({
+                "id": str(1700000000000000000 + posts - index),
+                "type": post_type,
+                "author": username if post_type in ("tweet", "reply") else f"friend{index % 17}",
+                "text": f"Synthetic {post_type} number {index} #mock",
+                "created_at": created.strftime("%Y-%m-%dT%H:%M:%S.000Z"),
+                "likes": rng.randint(0, 500),
+                "retweets": rng.randint(0, 50),
+                "replies": rng.randint(0, 20),
+                "media": rng.random() < media_rate,
+            })
+
+    def page(self, tab, cursor, count):
+        """Return a page of visible posts and the next cursor (None at the end)"""
+        with self._lock:
+            visible = [post for post in self.posts if post["id"] not in self.deleted
+                       and (tab == "with_replies" or post["type"] != "reply")]
+        page = visible[cursor:cursor + count]
+        next_cursor = cursor + count if cursor + count < len(visible) else None
+        return page, next_cursor
+
+    def get(self, tweet_id):
+        with self._lock:
+            if tweet_id in self.deleted:
+                return None
+            return next((post for post in self.posts if post["id"] == tweet_id), None)
+
+    def delete(self, tweet_id, operation):
+        """Apply a DeleteTweet / UnretweetTweet. Returns True if the post existed."""
+        with self._lock:
+            self.requests[operation] += 1
+            post = next((post for post in self.posts if post["id"] == tweet_id), None)
+            if post is None or tweet_id in self.deleted:
+                return False
+            expected = "retweet" if operation == "UnretweetTweet" else None
+            if expected and post["type"] != expected:
+                return False
+            if operation == "DeleteTweet" and post["type"] not in ("tweet", "reply"):
+                return False
+            self.deleted.add(tweet_id)
+            return True
+
+    @property
+    def remaining(self):
+        with self._lock:
+            return sum(1 for post in self.posts
+                       if post["type"] != "foreign" and post["id"] not in self.deleted)
+
+class MockXHandler(BaseHTTPRequestHandler):
+    """Routes requests of the mock site"""
+
+    server_version = "MockX/1.0"
+    STATUS_PATH = re.compile(r"^/([^/]+)/status/(\d+)$")
+    GRAPHQL_PATH = re.compile(r"^/i/api/graphql/([^/]+)/(DeleteTweet|UnretweetTweet)$")
+
+    def log_message(self, format, *args):
+        logger.debug("mock: " + format % args)
+
+    @property
+    def mock(self):
+        return self.server.mock
+
+    def _delay(self):
+        latency = self.mock.latency
+        if latency:
+            time.sleep(latency * random.uniform(0.5, 1.5))
+
+    def _authenticated(self):
+        cookies = self.headers.get("Cookie", "")
+        return f"{SESSION_COOKIE}={self.mock.session_token}" in cookies
+
+    def _send(self, status, body, content_type="text/html; charset=utf-8", headers=None):
+        data = body.encode("utf-8") if isinstance(body, str) else body
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _json(self, status, payload, headers=None):
+        self._send(status, json.dumps(payload), "application/json", headers)
+
+    def _redirect(self, location):
+        self.send_response(302)
+        self.send_header("Location", location)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def _page(self, title, body, script, **config):
+        config.update({
+            "username": self.mock.timeline.username,
+            "uiDelayMs": int(self.mock.ui_delay * 1000),
+            "overlayRate": self.mock.overlay_rate,
+            "pageSize": self.mock.page_size,
+            "legacyUi": self.mock.legacy_ui,
+            "verifyUsername": self.mock.verify_username,
+            "queryIds": self.mock.query_ids,
+            "csrfToken": self.mock.csrf_token,
+        })
+        if self._authenticated():
+            nav = (f'<a data-testid="AppTabBar_Profile_Link" href="/{self.mock.timeline.username}">Profile</a>'
+                   '<div data-testid="SideNav_AccountSwitcher_Button">Account</div>')
+        else:
+            nav = '<a data-testid="loginButton" href="/login">Log in</a>'
+        self._send(200, PAGE_TEMPLATE.format(title=title, nav=nav, body=body, script=script,
+                                             config=json.dumps(config)))
+
+    def do_GET(self):
+        url = urllib.parse.urlparse(self.path)
+        path = url.path.rstrip("/") or "/"
+        query = urllib.parse.parse_qs(url.query)
+        username = self.mock.timeline.username
+
+        if path in ("/login", "/i/flow/login"):
+            self._page("Log in to X", LOGIN_BODY, LOGIN_SCRIPT)
+        elif path in ("/", "/home"):
+            if not self._authenticated():
+                self._redirect("/login")
+            else:
+                self._page("Home / X", "<h2>Home</h2>", "")
+        elif path.lower() in (f"/{username.lower()}", f"/{username.lower()}/with_replies"):
+            tab = "with_replies" if path.endswith("/with_replies") else "posts"
+            body = (f'<h2>@{username}</h2>'
+                    f'<div role="tablist"><a href="/{username}">Posts</a> '
+                    f'<a href="/{username}/with_replies">Replies</a></div>'
+                    '<section aria-label="Timeline" id="timeline"></section>')
+            self._page(f"@{username} / X", body, TIMELINE_SCRIPT, tab=tab, statusPage=False)
+        elif self.STATUS_PATH.match(path):
+            status_id = self.STATUS_PATH.match(path).group(2)
+            body = '<h2>Post</h2><section aria-label="Conversation" id="timeline"></section>'
+            self._page("Post / X", body, TIMELINE_SCRIPT, tab="status", statusPage=True, statusId=status_id)
+        elif path == "/api/timeline":
+            self._delay()
+            tab = query.get("tab", ["posts"])[0]
+            cursor = int(query.get("cursor", ["0"])[0])
+            count = int(query.get("count", [str(self.mock.page_size)])[0])
+            posts, next_cursor = self.mock.timeline.page(tab, cursor, count)
+            self._json(200, {"posts": posts, "next_cursor": next_cursor})
+        elif path.startswith("/api/status/"):
+            self._delay()
+            post = self.mock.timeline.get(path.rsplit("/", 1)[1])
+            if post is None:
+                self._json(404, {"errors": [{"message": "Not found"}]})
+            else:
+                self._json(200, post)
+        elif path.startswith("/media/"):
+            self._delay()
+            self._send(200, b"\xff\xd8\xff\xd9", "image/jpeg")
+        else:
+            self._send(404, "<h1>Hmm...this page doesn't exist.</h1>")
+
+    def do_POST(self):
+        path = urllib.parse.urlparse(self.path).path
+        length = int(self.headers.get("Content-Length") or 0)
+        try:
+            payload = json.loads(self.rfile.read(length) or b"{}")
+        except ValueError:
+            self._json(400, {"errors": [{"message": "Bad JSON"}]})
+            return
+
+        if path == "/api/login":
+            self._delay()
+            if self.mock.password and payload.get("password") != self.mock.password:
+                self._json(403, {"errors": [{"message": "Wrong password"}]})
+                return
+            self._json(200, {"ok": True}, headers={
+                "Set-Cookie": f"{SESSION_COOKIE}={self.mock.session_token}; Path=/; HttpOnly"})
+            return
+
+        match = self.GRAPHQL_PATH.match(path)
+        if not match:
+            self._send(404, "Not found", "text/plain")
+            return
+        if not self._authenticated():
+            self._json(401, {"errors": [{"message": "Could not authenticate you"}]})
+            return
+        if self.headers.get("x-csrf-token") != self.mock.csrf_token:
+            self._json(403, {"errors": [{"message": "Bad CSRF token"}]})
+            return
+        retry_at = self.mock.rate_limited()
+        if retry_at:
+            self._json(429, {"errors": [{"message": "Rate limit exceeded", "code": 88}]}, headers={
+                "x-rate-limit-reset": str(int(retry_at)), "retry-after": "1"})
+            return
+        self._delay()
+        operation = match.group(2)
+        variables = payload.get("variables", {})
+        tweet_id = str(variables.get("tweet_id") or variables.get("source_tweet_id") or "")
+        if not self.mock.timeline.delete(tweet_id, operation):
+            self._json(200, {"errors": [{"message": "No status found with that ID.", "code": 144}]})
+            return
+        result_key = "delete_tweet" if operation == "DeleteTweet" else "unretweet"
+        self._json(200, {"data": {result_key: {"tweet_results": {}}}})
+
+class MockXServer:
+    """A local HTTP server imitating the parts of Twitter/X the cleaner uses
+
+    ``latency`` is the mean server response time in seconds, ``ui_delay``
+    the time menus and dialogs take to appear, and ``overlay_rate`` the
+    chance that a popup overlay covers the page after each interaction.
+    ``rate_limit`` caps the DeleteTweet / UnretweetTweet requests accepted
+    per second; requests over the cap get HTTP 429 like the real API.
+    """
+
+    def __init__(self, host="127.0.0.1", port=0, username="mockuser", password="mockpass", posts=200,
+                 latency=0.0, ui_delay=0.0, overlay_rate=0.0, page_size=20, legacy_ui=False,
+                 verify_username=False, seed=0, rate_limit=0):
+        self.timeline = MockTimeline(username, posts, seed=seed)
+        self.password = password
+        self.latency = latency
+        self.ui_delay = ui_delay
+        self.overlay_rate = overlay_rate
+        self.page_size = page_size
+        self.legacy_ui = legacy_ui
+        self.verify_username = verify_username
+        self.session_token = f"mock-session-{seed}"
+        self.csrf_token = f"mock-csrf-{seed}"
+        self.query_ids = {"DeleteTweet": "VaenaVgh5q5ih7kvyVjgtg", "UnretweetTweet": "iQtK4dl5hBmXewYZuEOKVw"}
+        self.rate_limit = rate_limit
+        self.rate_limited_requests = 0
+        self._window = (0, 0)  # (second, requests accepted in it)
+        self._rate_lock = threading.Lock()
+        self._httpd = ThreadingHTTPServer((host, port), MockXHandler)
+        self._httpd.daemon_threads = True
+        self._httpd.mock = self
+        self._thread = None
+
+    def rate_limited(self):
+        """Count a mutation against the rate limit. Returns the reset time if it is over the limit."""
+        if not self.rate_limit:
+            return None
+        with self._rate_lock:
+            second = int(time.time())
+            start, accepted = self._window if self._window[0] == second else (second, 0)
+            if accepted >= self.rate_limit:
+                self.rate_limited_requests += 1
+                return second + 1
+            self._window = (start, accepted + 1)
+            return None
+
+    @property
+    def url(self):
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        """Serve in a background thread"""
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        logger.info(f"Mock Twitter/X server running at {self.url} (user @{self.timeline.username})")
+        return self
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+def parse_arguments():
+    """Parse command line arguments"""
+    parser = argparse.ArgumentParser(description='Offline Twitter/X stand-in for testing the cleaner')
+    parser.add_argument('--host', default='127.0.0.1', help='Address to listen on')
+    parser.add_argument('--port', type=int, default=8000, help='Port to listen on')
+    parser.add_argument('--username', default='mockuser', help='Account name of the mock profile')
+    parser.add_argument('--password', default='mockpass', help='Password accepted by the login form')
+    parser.add_argument('--posts', type=int, default=200, help='Number of synthetic posts')
+    parser.add_argument('--latency', type=float, default=0.0, help='Mean server response time (seconds)')
+    parser.add_argument('--ui-delay', type=float, default=0.0, help='Delay before menus and dialogs appear (seconds)')
+    parser.add_argument('--overlay-rate', type=float, default=0.0, help='Chance of a popup overlay per interaction')
+    parser.add_argument('--legacy-ui', action='store_true', help='Use the older Undo Retweet / Remove reply menus')
+    parser.add_argument('--seed', type=int, default=0, help='Random seed for the synthetic posts')
+    parser.add_argument('--rate-limit', type=int, default=0, help='Delete requests accepted per second (0 = no limit)')
+    return parser.parse_args()
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    args = parse_arguments()
+    server = MockXServer(args.host, args.port, args.username, args.password, args.posts, args.latency,
+                         args.ui_delay, args.overlay_rate, legacy_ui=args.legacy_ui, seed=args.seed,
+                         rate_limit=args.rate_limit)
+    server.start()
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        server.stop()
@@ -0,0 +1,389 @@
+#!/usr/bin/env python3
+"""
+Multi-account orchestrator: one isolated worker process per account, with resource caps
+
+Reads an accounts file and runs delete_tweets() for each account in its own
+process, with its own Chrome profile, journal and session cookies, up to a
+number of accounts in parallel that the host can hold. Each worker's
+process tree (Python, chromedriver, Chrome) is watched: over the memory cap
+it is killed and restarted, over the CPU cap it is throttled. Crashed
+workers are restarted with ``resume`` so they continue where they stopped.
+A progress and throughput table is printed while the accounts run.
+"""
+
+import argparse
+import json
+import logging
+import multiprocessing
+import os
+import queue
+import signal
+import sys
+import time
+
+from daemon import JOB_FIELDS, safe_name
+
+logger = logging.getLogger("TwitterCleaner")
+
+# Rough memory needed by one Chrome instance running the cleaner (lean browsing)
+CHROME_MEMORY_MB = 700
+
+# Account states
+WAITING = "waiting"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+def load_accounts(path):
+    """Read accounts from a JSON array or a JSON Lines file
+
+    Each account is an object with ``username`` and optionally ``password``
+    and the job fields of daemon.JOB_FIELDS (``max``, ``filter``, ...).
+    """
+    with open(path, encoding="utf-8") as accounts_file:
+        text = accounts_file.read()
+    if text.lstrip().startswith("["):
+        accounts = json.loads(text)
+    else:
+        accounts = [json.loads(line) for line in text.splitlines() if line.strip()]
+    for account in accounts:
+        if not account.get("username"):
+            raise ValueError(f"Account without a username in {path}")
+        unknown = set(account) - set(JOB_FIELDS) - {"username", "password"}
+        if unknown:
+            raise ValueError(f"Unknown field(s) for @{account['username']}: {', '.join(sorted(unknown))}")
+    return accounts
+
+def browsers_per_account(account):
+    """Chrome instances one account's worker runs at the same time"""
+    if account.get("worker_mode") == "browsers":
+        return max(1, account.get("workers") or 1)
+    return 1
+
+def host_capacity(memory_cap_mb=None):
+    """How many Chrome instances this host can run side by side (CPU cores and available memory)"""
+    per_browser = memory_cap_mb or CHROME_MEMORY_MB
+    available = _available_memory_mb()
+    by_memory = int(available // per_browser) if available else os.cpu_count() or 1
+    return max(1, min(os.cpu_count() or 1, by_memory))
+
+def _available_memory_mb():
+    try:
+        with open("/proc/meminfo") as meminfo:
+            for line in meminfo:
+                if line.startswith("MemAvailable:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return None
+
+def _process_tree(root_pid):
+    """PIDs of a process and all its descendants (Linux /proc)"""
+    children = {}
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat") as stat:
+                # The command name can contain spaces; the fields after it cannot
+                parent = int(stat.read().rsplit(")", 1)[1].split()[1])
+        except (OSError, IndexError, ValueError):
+            continue
+        children.setdefault(parent, []).append(int(entry))
+    tree, pending = [], [root_pid]
+    while pending:
+        pid = pending.pop()
+        tree.append(pid)
+        pending.extend(children.get(pid, ()))
+    return tree
+
+def _memory_mb(pid, page_mb):
+    """Proportional set size of a process in MB
+
+    Chrome's processes share much of their memory, so their resident sizes
+    add up to far more than the tree uses; PSS splits each shared page
+    between the processes mapping it. Falls back to RSS on kernels without
+    smaps_rollup.
+    """
+    try:
+        with open(f"/proc/{pid}/smaps_rollup") as rollup:
+            for line in rollup:
+                if line.startswith("Pss:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    with open(f"/proc/{pid}/statm") as statm:
+        return int(statm.read().split()[1]) * page_mb
+
+def _tree_usage(pids):
+    """(memory in MB, CPU seconds used) of a set of processes"""
+    page_mb = os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+    ticks = os.sysconf("SC_CLK_TCK")
+    memory = cpu = 0.0
+    for pid in pids:
+        try:
+            memory += _memory_mb(pid, page_mb)
+            with open(f"/proc/{pid}/stat") as stat:
+                fields = stat.read().rsplit(")", 1)[1].split()
+                cpu += (int(fields[11]) + int(fields[12])) / ticks
+        except (OSError, IndexError, ValueError):
+            continue
+    return memory, cpu
+
+def _signal_tree(pids, sig):
+    for pid in pids:
+        try:
+            os.kill(pid, sig)
+        except OSError:
+            pass
+
+def account_worker(account, options, events):
+    """Entry point of a worker process: clean one account and report progress on ``events``"""
+    import delete_tweets
+    from logsetup import stop_logging
+
+    username = account["username"]
+    directory = os.path.join(options["state_dir"], safe_name(username))
+    os.makedirs(directory, mode=0o700, exist_ok=True)
+    # Workers share the console, so their lines are tagged with the account; log files
+    # are kept per account, since rotating one file from several processes is not safe
+    for setting in ("LOG_PATH", "STEP_LOG_PATH"):
+        path = getattr(delete_tweets, setting)
+        if path:
+            setattr(delete_tweets, setting, os.path.join(directory, os.path.basename(path)))
+    delete_tweets.configure_logging(f"%(asctime)s - %(levelname)s - @{username} - %(message)s")
+    arguments = {JOB_FIELDS[field]: value for field, value in account.items() if field in JOB_FIELDS}
+    arguments.setdefault("max_delete", delete_tweets.MAX_TWEETS_TO_DELETE)
+    arguments.setdefault("sleep_time", delete_tweets.SLEEP_BETWEEN_ACTIONS)
+    arguments.setdefault("adaptive_rate", delete_tweets.ADAPTIVE_RATE)
+    arguments.setdefault("prune_dom", delete_tweets.DOM_PRUNING)
+    arguments.setdefault("heap_limit_mb", delete_tweets.HEAP_LIMIT_MB)
+    arguments.setdefault("recycle_every", delete_tweets.RECYCLE_EVERY)
+    if options.get("resume"):
+        arguments["resume"] = True
+
+    def forward(event):
+        events.put(dict(event, account=username))
+
+    try:
+        deleted = delete_tweets.delete_tweets(
+            username, account.get("password", ""), delete_tweets.CHROME_DRIVER_PATH or None,
+            delete_tweets.HEADLESS,
+            journal_path=os.path.join(directory, "journal.db"),
+            profile_dir=os.path.join(directory, "chrome-profile"),
+            cookies_path=os.path.join(directory, "cookies.json"),
+            selector_stats_path=delete_tweets.SELECTOR_STATS_PATH or None,
+            base_url=delete_tweets.BASE_URL,
+            progress_callback=forward,
+            lean_browsing=delete_tweets.LEAN_BROWSING,
+            raise_errors=True,
+            **arguments)
+    except delete_tweets.RunAborted as e:
+        # Exit non-zero so the orchestrator restarts the account
+        events.put({"event": "exit", "account": username, "deleted": e.deleted, "error": str(e.__cause__)})
+        raise SystemExit(1)
+    else:
+        events.put({"event": "exit", "account": username, "deleted": deleted})
+    finally:
+        # Write out queued log lines before the process exits instead of leaving it to atexit
+        stop_logging()
+
+class AccountRun:
+    """Orchestrator-side state of one account"""
+
+    def __init__(self, account):
+        self.account = account
+        self.username = account["username"]
+        self.browsers = browsers_per_account(account)
+        self.state = WAITING
+        self.process = None
+        self.deleted = 0
+        self.failed = 0
+        self.restarts = 0
+        self.started = None
+        self.finished = None
+        self.memory_mb = 0.0
+        self.cpu_percent = 0.0
+        self._cpu_seconds = None
+        self._sampled = None
+        self.throttled_until = 0.0
+        self.note = ""
+
+    def throughput(self):
+        """Deletions per minute since the account started"""
+        end = self.finished or time.monotonic()
+        return self.deleted / (end - self.started) * 60 if self.started and end > self.started else 0.0
+
+class Orchestrator:
+    """Runs accounts in worker processes within the host's capacity and per-worker caps"""
+
+    def __init__(self, accounts, parallel=None, memory_mb=None, cpu_percent=None, max_restarts=2,
+                 state_dir="accounts", dashboard_every=10.0):
+        self.runs = [AccountRun(account) for account in accounts]
+        capacity = host_capacity(memory_mb)
+        self.capacity = min(parallel, capacity) if parallel else capacity
+        if parallel and parallel > capacity:
+            logger.warning(f"This host can run about {capacity} Chrome instances; using {capacity} instead of {parallel}")
+        self.memory_mb = memory_mb
+        self.cpu_percent = cpu_percent
+        self.max_restarts = max_restarts
+        self.state_dir = state_dir
+        self.dashboard_every = dashboard_every
+        self.monitoring = sys.platform.startswith("linux")
+        if (memory_mb or cpu_percent) and not self.monitoring:
+            logger.warning("Memory and CPU caps need Linux /proc; they are not enforced on this platform")
+        self._context = multiprocessing.get_context("spawn")
+        self._events = self._context.Queue()
+
+    def _browsers_in_use(self):
+        return sum(run.browsers for run in self.runs if run.state == RUNNING)
+
+    def _start(self, run, resume=False):
+        run.process = self._context.Process(
+            target=account_worker, name=f"cleaner-{run.username}",
+            args=(run.account, {"state_dir": self.state_dir, "resume": resume}, self._events))
+        run.process.start()
+        run.state = RUNNING
+        run.started = run.started or time.monotonic()
+        run._cpu_seconds = None
+        logger.info(f"Started worker for @{run.username} (pid {run.process.pid})")
+
+    def _schedule(self):
+        for run in self.runs:
+            if run.state != WAITING:
+                continue
+            # An account that needs more browsers than the host has still runs, alone
+            if self._browsers_in_use() and self._browsers_in_use() + run.browsers > self.capacity:
+                return
+            self._start(run)
+
+    def _drain_events(self):
+        while True:
+            try:
+                event = self._events.get_nowait()
+            except queue.Empty:
+                return
+            run = next((run for run in self.runs if run.username == event.get("account")), None)
+            if run is None:
+                continue
+            if event.get("event") == "post":
+                run.deleted = max(run.deleted, event.get("deleted", 0))
+                if event.get("status") == "failed":
+                    run.failed += 1
+            elif event.get("event") == "exit":
+                run.deleted = max(run.deleted, event.get("deleted") or 0)
+                if event.get("error"):
+                    run.note = f"aborted: {event['error']}"[:60]
+
+    def _enforce_caps(self, run):
+        """Sample a worker's process tree; kill it over the memory cap, pause it over the CPU cap"""
+        pids = _process_tree(run.process.pid)
+        memory, cpu_seconds = _tree_usage(pids)
+        now = time.monotonic()
+        run.memory_mb = memory
+        if run._cpu_seconds is not None and now > run._sampled:
+            run.cpu_percent = (cpu_seconds - run._cpu_seconds) / (now - run._sampled) * 100
+        run._cpu_seconds, run._sampled = cpu_seconds, now
+
+        if self.memory_mb and memory > self.memory_mb * run.browsers:
+            logger.warning(f"@{run.username} uses {memory:.0f} MB (cap {self.memory_mb * run.browsers} MB). "
+                           "Restarting it.")
+            run.note = "memory cap"
+            _signal_tree(pids, signal.SIGKILL)
+            return
+        if run.throttled_until and now >= run.throttled_until:
+            _signal_tree(pids, signal.SIGCONT)
+            run.throttled_until = 0.0
+        elif self.cpu_percent and run.cpu_percent > self.cpu_percent and not run.throttled_until:
+            # Pause for the share of the interval the worker went over its cap
+            pause = (run.cpu_percent - self.cpu_percent) / run.cpu_percent
+            _signal_tree(pids, signal.SIGSTOP)
+            run.throttled_until = now + pause
+            run.note = "cpu throttled"
+
+    def _reap(self, run):
+        """Handle a worker process that has exited"""
+        code = run.process.exitcode
+        run.process.join()
+        if code == 0:
+            run.state = DONE
+            run.finished = time.monotonic()
+            logger.info(f"@{run.username} finished: {run.deleted} deleted")
+            return
+        if run.restarts < self.max_restarts:
+            run.restarts += 1
+            logger.warning(f"Worker for @{run.username} exited with code {code}. "
+                           f"Restarting ({run.restarts}/{self.max_restarts})...")
+            self._start(run, resume=True)
+            return
+        run.state = FAILED
+        run.finished = time.monotonic()
+        run.note = run.note or f"exit code {code}"
+        logger.error(f"Worker for @{run.username} kept crashing. Giving up on this account.")
+
+    def dashboard(self):
+        """Render the progress table"""
+        lines = [f"{'account':<20} {'state':<8} {'deleted':>8} {'failed':>7} {'per min':>8} "
+                 f"{'mem MB':>7} {'cpu %':>6} {'restarts':>8}  note"]
+        for run in self.runs:
+            lines.append(f"{run.username[:20]:<20} {run.state:<8} {run.deleted:>8} {run.failed:>7} "
+                         f"{run.throughput():>8.1f} {run.memory_mb:>7.0f} {run.cpu_percent:>6.0f} "
+                         f"{run.restarts:>8}  {run.note}")
+        total = sum(run.deleted for run in self.runs)
+        rate = sum(run.throughput() for run in self.runs if run.state == RUNNING)
+        lines.append(f"{'total':<20} {'':<8} {total:>8} {'':>7} {rate:>8.1f}  "
+                     f"({self._browsers_in_use()}/{self.capacity} browsers in use)")
+        return "\n".join(lines)
+
+    def run(self):
+        """Run every account to completion. Returns the total number of posts deleted."""
+        logger.info(f"Cleaning {len(self.runs)} accounts, up to {self.capacity} browsers at a time")
+        last_dashboard = time.monotonic()
+        try:
+            while any(run.state in (WAITING, RUNNING) for run in self.runs):
+                self._schedule()
+                time.sleep(0.5)
+                self._drain_events()
+                for run in self.runs:
+                    if run.state != RUNNING:
+                        continue
+                    if not run.process.is_alive():
+                        self._reap(run)
+                    elif self.monitoring:
+                        self._enforce_caps(run)
+                if time.monotonic() - last_dashboard >= self.dashboard_every:
+                    print(self.dashboard(), flush=True)
+                    last_dashboard = time.monotonic()
+        except KeyboardInterrupt:
+            logger.info("Interrupted. Stopping workers...")
+            for run in self.runs:
+                if run.state == RUNNING:
+                    pids = _process_tree(run.process.pid) if self.monitoring else [run.process.pid]
+                    _signal_tree(pids, signal.SIGCONT)
+                    _signal_tree(pids, signal.SIGTERM)
+        self._drain_events()
+        print(self.dashboard(), flush=True)
+        return sum(run.deleted for run in self.runs)
+
+def parse_arguments():
+    """Parse command line arguments"""
+    parser = argparse.ArgumentParser(description='Clean many Twitter/X accounts, one worker process each')
+    parser.add_argument('accounts', help='JSON or JSON Lines file with one object per account')
+    parser.add_argument('-p', '--parallel', type=int,
+                        help='Most accounts to run at once (default: what the host can hold)')
+    parser.add_argument('--memory-mb', type=int, help='Memory cap per browser of a worker, in MB')
+    parser.add_argument('--cpu-percent', type=float, help='CPU cap per worker, in percent of one core')
+    parser.add_argument('--restarts', type=int, default=2, help='Times a crashed worker is restarted')
+    parser.add_argument('--state-dir', default='accounts',
+                        help='Directory for each account\'s Chrome profile, journal and cookies')
+    parser.add_argument('--dashboard-every', type=float, default=10.0, help='Seconds between progress tables')
+    return parser.parse_args()
+
+if __name__ == "__main__":
+    args = parse_arguments()
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    orchestrator = Orchestrator(load_accounts(args.accounts), args.parallel, args.memory_mb, args.cpu_percent,
+                                args.restarts, args.state_dir, args.dashboard_every)
+    total = orchestrator.run()
+    logger.info(f"Summary: Deleted {total} posts across {len(orchestrator.runs)} accounts")
+    sys.exit(0 if all(run.state == DONE for run in orchestrator.runs) else 1)
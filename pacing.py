@@ -0,0 +1,78 @@
+"""
+Adaptive pacing: AIMD control of the delay between deletions and of concurrency
+"""
+
+import logging
+import threading
+
+from instrumentation import metrics
+
+logger = logging.getLogger("TwitterCleaner")
+
+# Failure reasons that suggest the site is struggling or throttling us.
+# Other failures (e.g. a post without a delete option) say nothing about pacing.
+CONGESTION_REASONS = ("script_timeout", "article_not_removed", "menu_not_opened", "confirm_not_found")
+RATE_LIMIT_REASONS = ("rate_limited", "http_429", "rate_limit_banner")
+# Outcomes of a deletion attempt that count as success (delete_tweets imports them from here)
+SUCCESS_STATUSES = ("deleted", "unretweeted", "removed_reply")
+
+class AdaptiveRate:
+    """Additive-increase / multiplicative-decrease controller for pacing
+
+    Every success shortens the delay between deletions by ``step`` seconds
+    (down to ``min_delay``). Signs of congestion (timeouts, errors) double
+    it, and rate limits (HTTP 429, the "rate limit" banner) quadruple it, up
+    to ``max_delay``. Concurrency follows the same pattern between 1 and
+    ``max_concurrency``: one more worker after a streak of successes, half
+    as many on congestion. Runs settle near the fastest pace the account
+    tolerates. Safe to share between worker threads.
+    """
+
+    def __init__(self, delay=1.0, min_delay=0.0, max_delay=30.0, step=0.05, concurrency=1,
+                 max_concurrency=1, backoff_floor=0.5, log_every=25):
+        self.min_delay = min_delay
+        self.max_delay = max_delay
+        self.delay = min(max(delay, min_delay), max_delay)
+        self.step = step
+        self.max_concurrency = max(1, max_concurrency)
+        self.concurrency = min(max(1, concurrency), self.max_concurrency)
+        self.backoff_floor = backoff_floor
+        self.log_every = log_every
+        self._streak = 0
+        self._successes = 0
+        self._lock = threading.Lock()
+
+    def success(self):
+        """A deletion went through: speed up a little"""
+        with self._lock:
+            self.delay = max(self.min_delay, self.delay - self.step)
+            self._streak += 1
+            self._successes += 1
+            if self._streak >= self.concurrency * 10 and self.concurrency < self.max_concurrency:
+                self.concurrency += 1
+                self._streak = 0
+                logger.info(f"[RATE] Concurrency raised to {self.concurrency}")
+            if self._successes % self.log_every == 0:
+                logger.info(f"[RATE] Delay {self.delay:.2f}s, concurrency {self.concurrency}")
+
+    def congestion(self, reason, severe=False):
+        """The site pushed back: slow down multiplicatively"""
+        factor = 4 if severe else 2
+        with self._lock:
+            self.delay = min(self.max_delay, max(self.delay * factor, self.backoff_floor, self.min_delay))
+            self.concurrency = max(1, self.concurrency // 2)
+            self._streak = 0
+            logger.info(f"[RATE] Slowing down after {reason}: delay {self.delay:.2f}s, "
+                        f"concurrency {self.concurrency}")
+        metrics.count("congestion.rate_limit" if severe else "congestion")
+
+    def record(self, result):
+        """Feed a deletion result ({status, reason}) into the controller"""
+        reason = result.get("reason") or ""
+        if result["status"] in SUCCESS_STATUSES:
+            self.success()
+        elif result["status"] == "failed":
+            if reason in RATE_LIMIT_REASONS:
+                self.congestion(reason, severe=True)
+            elif reason in CONGESTION_REASONS or reason.startswith("network_error"):
+                self.congestion(reason)
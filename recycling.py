@@ -0,0 +1,77 @@
+"""
+Renderer memory tracking and page recycling for long runs
+"""
+
+import logging
+
+from instrumentation import metrics
+
+logger = logging.getLogger("TwitterCleaner")
+
+MB = 1024 * 1024
+
+def renderer_metrics(driver):
+    """Performance.getMetrics of the driver's current tab as {name: value}, or None if unavailable
+
+    Includes JSHeapUsedSize (bytes) and Nodes (DOM nodes alive in the renderer).
+    """
+    try:
+        driver.execute_cdp_cmd("Performance.enable", {})
+        result = driver.execute_cdp_cmd("Performance.getMetrics", {})
+    except Exception as e:
+        logger.debug(f"Could not read renderer metrics: {e}")
+        return None
+    return {metric["name"]: metric["value"] for metric in result.get("metrics", [])}
+
+class PageRecycler:
+    """Decides when a long run should reload the page to get its memory back
+
+    The profile timeline keeps renderer state for everything it has loaded,
+    so heap and DOM size grow with the run and every page script slows
+    down. Every ``check_every`` deletions the renderer's JS heap is read
+    through Performance.getMetrics; the page is due for a reload when it is
+    over ``heap_limit_mb``, or after ``every`` deletions since the last
+    reload (0 disables either trigger).
+    """
+
+    def __init__(self, heap_limit_mb=0, every=0, check_every=25):
+        self.heap_limit = (heap_limit_mb or 0) * MB
+        self.every = every or 0
+        self.check_every = check_every
+        self.last_recycle = 0
+        self.last_check = 0
+        self.recycles = 0
+
+    @property
+    def active(self):
+        return bool(self.heap_limit or self.every)
+
+    def heap(self, driver):
+        """Used JS heap of the current tab in bytes (logged with the DOM node count), or None"""
+        current = renderer_metrics(driver)
+        if not current or "JSHeapUsedSize" not in current:
+            return None
+        logger.info(f"Renderer memory: {current['JSHeapUsedSize'] / MB:.0f} MB JS heap, "
+                    f"{int(current.get('Nodes', 0))} DOM nodes")
+        return current["JSHeapUsedSize"]
+
+    def over_limit(self, driver):
+        """Whether the heap is over the limit (e.g. still, right after a reload)"""
+        heap = self.heap(driver) if self.heap_limit else None
+        return heap is not None and heap > self.heap_limit
+
+    def due(self, driver, deleted_count):
+        """Why the page should be recycled now ("interval" or "heap"), or None"""
+        if self.every and deleted_count - self.last_recycle >= self.every:
+            return "interval"
+        if self.heap_limit and deleted_count - self.last_check >= self.check_every:
+            self.last_check = deleted_count
+            if self.over_limit(driver):
+                return "heap"
+        return None
+
+    def recycled(self, deleted_count, reason):
+        """Record a recycle so the triggers count from here"""
+        self.last_recycle = self.last_check = deleted_count
+        self.recycles += 1
+        metrics.count(f"recycle.{reason}")
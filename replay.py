@@ -0,0 +1,284 @@
+"""
+Fast deletion by replaying the page's own DeleteTweet / UnretweetTweet requests
+"""
+
+import json
+import logging
+import re
+
+logger = logging.getLogger("TwitterCleaner")
+
+DELETE_TWEET = "DeleteTweet"
+UNRETWEET_TWEET = "UnretweetTweet"
+REPLAY_OPERATIONS = (DELETE_TWEET, UNRETWEET_TWEET)
+
+# Mutation used for each harvested post type. Removing one of your own
+# replies is a DeleteTweet as well.
+OPERATION_FOR_TYPE = {
+    "own": DELETE_TWEET,
+    "reply": DELETE_TWEET,
+    "quote": DELETE_TWEET,
+    "retweet": UNRETWEET_TWEET,
+}
+RESULT_FOR_OPERATION = {
+    DELETE_TWEET: "deleted",
+    UNRETWEET_TWEET: "unretweeted",
+}
+
+GRAPHQL_MUTATION = re.compile(r"/i/api/graphql/[^/]+/(%s)(\?|$)" % "|".join(REPLAY_OPERATIONS))
+ID_VARIABLES = ("tweet_id", "source_tweet_id")
+
+# Headers the browser sets itself (or refuses to let scripts set)
+BROWSER_HEADERS = {"cookie", "content-length", "host", "origin", "referer", "user-agent",
+                   "accept-encoding", "connection"}
+
+# statusId(article): the ID of the post an article shows, from its own
+# timestamp permalink (a reply or quote also links to the post it answers
+# or quotes), or null. Shared with DELETE_ARTICLE_JS in delete_tweets.py.
+STATUS_ID_JS = """
+function statusId(article) {
+    var links = article.querySelectorAll('a[href*="/status/"]');
+    for (var i = 0; i < links.length; i++) {
+        if (links[i].querySelector('time')) {
+            var match = links[i].getAttribute('href').match(/\\/status\\/(\\d+)/);
+            if (match) { return match[1]; }
+        }
+    }
+    return null;
+}
+"""
+
+# Send one captured mutation per status ID from the page, so the request
+# carries the page's own cookies and headers. At most `concurrency` requests
+# are in flight; on HTTP 429 every request waits until the rate limit resets
+# (x-rate-limit-reset / retry-after, else exponential backoff) and retries.
+# Arguments: template {url, headers, body, idVariable, result}, list of status
+# IDs, options {concurrency, maxRetries, maxBackoffMs}. Resolves with
+# {results: {id: {status, reason}}, throttled: number of 429 responses}.
+# Deleted posts are hidden from the timeline.
+REPLAY_JS = """
+var template = arguments[0];
+var ids = arguments[1];
+var opts = arguments[2] || {};
+var done = arguments[arguments.length - 1];
+var concurrency = opts.concurrency || 4;
+var maxRetries = opts.maxRetries === undefined ? 5 : opts.maxRetries;
+var maxBackoffMs = opts.maxBackoffMs || 60000;
+var results = {};
+var throttled = 0;
+var pauseUntil = 0;
+var aborted = null;
+var next = 0;
+""" + STATUS_ID_JS + """
+function sleep(ms) {
+    return new Promise(function (resolve) { setTimeout(resolve, ms); });
+}
+
+function headers() {
+    var result = {};
+    for (var name in template.headers) { result[name] = template.headers[name]; }
+    // The CSRF token follows the ct0 cookie, which can rotate during a session
+    var ct0 = document.cookie.match(/(?:^|; )ct0=([^;]+)/);
+    if (ct0 && result['x-csrf-token'] !== undefined) { result['x-csrf-token'] = ct0[1]; }
+    return result;
+}
+
+function backoffMs(response, attempt) {
+    var reset = Number(response.headers.get('x-rate-limit-reset'));
+    if (reset) { return Math.min(maxBackoffMs, Math.max(1000, reset * 1000 - Date.now())); }
+    var retryAfter = Number(response.headers.get('retry-after'));
+    if (retryAfter) { return Math.min(maxBackoffMs, retryAfter * 1000); }
+    return Math.min(maxBackoffMs, 1000 * Math.pow(2, attempt) + Math.random() * 250);
+}
+
+function hide(id) {
+    var articles = document.querySelectorAll('article');
+    for (var i = 0; i < articles.length; i++) {
+        var article = articles[i];
+        if (statusId(article) !== id) { continue; }
+        article.setAttribute('data-cleaner-attempted', '1');
+        var cell = article.closest('[data-testid="cellInnerDiv"]') || article;
+        cell.style.display = 'none';
+    }
+}
+
+async function send(id) {
+    var body = JSON.parse(JSON.stringify(template.body));
+    body.variables = body.variables || {};
+    body.variables[template.idVariable] = id;
+    for (var attempt = 0; ; attempt++) {
+        var wait = pauseUntil - Date.now();
+        if (wait > 0) { await sleep(wait); }
+        if (aborted) { return {status: 'failed', reason: aborted}; }
+        var response = await fetch(template.url, {
+            method: 'POST', credentials: 'include', headers: headers(), body: JSON.stringify(body)
+        });
+        if (response.status === 429) {
+            throttled++;
+            if (attempt >= maxRetries) { return {status: 'failed', reason: 'rate_limited'}; }
+            pauseUntil = Math.max(pauseUntil, Date.now() + backoffMs(response, attempt));
+            continue;
+        }
+        if (response.status === 401 || response.status === 403) {
+            // The session or CSRF token is no longer valid; stop sending
+            aborted = 'http_' + response.status;
+            return {status: 'failed', reason: aborted};
+        }
+        var data = null;
+        try { data = await response.json(); } catch (error) { data = null; }
+        if (!response.ok) {
+            return {status: 'failed', reason: 'http_' + response.status};
+        }
+        if (data && data.errors && data.errors.length) {
+            var error = data.errors[0];
+            if (error.code === 144 || /no status found|could not find/i.test(error.message || '')) {
+                return {status: 'skipped', reason: 'not_found'};
+            }
+            return {status: 'failed', reason: 'api_error: ' + (error.message || error.code)};
+        }
+        hide(id);
+        return {status: template.result, reason: null};
+    }
+}
+
+async function worker() {
+    while (next < ids.length) {
+        var id = ids[next++];
+        try {
+            results[id] = await send(id);
+        } catch (error) {
+            results[id] = {status: 'failed', reason: 'network_error: ' + (error && error.message)};
+        }
+    }
+}
+
+var workers = [];
+for (var i = 0; i < Math.min(concurrency, ids.length); i++) { workers.push(worker()); }
+Promise.all(workers).then(function () { done({results: results, throttled: throttled}); });
+"""
+
+def parse_captured_request(message):
+    """Turn a Network.requestWillBeSent performance log message into a replay template
+
+    Returns (operation, template) or None if the message is not a mutation
+    that can be replayed.
+    """
+    if message.get("method") != "Network.requestWillBeSent":
+        return None
+    request = message.get("params", {}).get("request", {})
+    match = GRAPHQL_MUTATION.search(request.get("url", ""))
+    if not match or request.get("method") != "POST" or not request.get("postData"):
+        return None
+    try:
+        body = json.loads(request["postData"])
+    except ValueError:
+        return None
+    variables = body.get("variables") or {}
+    id_variable = next((name for name in ID_VARIABLES if name in variables), None)
+    if id_variable is None:
+        return None
+
+    operation = match.group(1)
+    headers = {name: value for name, value in request.get("headers", {}).items()
+               if name.lower() not in BROWSER_HEADERS
+               and not name.lower().startswith("sec-") and not name.startswith(":")}
+    return operation, {
+        "url": request["url"],
+        "headers": headers,
+        "body": body,
+        "idVariable": id_variable,
+        "result": RESULT_FOR_OPERATION[operation],
+    }
+
+class NetworkReplayer:
+    """Deletes posts by replaying requests the page itself made
+
+    After a post has been deleted through the UI, observe() reads the
+    browser's performance log (Chrome DevTools Network events) and keeps the
+    DeleteTweet / UnretweetTweet request as a template. replay() then sends
+    that request for a batch of other status IDs from the page with fetch(),
+    with the same session, bounded concurrency and backoff on HTTP 429.
+
+    The driver must be created with performance logging enabled
+    (see delete_tweets.create_driver(capture_network=True)).
+    """
+
+    def __init__(self, driver, concurrency=4, batch_size=20, max_retries=5, max_backoff=60):
+        self.driver = driver
+        self.concurrency = concurrency
+        self.batch_size = batch_size
+        self.max_retries = max_retries
+        self.max_backoff = max_backoff
+        self.templates = {}
+        self.disabled = False
+        self.throttled = 0  # HTTP 429 responses seen since the last take_throttled()
+
+    def ready(self, post_type):
+        """Whether posts of this harvested type can be replayed"""
+        return not self.disabled and OPERATION_FOR_TYPE.get(post_type) in self.templates
+
+    def observe(self):
+        """Read (and clear) the performance log, keeping new mutation templates and counting HTTP 429s
+
+        Returns the operations captured by this call.
+        """
+        try:
+            entries = self.driver.get_log("performance")
+        except Exception as e:
+            logger.warning(f"Network capture is not available ({type(e).__name__}). Replay disabled.")
+            self.disabled = True
+            return []
+        captured = []
+        for entry in entries:
+            try:
+                message = json.loads(entry["message"])["message"]
+            except (KeyError, TypeError, ValueError):
+                continue
+            if (message.get("method") == "Network.responseReceived"
+                    and message.get("params", {}).get("response", {}).get("status") == 429):
+                self.throttled += 1
+                continue
+            parsed = parse_captured_request(message)
+            if parsed and parsed[0] not in self.templates:
+                self.templates[parsed[0]] = parsed[1]
+                captured.append(parsed[0])
+                logger.info(f"Captured {parsed[0]} request; later posts of this kind are deleted by replaying it")
+        return captured
+
+    def take_throttled(self):
+        """Return and reset the number of HTTP 429 responses seen"""
+        throttled, self.throttled = self.throttled, 0
+        return throttled
+
+    def replay(self, items):
+        """Delete a batch of harvested items ({id, type, ...}) by replaying captured requests
+
+        Returns a result dict ({status, reason, id}) per item, in order.
+        """
+        results = {}
+        for operation in REPLAY_OPERATIONS:
+            ids = [item["id"] for item in items if OPERATION_FOR_TYPE.get(item.get("type")) == operation]
+            if not ids or operation not in self.templates:
+                continue
+            options = {
+                "concurrency": self.concurrency,
+                "maxRetries": self.max_retries,
+                "maxBackoffMs": int(self.max_backoff * 1000),
+            }
+            try:
+                # Worst case every request backs off the maximum time on each retry
+                self.driver.set_script_timeout(30 + len(ids) * 10 + self.max_retries * self.max_backoff)
+                response = self.driver.execute_async_script(
+                    REPLAY_JS, self.templates[operation], ids, options) or {}
+                results.update(response.get("results") or {})
+                self.throttled += response.get("throttled", 0)
+            except Exception as e:
+                logger.warning(f"Replaying {operation} failed: {type(e).__name__}")
+        output = []
+        for item in items:
+            result = results.get(item["id"]) or {"status": "failed", "reason": "not_replayed"}
+            if result.get("reason") in ("http_401", "http_403") and not self.disabled:
+                logger.warning("Replayed requests were rejected. Falling back to the UI.")
+                self.disabled = True
+            output.append({"status": result["status"], "reason": result.get("reason"), "id": item["id"]})
+        return output
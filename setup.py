@@ -9,7 +9,7 @@ setup(
     url="https://github.com/yourusername/twitter-x-post-cleaner",
     packages=find_packages(),
     install_requires=[
-        "selenium>=4.0.0",
+        "selenium>=4.20.0",
     ],
     classifiers=[
         "Development Status :: 3 - Alpha",
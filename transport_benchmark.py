@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Microbenchmark of page-script latency: chromedriver HTTP vs. a direct DevTools websocket
+
+Logs in to the offline mock server, opens the profile timeline and runs the
+same scripts the deletion loop runs (a trivial script, the in-page condition
+check, an in-page wait that is already satisfied and the harvest script)
+through both transports, reporting p50 / p95 / mean latency per command.
+"""
+
+import argparse
+import logging
+import sys
+import time
+
+import delete_tweets
+from cdp import CDPDriver
+from instrumentation import Histogram
+from mock_server import MockXServer
+
+logger = logging.getLogger("TwitterCleaner")
+
+def commands(username):
+    """(name, callable(driver)) pairs for the commands measured"""
+    return [
+        ("execute_script: return 1", lambda driver: driver.execute_script("return 1")),
+        ("execute_script: condition check",
+         lambda driver: driver.execute_script(delete_tweets.CHECK_CONDITION_JS, "caret_present", None)),
+        ("execute_async_script: condition wait",
+         lambda driver: driver.execute_async_script(delete_tweets.WAIT_FOR_CONDITION_JS, "caret_present", None, 1000)),
+        ("execute_script: harvest",
+         lambda driver: driver.execute_script(delete_tweets.HARVEST_ARTICLES_JS, username, [], False)),
+    ]
+
+def measure(driver, username, iterations):
+    """Time every command ``iterations`` times. Returns {name: Histogram}."""
+    driver.set_script_timeout(10)
+    histograms = {}
+    for name, command in commands(username):
+        command(driver)  # Warm up
+        histogram = histograms[name] = Histogram()
+        for _ in range(iterations):
+            start = time.perf_counter()
+            command(driver)
+            histogram.record(time.perf_counter() - start)
+    return histograms
+
+def run(args):
+    server = MockXServer(posts=args.posts, latency=0)
+    server.start()
+    driver = None
+    try:
+        driver = delete_tweets.create_driver(args.driver, headless=not args.headful, lean_browsing=True)
+        waiter = delete_tweets.WaitEngine(driver)
+        delete_tweets.log_in(driver, waiter, server.timeline.username, server.password, server.url)
+        delete_tweets.open_profile(driver, waiter, server.timeline.username, base_url=server.url)
+
+        results = {"webdriver": measure(driver, server.timeline.username, args.iterations)}
+        fast_driver = CDPDriver.attach(driver)
+        if fast_driver is None:
+            logger.error("Could not connect to the DevTools endpoint")
+            return None
+        results["devtools"] = measure(fast_driver, server.timeline.username, args.iterations)
+        fast_driver.detach()
+        return results
+    finally:
+        if driver is not None:
+            driver.quit()
+        server.stop()
+
+def print_results(results):
+    print(f"{'command':<40} {'transport':<10} {'p50':>9} {'p95':>9} {'mean':>9}")
+    for name in results["webdriver"]:
+        for transport in ("webdriver", "devtools"):
+            histogram = results[transport][name]
+            label = name if transport == "webdriver" else ""
+            print(f"{label:<40} {transport:<10} {histogram.percentile(0.50) * 1000:>7.2f}ms "
+                  f"{histogram.percentile(0.95) * 1000:>7.2f}ms {histogram.total / histogram.count * 1000:>7.2f}ms")
+
+def parse_arguments():
+    """Parse command line arguments"""
+    parser = argparse.ArgumentParser(description='Compare page-script latency over WebDriver and DevTools')
+    parser.add_argument('-d', '--driver', default=delete_tweets.CHROME_DRIVER_PATH or None,
+                        help='Path to ChromeDriver executable (default: Selenium Manager)')
+    parser.add_argument('-n', '--iterations', type=int, default=200, help='Runs of each command per transport')
+    parser.add_argument('--posts', type=int, default=40, help='Number of synthetic posts on the mock timeline')
+    parser.add_argument('--headful', action='store_true', help='Show the browser window')
+    return parser.parse_args()
+
+if __name__ == "__main__":
+    delete_tweets.configure_logging()
+    results = run(parse_arguments())
+    if results is None:
+        sys.exit(1)
+    print_results(results)